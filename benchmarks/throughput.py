@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Benchmark: Measuring the throughput of the environments.
+
+Measure the steps, resets and renders per second of soccer-v0, the legacy
+soccer environment, the predator-prey environment and gridworld-v0/v1. The
+soccer environments are swept over the maps, the team sizes and the AI frame
+skips. The results are written as JSON so that the releases can be compared.
+"""
+
+# Native modules
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import time
+
+# Keep the pygame banner out of the JSON written to stdout. It's printed when
+# pygame is first imported, so the variable must be set before the imports
+# below
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+# pylint: disable=wrong-import-position
+# Third-party modules
+import numpy as np
+import pygame
+
+# User-defined modules
+from pygame_rl.scenario.gridworld.envs.gridworld_v0 import GridworldV0
+from pygame_rl.scenario.gridworld.envs.gridworld_v1 import GridworldV1
+from pygame_rl.scenario.gridworld.options import GridworldOptions
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.options import Options
+import pygame_rl.scenario.predator_prey_environment as predator_prey_environment
+import pygame_rl.scenario.soccer_environment as soccer_environment
+# pylint: enable=wrong-import-position
+
+
+# Directory of the repository
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sample map of the predator-prey environment
+PREDATOR_PREY_MAP_PATH = os.path.join(
+    REPO_DIR, 'sample/data/map/predator_prey/predator_prey_15x15.tmx')
+
+
+def measure(func, duration, before=None):
+    """Measure the calls per second of a function.
+
+    The function is called once before the measurement to warm up the lazy
+    loading.
+
+    Args:
+        func (callable): The function to measure. If "before" is given, it
+            returns True if "before" should be called before the next call.
+        duration (float): The minimum measured seconds.
+        before (callable): The function to call outside the measurement.
+
+    Returns:
+        dict: The calls per second and the call count.
+    """
+    if before is not None:
+        before()
+    if before is not None and func():
+        before()
+    elapsed = 0.0
+    count = 0
+    while elapsed < duration:
+        start = time.perf_counter()
+        call_before = func()
+        elapsed += time.perf_counter() - start
+        count += 1
+        if before is not None and call_before:
+            before()
+    return {
+        'per_sec': count / elapsed,
+        'count': count,
+    }
+
+
+def benchmark_soccer_v0(map_path, team_size, ai_frame_skip, duration):
+    env = SoccerV0()
+    env.options = Options(map_path, team_size, ai_frame_skip)
+    env.load()
+    env.seed(0)
+    action_rand = np.random.RandomState(0)
+    agent_size = env.options.agent_size
+
+    def step():
+        # Let the computer control its own team
+        actions = action_rand.randint(len(Actions), size=agent_size)
+        actions[team_size:] = Actions.NOOP
+        return env.step(actions)[2]
+
+    def render():
+        env.render()
+
+    return {
+        'steps': measure(step, duration, env.reset),
+        'resets': measure(env.reset, duration),
+        'renders': measure(render, duration, env.reset),
+    }
+
+
+def benchmark_soccer_legacy(map_path, team_size, ai_frame_skip, duration):
+    env = soccer_environment.SoccerEnvironment(
+        soccer_environment.SoccerEnvironmentOptions(
+            map_path, team_size, ai_frame_skip))
+    action_rand = np.random.RandomState(0)
+
+    def step():
+        # Let the computer control its own team
+        for agent_index in range(team_size):
+            action_index = action_rand.randint(len(env.actions))
+            env.take_cached_action(agent_index, env.actions[action_index])
+        env.update_state()
+        return env.state.is_terminal()
+
+    def render():
+        env.render()
+        env.renderer.get_screenshot()
+
+    return {
+        'steps': measure(step, duration, env.reset),
+        'resets': measure(env.reset, duration),
+        'renders': measure(render, duration, env.reset),
+    }
+
+
+def benchmark_predator_prey(ai_frame_skip, duration):
+    env = predator_prey_environment.PredatorPreyEnvironment(
+        predator_prey_environment.PredatorPreyEnvironmentOptions(
+            PREDATOR_PREY_MAP_PATH, ai_frame_skip=ai_frame_skip))
+
+    def step():
+        # Let the rule-based AI control all the objects
+        env.update_state()
+        return env.state.is_terminal()
+
+    def render():
+        env.render()
+        env.renderer.get_screenshot()
+
+    return {
+        'steps': measure(step, duration, env.reset),
+        'resets': measure(env.reset, duration),
+        'renders': measure(render, duration, env.reset),
+    }
+
+
+def benchmark_gridworld(env_class, duration):
+    env = env_class()
+    env.load()
+    env.seed(0)
+    env.action_space.seed(0)
+
+    def step():
+        return env.step(env.action_space.sample())[2]
+
+    def render():
+        env.render()
+
+    return {
+        'steps': measure(step, duration, env.reset),
+        'resets': measure(env.reset, duration),
+        'renders': measure(render, duration, env.reset),
+    }
+
+
+def get_soccer_map_paths():
+    map_paths = [Options().map_path]
+    map_paths.extend(sorted(glob.glob(os.path.join(
+        REPO_DIR, 'sample/data/map/soccer/*.tmx'))))
+    return map_paths
+
+
+def get_cases(args):
+    """Get the benchmark cases as pairs of the parameters and the callables.
+    """
+    cases = []
+    soccer_benchmarks = {
+        'soccer-v0': benchmark_soccer_v0,
+        'soccer-legacy': benchmark_soccer_legacy,
+    }
+    for (env_name, benchmark) in soccer_benchmarks.items():
+        if env_name not in args.envs:
+            continue
+        for map_path in get_soccer_map_paths():
+            for team_size in args.team_sizes:
+                for ai_frame_skip in args.frame_skips:
+                    params = {
+                        'env': env_name,
+                        'map': os.path.basename(map_path),
+                        'team_size': team_size,
+                        'ai_frame_skip': ai_frame_skip,
+                    }
+                    cases.append((params, lambda benchmark=benchmark,
+                                  map_path=map_path, team_size=team_size,
+                                  ai_frame_skip=ai_frame_skip: benchmark(
+                                      map_path, team_size, ai_frame_skip,
+                                      args.duration)))
+    if 'predator-prey' in args.envs:
+        for ai_frame_skip in args.frame_skips:
+            params = {
+                'env': 'predator-prey',
+                'map': os.path.basename(PREDATOR_PREY_MAP_PATH),
+                'ai_frame_skip': ai_frame_skip,
+            }
+            cases.append((params, lambda ai_frame_skip=ai_frame_skip:
+                          benchmark_predator_prey(ai_frame_skip,
+                                                  args.duration)))
+    gridworld_classes = {
+        'gridworld-v0': GridworldV0,
+        'gridworld-v1': GridworldV1,
+    }
+    for (env_name, env_class) in gridworld_classes.items():
+        if env_name not in args.envs:
+            continue
+        params = {
+            'env': env_name,
+            'map': os.path.basename(GridworldOptions.map_resource_name),
+        }
+        cases.append((params, lambda env_class=env_class: benchmark_gridworld(
+            env_class, args.duration)))
+    return cases
+
+
+def get_metadata(args):
+    return {
+        'time': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'duration': args.duration,
+    }
+
+
+def parse_args():
+    env_names = ['soccer-v0', 'soccer-legacy', 'predator-prey',
+                 'gridworld-v0', 'gridworld-v1']
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=None,
+                        help='the JSON file to write, stdout if omitted')
+    parser.add_argument('--duration', type=float, default=0.5,
+                        help='the minimum seconds of each measurement')
+    parser.add_argument('--envs', nargs='+', default=env_names,
+                        choices=env_names, help='the environments to measure')
+    parser.add_argument('--team-sizes', nargs='+', type=int,
+                        default=[1, 2, 3, 4, 5],
+                        help='the team sizes of the soccer environments')
+    parser.add_argument('--frame-skips', nargs='+', type=int,
+                        default=[1, 2, 3, 4], help='the AI frame skips')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    cases = get_cases(args)
+    for (case_index, (params, benchmark)) in enumerate(cases):
+        print('[{}/{}] {}'.format(case_index + 1, len(cases), params),
+              file=sys.stderr)
+        result = dict(params)
+        for (name, measurement) in benchmark().items():
+            result['{}_per_sec'.format(name)] = measurement['per_sec']
+            result['{}_count'.format(name)] = measurement['count']
+        results.append(result)
+    report = {
+        'metadata': get_metadata(args),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
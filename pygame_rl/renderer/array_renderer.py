@@ -0,0 +1,330 @@
+# Third-party modules
+import numpy as np
+import pygame
+import pytmx
+
+# User-defined modules
+from pygame_rl.renderer.pygame_renderer import TiledLoader
+import pygame_rl.util.file_util as file_util
+import pygame_rl.util.image_util as image_util
+
+
+def numpy_image_loader(filename, colorkey, **kwargs):
+    """PyTMX image loader decoding the tiles into NumPy arrays.
+
+    The image file is decoded once by pygame.image without initializing the
+    display, and the tiles are cut from it as RGBA arrays in the HWC layout.
+    The pixels of the color key, if given, are fully transparent.
+
+    Args:
+        filename (str): The image file path.
+        colorkey (str): The hex color key of the tileset.
+
+    Returns:
+        function: The function getting the tile images by the rects and the
+            flags.
+    """
+    image = pygame.image.load(filename)
+    pixels = np.empty(image.get_size()[::-1] + (4,), dtype=np.uint8)
+    pixels[..., :3] = np.swapaxes(pygame.surfarray.array3d(image), 0, 1)
+    pixels[..., 3] = np.swapaxes(pygame.surfarray.array_alpha(image), 0, 1)
+    if colorkey:
+        color = pygame.Color('#{}'.format(colorkey))
+        is_key = np.all(pixels[..., :3] == [color.r, color.g, color.b], axis=2)
+        pixels[..., 3] = np.where(is_key, 0, 255)
+
+    def load_image(rect=None, flags=None):
+        if rect:
+            (x, y, width, height) = rect
+            tile = pixels[y:y + height, x:x + width]
+        else:
+            tile = pixels
+        if flags:
+            if flags.flipped_diagonally:
+                tile = np.swapaxes(tile, 0, 1)
+            if flags.flipped_horizontally:
+                tile = tile[:, ::-1]
+            if flags.flipped_vertically:
+                tile = tile[::-1]
+        return np.array(tile)
+
+    return load_image
+
+
+class TiledArrayRenderer(TiledLoader):
+    """Tiled map renderer compositing the frames by NumPy.
+
+    The tiles are decoded into NumPy arrays once, the background layers are
+    composited into a static background and the overlay sprites are stacked,
+    so a frame is the background with the sprites alpha-blended at the grid
+    cells. The sprites are blended the same as pygame blits them on an opaque
+    surface, so the frames are pixel-identical to the ones of TiledRenderer
+    without any display or surface. Many frames can be composited at once.
+    """
+    # Background with the shape (height, width, 3) and its view as the tiles
+    # with the shape (map_height, tile_height, map_width, tile_width, 3)
+    background = None
+    background_tiles = None
+
+    # Mapping from the overlay name to the sprite index
+    overlays = None
+
+    # Blending terms of the sprites from get_blend_terms() with the shapes
+    # (sprite_size, tile_height, tile_width, 3) and (sprite_size, tile_height,
+    # tile_width, 1)
+    sprite_term = None
+    sprite_weight = None
+
+    # Rendered tile width and height in pixels, the tiles of the map are
+    # downscaled to it at loading if it's set
+    tile_size = None
+
+    def __init__(self, filename, tile_size=None):
+        super().__init__(filename)
+        self.tile_size = tile_size
+
+    def load(self):
+        # Load the tiled map
+        self.tiled_map = pytmx.TiledMap(self.filename,
+                                        image_loader=numpy_image_loader)
+
+        # Load the layers
+        self.load_layers()
+
+        # Composite the background and stack the overlay sprites
+        self.background = self.get_background()
+        (map_width, map_height) = self.get_map_size()
+        (tile_width, tile_height) = self.get_tile_size()
+        self.background_tiles = self.background.reshape(
+            map_height, tile_height, map_width, tile_width, 3)
+        self.overlays = self.get_overlays()
+
+    def get_display_size(self):
+        return self.get_map_size() * self.get_tile_size()
+
+    def get_map_size(self):
+        return np.array([self.tiled_map.width, self.tiled_map.height])
+
+    def get_tile_size(self):
+        if self.tile_size:
+            return np.array([self.tile_size, self.tile_size])
+        return self.get_map_tile_size()
+
+    def get_map_tile_size(self):
+        return np.array([self.tiled_map.tilewidth, self.tiled_map.tileheight])
+
+    def get_scale_factors(self):
+        """Get the downscaling factors of the tiles.
+
+        Returns:
+            numpy.ndarray: The integer factors [x, y], None if the tiles aren't
+                scaled.
+        """
+        if not self.tile_size:
+            return None
+        return image_util.get_scale_factors(self.get_map_tile_size(),
+                                            self.tile_size)
+
+    def get_screenshot_dim(self):
+        display_size = self.get_display_size()
+        return [display_size[1], display_size[0], 3]
+
+    def get_background(self):
+        """Get the background.
+
+        All background layers will be blended to the single array in the map
+        tile size, which is downscaled as a whole.
+
+        Returns:
+            numpy.ndarray: The background with the shape (height, width, 3).
+        """
+        (tile_width, tile_height) = self.get_map_tile_size()
+        (map_width, map_height) = self.get_map_size()
+        background = np.zeros(
+            (map_height * tile_height, map_width * tile_width, 3),
+            dtype=np.uint8)
+        for layer in self.layers['background']:
+            for (px, py, image) in layer.tiles():
+                area = (slice(py * tile_height, (py + 1) * tile_height),
+                        slice(px * tile_width, (px + 1) * tile_width))
+                background[area] = blend(background[area],
+                                         *get_blend_terms(image))
+        factors = self.get_scale_factors()
+        if factors is not None:
+            background = image_util.downscale_image(background, factors)
+        return background
+
+    def get_overlays(self):
+        """Get the overlay sprites.
+
+        The sprite mapping files are read the same as
+        TiledRenderer.get_overlays(), and the blending terms of the sprite
+        images are stacked into "sprite_term" and "sprite_weight".
+
+        Returns:
+            dict: A mapping from the name to the sprite index.
+        """
+        overlays = {}
+        images = []
+        for layer in self.layers['overlay']:
+            if 'sprite' not in layer.properties:
+                raise KeyError('"sprite" property in required for the layer {} '
+                               'to load the overlays'
+                               .format(layer.name))
+            # Build the table by pointing the position to the image
+            pos_to_image = {}
+            for (px, py, image) in layer.tiles():
+                pos_to_image[(px, py)] = image
+            # Read the sprite file relative to the map file
+            path = layer.properties['sprite']
+            resolved_path = file_util.resolve_path(self.filename, path)
+            sprite = file_util.read_yaml(resolved_path)
+            # Map the name to the sprite index
+            for (name, pos) in sprite.items():
+                pos = (pos['x'], pos['y'])
+                if pos not in pos_to_image:
+                    raise KeyError('{} ({}, {}) is not found in the layer'
+                                   .format(name, pos[0], pos[1]))
+                if name in overlays:
+                    raise RuntimeError(
+                        'Duplicate name {} in the sprite file'.format(name))
+                overlays[name] = len(images)
+                images.append(pos_to_image[pos])
+        factors = self.get_scale_factors()
+        if factors is not None:
+            images = [image_util.downscale_image(image, factors)
+                      for image in images]
+        (tile_width, tile_height) = self.get_tile_size()
+        sprites = np.array(images, dtype=np.uint8).reshape(
+            -1, tile_height, tile_width, 4)
+        (self.sprite_term, self.sprite_weight) = get_blend_terms(sprites)
+        return overlays
+
+    def allocate_frames(self, frame_size):
+        """Allocate a buffer for compose().
+
+        Args:
+            frame_size (int): The number of the frames.
+
+        Returns:
+            numpy.ndarray: The uninitialized uint8 buffer with the shape
+                (frame_size, height, width, 3).
+        """
+        return np.empty([frame_size] + self.get_screenshot_dim(),
+                        dtype=np.uint8)
+
+    def compose(self, sprite_indexes, sprite_pos, out=None, dirty_pos=None):
+        """Composite many frames.
+
+        The sprites are drawn in the order of the slots, so the later slots are
+        drawn above the earlier ones. If the frames in "out" were composited
+        before, passing the previous sprite positions as "dirty_pos" restores
+        only those tiles from the background instead of the whole frames.
+
+        Args:
+            sprite_indexes (numpy.ndarray): The sprite index drawn in each slot
+                of each frame with the shape (frame_size, slot_size), -1 to
+                draw nothing.
+            sprite_pos (numpy.ndarray): The grid position of each slot with the
+                shape (frame_size, slot_size, 2).
+            out (numpy.ndarray): The C-contiguous buffer to write into, e.g.
+                from allocate_frames(). A new array is allocated if it's None.
+            dirty_pos (numpy.ndarray): The grid positions of the sprites
+                previously drawn in "out" with the shape (frame_size,
+                dirty_size, 2).
+
+        Returns:
+            numpy.ndarray: The frames with the shape (frame_size, height,
+                width, 3), "out" if it's given.
+        """
+        sprite_indexes = np.asarray(sprite_indexes)
+        sprite_pos = np.asarray(sprite_pos)
+        (frame_size, slot_size) = sprite_indexes.shape
+        if out is None:
+            out = self.allocate_frames(frame_size)
+        elif (out.shape != (frame_size,) + self.background.shape
+              or not out.flags.c_contiguous):
+            raise ValueError('The buffer should be C-contiguous with the '
+                             'shape {}'.format((frame_size,)
+                                               + self.background.shape))
+        if frame_size == 1:
+            # Slice the tiles directly, which is faster for a single frame
+            self._compose_frame(sprite_indexes[0].tolist(),
+                                sprite_pos[0].tolist(), out[0],
+                                None if dirty_pos is None
+                                else np.asarray(dirty_pos)[0].tolist())
+            return out
+        # View the frames as the tiles indexed by the grid positions
+        tiles = out.reshape((frame_size,) + self.background_tiles.shape)
+        if dirty_pos is None:
+            out[...] = self.background
+        else:
+            dirty_pos = np.asarray(dirty_pos)
+            frame_indexes = np.arange(frame_size)[:, None]
+            px = dirty_pos[..., 0]
+            py = dirty_pos[..., 1]
+            tiles[frame_indexes, py, :, px] = self.background_tiles[py, :, px]
+        for slot in range(slot_size):
+            slot_indexes = sprite_indexes[:, slot]
+            # Blend each sprite to all the frames showing it at once
+            for index in np.unique(slot_indexes[slot_indexes >= 0]).tolist():
+                frame_indexes = np.flatnonzero(slot_indexes == index)
+                px = sprite_pos[frame_indexes, slot, 0]
+                py = sprite_pos[frame_indexes, slot, 1]
+                tiles[frame_indexes, py, :, px] = blend(
+                    tiles[frame_indexes, py, :, px], self.sprite_term[index],
+                    self.sprite_weight[index])
+        return out
+
+    def _compose_frame(self, sprite_indexes, sprite_pos, frame, dirty_pos):
+        (tile_width, tile_height) = self.get_tile_size().tolist()
+        if dirty_pos is None:
+            frame[...] = self.background
+        else:
+            for (px, py) in dirty_pos:
+                area = (slice(py * tile_height, (py + 1) * tile_height),
+                        slice(px * tile_width, (px + 1) * tile_width))
+                frame[area] = self.background[area]
+        for (index, (px, py)) in zip(sprite_indexes, sprite_pos):
+            if index < 0:
+                continue
+            area = (slice(py * tile_height, (py + 1) * tile_height),
+                    slice(px * tile_width, (px + 1) * tile_width))
+            frame[area] = blend(frame[area], self.sprite_term[index],
+                                self.sprite_weight[index])
+
+
+def get_blend_terms(image):
+    """Get the blending terms of the RGBA images.
+
+    pygame blits a pixel of the color "s" and the alpha "a" on an opaque pixel
+    of the color "d" as ((s - d) * a + s >> 8) + d, which equals
+    (s * (a + 1) + d * (256 - a)) >> 8. The sum fits in 16 bits, so the terms
+    are precomputed as 16-bit integers.
+
+    Args:
+        image (numpy.ndarray): The uint8 RGBA images with the channels as the
+            last axis.
+
+    Returns:
+        tuple: The source terms s * (a + 1) of the color channels and the
+            destination weights 256 - a with a single channel.
+    """
+    color = image[..., :3].astype(np.uint16)
+    alpha = image[..., 3:].astype(np.uint16)
+    return (color * (alpha + 1), 256 - alpha)
+
+
+def blend(dst, src_term, dst_weight):
+    """Blend the pixels as pygame blits per-pixel alpha on opaque surfaces.
+
+    Args:
+        dst (numpy.ndarray): The uint8 destination color channels.
+        src_term (numpy.ndarray): The source terms from get_blend_terms().
+        dst_weight (numpy.ndarray): The destination weights from
+            get_blend_terms().
+
+    Returns:
+        numpy.ndarray: The blended uint8 color channels.
+    """
+    return ((src_term + dst * dst_weight) >> 8).astype(np.uint8)
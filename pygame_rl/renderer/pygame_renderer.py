@@ -9,6 +9,7 @@ import pytmx.util_pygame
 
 # User-defined modules
 import pygame_rl.util.file_util as file_util
+import pygame_rl.util.image_util as image_util
 
 
 class TiledLoader(metaclass=abc.ABCMeta):
@@ -114,6 +115,46 @@ class TiledRenderer(TiledLoader):
     screen = None
     background = None
 
+    # Frame array of the BGRA pixels in the HWC layout sharing the memory with
+    # the screen surface, None if the screen is the display surface
+    frame = None
+
+    # Surface sharing the memory with the frame array without blending, which
+    # is blitted from to copy the screenshots
+    frame_source = None
+
+    # Reused frame buffer of the screenshot views when the screen is the
+    # display surface
+    view_buffer = None
+
+    # Rendered tile width and height in pixels, the tiles of the map are
+    # downscaled to it at loading if it's set
+    tile_size = None
+
+    # Rectangles drawn on the screen since the last incremental screenshot,
+    # None if the whole screen has to be copied
+    dirty_rects = None
+
+    # Buffer of the last incremental screenshot
+    incremental_out = None
+
+    # Largest number of the recorded dirty rectangles, the whole screen is
+    # copied when there are more
+    max_dirty_rects = 256
+
+    # Screenshot padded with black tiles for get_po_screenshots() and the
+    # surface sharing its memory
+    po_padded = None
+    po_padded_surface = None
+
+    # Rectangles drawn on the screen since the padded screenshot was updated,
+    # None if the whole screen has to be copied
+    po_dirty_rects = None
+
+    def __init__(self, filename, tile_size=None):
+        super().__init__(filename)
+        self.tile_size = tile_size
+
     def load(self):
         # Load the tiled map
         self.tiled_map = pytmx.util_pygame.load_pygame(self.filename)
@@ -121,17 +162,35 @@ class TiledRenderer(TiledLoader):
         # Load the layers
         self.load_layers()
 
+        # Check the rendered tile size
+        self.get_scale_factors()
+
     def get_display_size(self):
-        width = self.tiled_map.width * self.tiled_map.tilewidth
-        height = self.tiled_map.height * self.tiled_map.tileheight
-        return np.array([width, height])
+        return self.get_map_size() * self.get_tile_size()
 
     def get_map_size(self):
         return np.array([self.tiled_map.width, self.tiled_map.height])
 
     def get_tile_size(self):
+        if self.tile_size:
+            return np.array([self.tile_size, self.tile_size])
+        return self.get_map_tile_size()
+
+    def get_map_tile_size(self):
         return np.array([self.tiled_map.tilewidth, self.tiled_map.tileheight])
 
+    def get_scale_factors(self):
+        """Get the downscaling factors of the tiles.
+
+        Returns:
+            numpy.ndarray: The integer factors [x, y], None if the tiles aren't
+                scaled.
+        """
+        if not self.tile_size:
+            return None
+        return image_util.get_scale_factors(self.get_map_tile_size(),
+                                            self.tile_size)
+
     def get_total_tile_num(self):
         return self.tiled_map.maxgid - 1
 
@@ -145,13 +204,21 @@ class TiledRenderer(TiledLoader):
         """
         # Get the background layer
         background_layers = self.layers['background']
-        # Create a new Pygame surface by bliting all the images on it
-        background = pygame.Surface(self.screen.get_size())
+        # Create a new Pygame surface by bliting all the images on it in the
+        # map tile size
+        map_tile_size = self.get_map_tile_size()
+        background = pygame.Surface(self.get_map_size() * map_tile_size)
         for layer in background_layers:
             for (px, py, image) in layer.tiles():
-                area = [px * self.tiled_map.tilewidth,
-                        py * self.tiled_map.tileheight]
+                area = [px * map_tile_size[0], py * map_tile_size[1]]
                 background.blit(image, area)
+        # Downscale the whole background
+        factors = self.get_scale_factors()
+        if factors is not None:
+            image = np.swapaxes(pygame.surfarray.array3d(background), 0, 1)
+            image = image_util.downscale_image(image, factors)
+            background = pygame.Surface(self.get_display_size())
+            pygame.surfarray.blit_array(background, np.swapaxes(image, 0, 1))
         return background
 
     def get_overlays(self):
@@ -167,7 +234,8 @@ class TiledRenderer(TiledLoader):
             dict: A mapping from the name to the sprite.
         """
         # Get the tile dimension
-        tile_dim = [self.tiled_map.tilewidth, self.tiled_map.tileheight]
+        tile_dim = self.get_tile_size().tolist()
+        factors = self.get_scale_factors()
         # Get the overlay layer
         overlay_layers = self.layers['overlay']
         # Get all the overlay images
@@ -194,6 +262,8 @@ class TiledRenderer(TiledLoader):
                                        .format(name, px, py))
                     # Get the image
                     image = pos_to_image[pos]
+                    if factors is not None:
+                        image = downscale_surface(image, factors)
                     # Create a new sprite
                     sprite = OverlaySprite(image, pos, tile_dim)
                     # Save the sprite in the overlays
@@ -211,21 +281,146 @@ class TiledRenderer(TiledLoader):
         dim_2d = self.screen.get_size()
         return [dim_2d[1], dim_2d[0], 3]
 
-    def get_screenshot(self):
+    def create_frame_surface(self, surface):
+        """Create an in-memory surface backed by a frame array.
+
+        The surface shares the memory with "frame", a uint8 array of the BGRA
+        pixels with the shape (height, width, 4), so the screenshots can be
+        viewed without swapping the axes or locking the surface. The pixels
+        have the same byte order as the display surface and are kept opaque,
+        so the sprites are blended the same and as fast. The contents of the
+        given surface are blitted to the new surface.
+
+        Args:
+            surface (pygame.Surface): The surface to copy from, usually the
+                display surface being closed.
+
+        Returns:
+            pygame.Surface: The new surface to be used as "screen".
+        """
+        (width, height) = surface.get_size()
+        self.frame = np.zeros((height, width, 4), dtype=np.uint8)
+        frame_surface = pygame.image.frombuffer(self.frame, (width, height),
+                                                'BGRA')
+        frame_surface.fill([0, 0, 0, 255])
+        frame_surface.blit(surface, [0, 0])
+        self.mark_screen_dirty()
+        # Disable the blending of the alpha bytes when copying the pixels
+        self.frame_source = pygame.image.frombuffer(self.frame,
+                                                    (width, height), 'BGRA')
+        self.frame_source.set_alpha(None)
+        return frame_surface
+
+    def allocate_screenshot(self):
+        """Allocate a buffer for get_screenshot().
+
+        Returns:
+            numpy.ndarray: The uninitialized uint8 buffer in the HWC layout.
+        """
+        return np.empty(self.get_screenshot_dim(), dtype=np.uint8)
+
+    def add_dirty_rects(self, rects):
+        """Record the rectangles drawn on the screen.
+
+        The subclasses call it with the rectangles returned by
+        pygame.sprite.RenderUpdates.draw(), which include the cleared areas,
+        so that the incremental screenshots and the padded screenshot of
+        get_po_screenshots() only copy them.
+
+        Args:
+            rects (list): The list of pygame.Rect.
+        """
+        if self.dirty_rects is not None:
+            self.dirty_rects.extend(rects)
+            if len(self.dirty_rects) > self.max_dirty_rects:
+                self.dirty_rects = None
+        if self.po_dirty_rects is not None:
+            self.po_dirty_rects.extend(rects)
+            if len(self.po_dirty_rects) > self.max_dirty_rects:
+                self.po_dirty_rects = None
+
+    def mark_screen_dirty(self):
+        """Make the next incremental screenshot copy the whole screen.
+
+        Call it after drawing on the screen without add_dirty_rects().
+        """
+        self.dirty_rects = None
+        self.po_dirty_rects = None
+
+    def get_screenshot(self, out=None, incremental=False):
         """Get the full screenshot.
 
         "screen" surface must be rendered first, otherwise the image will be all
         black.
 
+        Args:
+            out (numpy.ndarray): The buffer to write into, e.g. from
+                allocate_screenshot(). A new array is allocated if it's None.
+            incremental (bool): Whether to only copy the rectangles drawn since
+                the last incremental screenshot if it was written into the same
+                buffer, which must not be modified in between.
+
         Returns:
-            numpy.ndarray: The full screenshot.
+            numpy.ndarray: The full screenshot in the HWC layout, "out" if it's
+                given.
         """
-        # Get the entire image
-        image = pygame.surfarray.pixels3d(self.screen)
-        # Swap the axes as the X and Y axes in Pygame and Scipy are opposite
-        image_rotated = np.swapaxes(image, 0, 1)
-        # Copy the array, otherwise the surface will be locked
-        return np.array(image_rotated)
+        if out is None:
+            # A new array has nothing to update incrementally
+            incremental = False
+            out = self.allocate_screenshot()
+        elif out.shape != tuple(self.get_screenshot_dim()):
+            raise ValueError('The buffer shape {} doesn\'t match the screenshot '
+                             'shape {}'.format(out.shape,
+                                               self.get_screenshot_dim()))
+        source = self.frame_source or self.screen
+        if out.dtype == np.uint8 and out.flags.c_contiguous:
+            # Blit to a surface sharing the memory with the buffer, which is
+            # faster than copying the strided pixels by NumPy
+            (height, width) = out.shape[:2]
+            out_surface = pygame.image.frombuffer(out, (width, height), 'RGB')
+            if (incremental and out is self.incremental_out
+                    and self.dirty_rects is not None):
+                out_surface.blits([(source, rect, rect)
+                                   for rect in self.dirty_rects],
+                                  doreturn=False)
+            else:
+                out_surface.blit(source, [0, 0])
+        elif self.frame is not None:
+            np.copyto(out, self.frame[..., 2::-1])
+        else:
+            # Get the entire image
+            image = pygame.surfarray.pixels3d(self.screen)
+            # Swap the axes as the X and Y axes in Pygame and Scipy are
+            # opposite
+            np.copyto(out, np.swapaxes(image, 0, 1))
+            # Release the view, otherwise the surface will be locked
+            del image
+        if incremental:
+            # Start recording the dirty rectangles for the buffer
+            self.incremental_out = out
+            self.dirty_rects = []
+        return out
+
+    def get_screenshot_view(self):
+        """Get the full screenshot as a read-only view.
+
+        The view is only valid until the next rendering, which overwrites it,
+        so it's meant for the callers consuming the frame immediately. Use
+        get_screenshot() to keep the frame.
+
+        Returns:
+            numpy.ndarray: The read-only full screenshot in the HWC layout. It
+                isn't contiguous unless the screen is the display surface.
+        """
+        if self.frame is not None:
+            view = self.frame[..., 2::-1]
+        else:
+            # The display surface can't be shared, copy into a reused buffer
+            if self.view_buffer is None:
+                self.view_buffer = self.allocate_screenshot()
+            view = self.get_screenshot(self.view_buffer, incremental=True).view()
+        view.flags.writeable = False
+        return view
 
     def get_po_screenshot(self, pos, radius):
         """Get the partially observable (po) screenshot.
@@ -284,6 +479,89 @@ class TiledRenderer(TiledLoader):
         # Swap the axes as the X and Y axes in Pygame and Scipy are opposite
         return np.swapaxes(po_screenshot, 0, 1)
 
+    def get_po_screenshots(self, pos_list, radius, out=None):
+        """Get the partially observable (po) screenshots of many positions.
+
+        The screenshot is kept in a buffer padded with "radius" black tiles on
+        each side, where only the rectangles drawn since the last call are
+        updated, and the squares centered at the tiles are gathered from a
+        strided view of it, so each screenshot is the same as
+        get_po_screenshot() of the position.
+
+        Args:
+            pos_list (numpy.ndarray): The tile positions [x, y] inside the map
+                with the shape (pos_size, 2).
+            radius (int): The radius of the partially observable area.
+            out (numpy.ndarray): The buffer to write into. A new array is
+                allocated if it's None.
+
+        Returns:
+            numpy.ndarray: The partially observable screenshots with the shape
+                (pos_size, po_height, po_width, 3), "out" if it's given.
+        """
+        pos_list = np.asarray(pos_list, dtype=np.int64).reshape(-1, 2)
+        map_size = self.get_map_size()
+        if np.any(pos_list < 0) or np.any(pos_list >= map_size):
+            raise ValueError('The positions should be inside the map')
+        (tile_width, tile_height) = self.get_tile_size().tolist()
+        (po_width, po_height) = [(2 * radius + 1) * length
+                                 for length in (tile_width, tile_height)]
+        # Allocate the padded buffer, whose borders stay black
+        (width, height) = self.get_display_size().tolist()
+        padded_shape = (height + po_height - tile_height,
+                        width + po_width - tile_width, 3)
+        if self.po_padded is None or self.po_padded.shape != padded_shape:
+            self.po_padded = np.zeros(padded_shape, dtype=np.uint8)
+            self.po_padded_surface = pygame.image.frombuffer(
+                self.po_padded, padded_shape[1::-1], 'RGB')
+            self.po_dirty_rects = None
+        # Update the screenshot inside the padding
+        source = self.frame_source or self.screen
+        offset = [radius * tile_width, radius * tile_height]
+        if self.po_dirty_rects is None:
+            self.po_padded_surface.blit(source, offset)
+        else:
+            self.po_padded_surface.blits([(source, rect.move(offset), rect)
+                                          for rect in self.po_dirty_rects],
+                                         doreturn=False)
+        self.po_dirty_rects = []
+        # View the padded buffer as the squares indexed by the center tiles
+        strides = self.po_padded.strides
+        squares = np.lib.stride_tricks.as_strided(
+            self.po_padded,
+            shape=(map_size[1], map_size[0], po_height, po_width, 3),
+            strides=(tile_height * strides[0], tile_width * strides[1])
+            + strides, writeable=False)
+        if out is None:
+            return squares[pos_list[:, 1], pos_list[:, 0]]
+        out[...] = squares[pos_list[:, 1], pos_list[:, 0]]
+        return out
+
+
+def downscale_surface(surface, factors):
+    """Downscale a surface by image_util.downscale_image().
+
+    Args:
+        surface (pygame.Surface): The surface to downscale.
+        factors (numpy.ndarray): The integer factors [x, y] dividing the
+            surface size.
+
+    Returns:
+        pygame.Surface: The new downscaled surface with per-pixel alpha.
+    """
+    image = np.dstack([pygame.surfarray.array3d(surface),
+                       pygame.surfarray.array_alpha(surface)])
+    image = image_util.downscale_image(np.swapaxes(image, 0, 1), factors)
+    (height, width) = image.shape[:2]
+    scaled = pygame.Surface([width, height], pygame.SRCALPHA, 32)
+    pixels = pygame.surfarray.pixels3d(scaled)
+    pixels[...] = np.swapaxes(image[..., :3], 0, 1)
+    alpha = pygame.surfarray.pixels_alpha(scaled)
+    alpha[...] = np.swapaxes(image[..., 3], 0, 1)
+    # Release the views, otherwise the surface will be locked
+    del pixels, alpha
+    return scaled
+
 
 class OverlaySprite(pygame.sprite.Sprite):
     # Position on the grid
@@ -0,0 +1,133 @@
+# Native modules
+import asyncio
+import functools
+
+# Project modules
+from pygame_rl.scenario.soccer.observation import copy_observation
+
+
+class AsyncEnv(object):
+    """Asyncio wrapper offloading the environment work to an executor.
+
+    step(), reset() and render() are coroutines running the blocking calls of
+    the wrapped environment in an executor, so that the event loop keeps
+    serving the other environments and the inference requests meanwhile. The
+    calls of one environment never overlap, they're serialized by a lock.
+
+    The thread pool of the event loop is used unless an executor is given. For
+    the work holding the GIL, wrap a SubprocEnv running the environment in a
+    subprocess instead. SubprocVecEnv itself doesn't fit, as it takes a list
+    of actions and returns the batched views of its shared memory.
+    """
+    # Wrapped environment
+    env = None
+
+    # Executor running the blocking calls, None for the default of the loop
+    executor = None
+
+    # Whether to copy the observations, the environments reusing their
+    # observation buffers would otherwise overwrite them in the next step
+    # while the caller is still reading them
+    copy_obs = True
+
+    # Lock serializing the calls of the environment
+    lock = None
+
+    # Pending step started by step_async()
+    pending_step = None
+
+    def __init__(self, env, executor=None, copy_obs=True):
+        self.env = env
+        self.executor = executor
+        self.copy_obs = copy_obs
+        self.lock = asyncio.Lock()
+
+    async def step(self, action):
+        """Step the environment.
+
+        Args:
+            action: The action.
+
+        Returns:
+            tuple: The observation, the reward, the terminal flag and the info
+                dict.
+        """
+        (obs, reward, done, info) = await self._run(self.env.step, action)
+        return self._copy(obs), reward, done, info
+
+    async def reset(self):
+        """Reset the environment.
+
+        Returns:
+            The initial observation.
+        """
+        return self._copy(await self._run(self.env.reset))
+
+    async def render(self):
+        """Render the environment.
+
+        Returns:
+            The rendered frame.
+        """
+        return await self._run(self.env.render)
+
+    def step_async(self, action):
+        """Start stepping the environment without waiting for the result.
+
+        Args:
+            action: The action.
+        """
+        if self.pending_step is not None:
+            raise RuntimeError('step_wait() should be called before starting '
+                               'another step')
+        self.pending_step = asyncio.ensure_future(self.step(action))
+
+    async def step_wait(self):
+        """Wait for the step started by step_async().
+
+        Returns:
+            tuple: See step().
+        """
+        if self.pending_step is None:
+            raise RuntimeError('step_async() should be called first')
+        try:
+            return await self.pending_step
+        finally:
+            self.pending_step = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            return await loop.run_in_executor(
+                self.executor, functools.partial(func, *args))
+
+    def _copy(self, obs):
+        if self.copy_obs:
+            return copy_observation(obs)
+        return obs
+
+
+async def gather_steps(envs, actions):
+    """Step many asynchronous environments concurrently.
+
+    Args:
+        envs (list): The AsyncEnv objects.
+        actions (list): The actions indexed by the environment index.
+
+    Returns:
+        list: The step results of the environments, see AsyncEnv.step().
+    """
+    return await asyncio.gather(*[env.step(action)
+                                  for (env, action) in zip(envs, actions)])
+
+
+async def gather_resets(envs):
+    """Reset many asynchronous environments concurrently.
+
+    Args:
+        envs (list): The AsyncEnv objects.
+
+    Returns:
+        list: The initial observations of the environments.
+    """
+    return await asyncio.gather(*[env.reset() for env in envs])
@@ -0,0 +1,376 @@
+# Native modules
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+import traceback
+
+# Third-party modules
+import numpy as np
+
+
+class SubprocVecEnv(object):
+    """Vectorized environment running each environment in a subprocess.
+
+    The observations, the rewards, the terminal flags and optionally the
+    rendered frames are exchanged through shared memory blocks allocated once
+    by the parent. Each block has the environment index as its first axis,
+    the workers write their rows in place and the parent reads them through
+    NumPy views without copying, so only the actions and the info dicts go
+    through the pipes.
+
+    The layouts of the blocks are taken from the observation and the frame of
+    the first environment, which the worker resets once at the start. The
+    observations may be arrays or nested dicts of arrays with fixed shapes.
+    The returned views are overwritten by the next call, copy them with
+    pygame_rl.scenario.soccer.observation.copy_observation() to keep them.
+    """
+    # Number of environments
+    num_envs = 0
+
+    # Whether to render a frame after each step and reset
+    render_frames = False
+
+    # Whether to reset the ended environments automatically
+    auto_reset = True
+
+    # Worker processes and the parent ends of their pipes
+    processes = None
+    pipes = None
+
+    # Shared memory blocks
+    shared_blocks = None
+
+    # Views of the shared memory blocks with the environment index as the
+    # first axis, the observation is an array or nested dicts of arrays
+    observations = None
+    rewards = None
+    dones = None
+    frames = None
+
+    # Whether the workers have been closed
+    closed = False
+
+    def __init__(self, env_fns, render_frames=False, auto_reset=True,
+                 start_method=None):
+        """Start the workers and allocate the shared memory blocks.
+
+        Args:
+            env_fns (list): The callables creating the loaded environments,
+                one for each worker. They must be picklable unless the start
+                method is "fork".
+            render_frames (bool): Whether to render a frame after each step and
+                reset.
+            auto_reset (bool): Whether to reset the ended environments
+                automatically. The last observation before the reset is given
+                as "terminal_observation" in the info dict.
+            start_method (str): The multiprocessing start method, the default
+                of the platform if it's not given.
+        """
+        self.num_envs = len(env_fns)
+        self.render_frames = render_frames
+        self.auto_reset = auto_reset
+        context = multiprocessing.get_context(start_method)
+        # Share the resource tracker of the parent with the workers, otherwise
+        # the forked workers start their own trackers which unlink the blocks
+        # when the workers exit
+        resource_tracker.ensure_running()
+        self.processes = []
+        self.pipes = []
+        for (env_index, env_fn) in enumerate(env_fns):
+            (parent_pipe, worker_pipe) = context.Pipe()
+            process = context.Process(
+                target=_run_worker,
+                args=(env_index, env_fn, worker_pipe, render_frames,
+                      auto_reset),
+                daemon=True)
+            process.start()
+            worker_pipe.close()
+            self.processes.append(process)
+            self.pipes.append(parent_pipe)
+        self.shared_blocks = []
+        try:
+            self._init_blocks()
+        except Exception:
+            self.close()
+            raise
+
+    def _init_blocks(self):
+        # Allocate the blocks from the layout of the first environment
+        layouts = [_receive(pipe) for pipe in self.pipes]
+        for (env_index, layout) in enumerate(layouts):
+            if layout != layouts[0]:
+                raise ValueError('Environment {} has a different observation '
+                                 'or frame layout from environment 0'.format(
+                                     env_index))
+        block_specs = []
+        (obs_layout, frame_layout) = layouts[0]
+        obs_specs = [(path, self._allocate(shape, dtype))
+                     for (path, shape, dtype) in obs_layout]
+        self.observations = _unflatten(
+            [(path, view) for (path, (_, view)) in obs_specs])
+        block_specs.append([(path, spec) for (path, (spec, _)) in obs_specs])
+        (reward_spec, self.rewards) = self._allocate((), np.float64)
+        (done_spec, self.dones) = self._allocate((), np.bool_)
+        block_specs.extend([reward_spec, done_spec])
+        if self.render_frames:
+            (frame_spec, self.frames) = self._allocate(*frame_layout)
+            block_specs.append(frame_spec)
+        else:
+            block_specs.append(None)
+        for pipe in self.pipes:
+            pipe.send(block_specs)
+        for pipe in self.pipes:
+            _receive(pipe)
+
+    def step(self, actions):
+        """Step all the environments.
+
+        Args:
+            actions (list): The actions indexed by the environment index.
+
+        Returns:
+            tuple: The observations, the rewards, the terminal flags and the
+                list of the info dicts.
+        """
+        for (pipe, action) in zip(self.pipes, actions):
+            pipe.send(('step', action))
+        infos = [_receive(pipe) for pipe in self.pipes]
+        return self.observations, self.rewards, self.dones, infos
+
+    def reset(self, indexes=None):
+        """Reset the environments.
+
+        Args:
+            indexes (list): The environment indexes to reset, all the
+                environments if it's not given.
+
+        Returns:
+            The observations.
+        """
+        if indexes is None:
+            indexes = range(self.num_envs)
+        for env_index in indexes:
+            self.pipes[env_index].send(('reset', None))
+        for env_index in indexes:
+            _receive(self.pipes[env_index])
+        return self.observations
+
+    def close(self):
+        """Stop the workers and release the shared memory blocks."""
+        if self.closed:
+            return
+        for pipe in self.pipes:
+            try:
+                pipe.send(('close', None))
+            except BrokenPipeError:
+                # The worker has exited after an error
+                pass
+        for process in self.processes:
+            process.join()
+        for pipe in self.pipes:
+            pipe.close()
+        # Drop the views before closing the blocks which they refer to
+        self.observations = None
+        self.rewards = None
+        self.dones = None
+        self.frames = None
+        for block in self.shared_blocks:
+            block.close()
+            block.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _allocate(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        shape = (self.num_envs,) + tuple(shape)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        self.shared_blocks.append(block)
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        view.fill(0)
+        return ((block.name, shape, dtype.str), view)
+
+
+class SubprocEnv(object):
+    """Single environment running in a subprocess.
+
+    An adapter of a SubprocVecEnv of one environment with the interface of the
+    wrapped environment: step() takes one action and returns the observation,
+    the reward, the terminal flag and the info dict of that environment. The
+    observations and the frames are copied out of the shared memory, so they
+    can be kept, and the environment isn't reset automatically. It can be
+    wrapped by AsyncEnv to step the engine outside the GIL of the event loop.
+    """
+    # Vectorized environment of the one environment
+    vec_env = None
+
+    def __init__(self, env_fn, render_frames=False, start_method=None):
+        """Start the worker.
+
+        Args:
+            env_fn (callable): The callable creating the loaded environment.
+            render_frames (bool): Whether to render a frame after each step and
+                reset, which is required by render().
+            start_method (str): See SubprocVecEnv.
+        """
+        self.vec_env = SubprocVecEnv([env_fn], render_frames=render_frames,
+                                     auto_reset=False,
+                                     start_method=start_method)
+
+    def step(self, action):
+        """Step the environment.
+
+        Args:
+            action: The action.
+
+        Returns:
+            tuple: The observation, the reward, the terminal flag and the info
+                dict.
+        """
+        (obs, rewards, dones, infos) = self.vec_env.step([action])
+        return (self._get_obs(obs), float(rewards[0]), bool(dones[0]),
+                infos[0])
+
+    def reset(self):
+        """Reset the environment.
+
+        Returns:
+            The initial observation.
+        """
+        return self._get_obs(self.vec_env.reset())
+
+    def render(self):
+        """Get the frame rendered after the last step or reset.
+
+        Returns:
+            numpy.ndarray: The copied frame.
+        """
+        if not self.vec_env.render_frames:
+            raise RuntimeError('render_frames should be enabled to render')
+        return np.array(self.vec_env.frames[0])
+
+    def close(self):
+        """Stop the worker and release the shared memory blocks."""
+        self.vec_env.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _get_obs(observations):
+        return _unflatten([(path, np.array(value[0]))
+                           for (path, value) in _flatten(observations)])
+
+
+def _run_worker(env_index, env_fn, pipe, render_frames, auto_reset):
+    try:
+        _serve(env_index, env_fn, pipe, render_frames, auto_reset)
+    except Exception:  # pylint: disable=broad-except
+        pipe.send(('error', traceback.format_exc()))
+    finally:
+        pipe.close()
+
+
+def _serve(env_index, env_fn, pipe, render_frames, auto_reset):
+    env = env_fn()
+    # Report the layout of the observation and the frame
+    obs = env.reset()
+    frame = np.asarray(env.render()) if render_frames else None
+    obs_layout = [(path, np.shape(value), np.asarray(value).dtype.str)
+                  for (path, value) in _flatten(obs)]
+    frame_layout = (frame.shape, frame.dtype.str) if render_frames else None
+    pipe.send(('ok', (obs_layout, frame_layout)))
+    # Attach the rows of the blocks
+    (obs_specs, reward_spec, done_spec, frame_spec) = pipe.recv()
+    blocks = []
+
+    def attach(spec):
+        (name, shape, dtype) = spec
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        # Slice the row as a view even if it's a scalar
+        return array[env_index:env_index + 1].reshape(shape[1:])
+
+    obs_views = [(path, attach(spec)) for (path, spec) in obs_specs]
+    reward_view = attach(reward_spec)
+    done_view = attach(done_spec)
+    frame_view = attach(frame_spec) if frame_spec else None
+
+    def write(obs):
+        for ((_, view), (_, value)) in zip(obs_views, _flatten(obs)):
+            view[...] = value
+        if frame_view is not None:
+            frame_view[...] = env.render()
+
+    write(obs)
+    pipe.send(('ok', None))
+    # Serve the commands
+    while True:
+        (command, data) = pipe.recv()
+        if command == 'step':
+            (obs, reward, done, info) = env.step(data)
+            reward_view[...] = reward
+            done_view[...] = done
+            if done and auto_reset:
+                info = dict(info)
+                info['terminal_observation'] = _unflatten(
+                    [(path, np.array(value)) for (path, value)
+                     in _flatten(obs)])
+                obs = env.reset()
+            write(obs)
+            pipe.send(('ok', info))
+        elif command == 'reset':
+            write(env.reset())
+            reward_view[...] = 0.0
+            done_view[...] = False
+            pipe.send(('ok', None))
+        elif command == 'close':
+            break
+    # Drop the views before closing the blocks which they refer to
+    del obs_views, reward_view, done_view, frame_view
+    for block in blocks:
+        block.close()
+    env.close()
+
+
+def _receive(pipe):
+    """Receive a reply of a worker and raise its error if it has failed.
+    """
+    (status, data) = pipe.recv()
+    if status == 'error':
+        raise RuntimeError('The worker has failed:\n{}'.format(data))
+    return data
+
+
+def _flatten(obs, path=()):
+    """Flatten an observation into the pairs of the key paths and the arrays.
+    """
+    if isinstance(obs, dict):
+        pairs = []
+        for key in sorted(obs):
+            pairs.extend(_flatten(obs[key], path + (key,)))
+        return pairs
+    return [(path, obs)]
+
+
+def _unflatten(pairs):
+    """Build an observation from the pairs of the key paths and the arrays.
+    """
+    if len(pairs) == 1 and pairs[0][0] == ():
+        return pairs[0][1]
+    obs = {}
+    for (path, value) in pairs:
+        node = obs
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return obs
@@ -104,6 +104,8 @@ class GridworldV0(gym.Env):
             self.env_options.map_path, self, self.renderer_options)
         # Load the renderer
         self.renderer.load()
+        # Initialize object indexes to know the observation size
+        self._init_object_indexes()
         # Initialize observation space
         self._init_obs_space()
         # Initialize action space
@@ -148,7 +150,7 @@ class GridworldV0(gym.Env):
         map_width = map_size[1]
         flattened_map_size = map_size.prod()
         obs = np.zeros(
-            [flattened_map_size, self.total_object_num], dtype=np.int)
+            [flattened_map_size, self.total_object_num], dtype=np.int64)
         for group_name, positions in self.state.items():
             for local_index, pos in enumerate(positions):
                 index_1d = index_2d_to_1d(pos, map_width)
@@ -159,4 +161,4 @@ class GridworldV0(gym.Env):
 
 def index_2d_to_1d(pos, width):
     px, py = pos
-    return np.asscalar((width * py) + px)
+    return int((width * py) + px)
@@ -35,6 +35,11 @@ class GridworldV1(gym.Env):
     map_data = None
     # Renderer
     renderer = None
+    # Caller-provided frame buffer allocated by the allocate_screenshot() of
+    # the renderer, the observations are written into it instead of new
+    # arrays if it's set. Only the areas drawn since the last frame are
+    # copied into it, so it must not be modified by the caller
+    frame_buffer = None
 
     ############################################################################
     # State
@@ -89,7 +94,8 @@ class GridworldV1(gym.Env):
         # Render
         self.renderer.render()
         # Return renderer sceenshot
-        return self.renderer.get_screenshot()
+        return self.renderer.get_screenshot(self.frame_buffer,
+                                            incremental=True)
 
     ############################################################################
     # Initialization Methods
@@ -140,9 +146,10 @@ class GridworldV1(gym.Env):
         # Render
         self.renderer.render()
         # Return renderer sceenshot
-        return self.renderer.get_screenshot()
+        return self.renderer.get_screenshot(self.frame_buffer,
+                                            incremental=True)
 
 
 def index_2d_to_1d(pos, width):
     px, py = pos
-    return np.asscalar((width * py) + px)
+    return int((width * py) + px)
@@ -32,11 +32,11 @@ class GridworldRenderer(pygame_renderer.TiledRenderer):
     dirty_groups = None
 
     def __init__(self, map_path, env, renderer_options=None):
-        super().__init__(map_path)
-        # Save the environment
-        self.env = env
         # Use or create the renderer options
         self.renderer_options = renderer_options or RendererOptions()
+        super().__init__(map_path, self.renderer_options.tile_size)
+        # Save the environment
+        self.env = env
 
     def load(self):
         # Initialize Pygame
@@ -67,17 +67,18 @@ class GridworldRenderer(pygame_renderer.TiledRenderer):
         # Create the clock
         self.clock = pygame.time.Clock()
 
-    def render(self):
         # Close the display if the renderer options is set to disable the
         # display
         if not self.display_quitted and not self.renderer_options.show_display:
-            # Replace the screen surface with in-memory surface
-            self.screen = self.screen.copy()
+            # Replace the screen surface with in-memory surface backed by the
+            # frame array
+            self.screen = self.create_frame_surface(self.screen)
             # Close the display
             pygame.display.quit()
             # Prevent from further closing
             self.display_quitted = True
 
+    def render(self):
         # Clear the overlays
         self.dirty_groups.clear(self.screen, self.background)
 
@@ -86,6 +87,7 @@ class GridworldRenderer(pygame_renderer.TiledRenderer):
 
         # Draw the overlays
         dirty = self.dirty_groups.draw(self.screen)
+        self.add_dirty_rects(dirty)
 
         # Update only the dirty surface
         if self.renderer_options.show_display:
@@ -130,6 +132,7 @@ class GridworldRenderer(pygame_renderer.TiledRenderer):
 
             # Draw the overlays
             dirty = self.dirty_groups.draw(self.screen)
+            self.add_dirty_rects(dirty)
 
             # Update only the dirty surface
             if self.renderer_options.show_display:
@@ -166,11 +169,16 @@ class RendererOptions(object):
     show_display = False
     max_fps = 0
     enable_key_events = False
+    # Rendered tile width and height in pixels dividing the tile size of the
+    # map, the tiles are prescaled at loading, None to keep the map tile size
+    tile_size = None
 
-    def __init__(self, show_display=False, max_fps=0, enable_key_events=False):
+    def __init__(self, show_display=False, max_fps=0, enable_key_events=False,
+                 tile_size=None):
         self.show_display = show_display
         self.max_fps = max_fps
         self.enable_key_events = enable_key_events
+        self.tile_size = tile_size
 
 
 def copy_static_overlay(static_overlay):
@@ -334,7 +334,7 @@ class PredatorPreyEnvironment(environment.Environment):
         return predator_count >= 2 and prey_count >= 1
 
     def _is_distance_in_po(self, pos1, pos2):
-        distance = get_pos_distance(pos1, pos2)
+        distance = self.map_data.get_pos_distance(pos1, pos2)
         po_distance = self.options.po_radius
         return distance <= po_distance
 
@@ -439,7 +439,7 @@ class PredatorPreyEnvironment(environment.Environment):
             else:
                 moved_pos_list[action_index] = pos_move
         # Calculate distances for each moved position
-        distances = [get_pos_distance(moved_pos, pos_ref)
+        distances = [self.map_data.get_pos_distance(moved_pos, pos_ref)
                      for moved_pos in moved_pos_list]
         return distances
 
@@ -563,17 +563,47 @@ class PredatorPreyEnvironmentOptions(object):
 class PredatorPreyMapData(object):
     """The map data as the geographical info.
     """
+    # Map size
+    map_size = None
     # Tile positions
     field = []
+    # Euclidean distances indexed by the absolute offsets "|dx|, |dy|" between
+    # the cells with the shape (map_width, map_height)
+    offset_distance = None
 
     def __init__(self, map_path):
         # Create a tile data and load
         tiled_data = pygame_renderer.TiledData(map_path)
         tiled_data.load()
+        # Get the map size
+        self.map_size = tiled_data.get_map_size()
         # Get the background tile positions
         tile_pos = tiled_data.get_tile_positions()
         # Build the tile positions
         self.field = tile_pos['ground']['FIELD']
+        # Build the offset distance table
+        self._init_offset_distance()
+
+    def get_pos_distance(self, pos1, pos2):
+        """Get the Euclidean distance between the positions inside the map.
+
+        Args:
+            pos1 (list): The first position.
+            pos2 (list): The second position.
+
+        Returns:
+            float: The distance looked up from the offset distance table.
+        """
+        return self.offset_distance[abs(pos2[0] - pos1[0]),
+                                    abs(pos2[1] - pos1[1])]
+
+    def _init_offset_distance(self):
+        (map_width, map_height) = self.map_size
+        # Calculate the distance of each absolute offset with the same function
+        # as get_pos_distance() so that the looked up values are identical
+        self.offset_distance = np.array(
+            [[get_pos_distance([0, 0], [dx, dy]) for dy in range(map_height)]
+             for dx in range(map_width)])
 
 
 class PredatorPreyObservation(object):
@@ -843,7 +873,8 @@ class PredatorPreyState(object):
         total_object_size = self.env_options.get_total_object_size()
         for object_index in range(total_object_size):
             object_pos = self.get_object_pos(object_index)
-            if object_pos and get_pos_distance(pos, object_pos) < 2:
+            if (object_pos
+                    and self.map_data.get_pos_distance(pos, object_pos) < 2):
                 return False
         return True
 
@@ -7,3 +7,7 @@ env_reg.register(
     id='soccer-v0',
     entry_point='pygame_rl.scenario.soccer.envs:SoccerV0',
 )
+env_reg.register(
+    id='soccer-vec-v0',
+    entry_point='pygame_rl.scenario.soccer.envs:SoccerVecV0',
+)
@@ -0,0 +1,256 @@
+# Third-party modules
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.ai_modes import AiModes
+from pygame_rl.scenario.soccer.spatial_index import GridBucketIndex
+
+
+class AiEvaluator(object):
+    """Rule-based soccer AI evaluated for all the agents at once.
+
+    The agent statuses are given as arrays with the shape (game_size,
+    agent_size[, 2]), so that the actions of every agent in every game are
+    computed with array operations. The strategies are the same as the ones in
+    SoccerV0:
+
+    * Defensive with the ball: Avoid the nearest opponent.
+    * Defensive without the ball: Approach the opponent goal position nearest
+      to the defensive target.
+    * Offensive with the ball: Approach the own goal position furthest from the
+      nearest opponent.
+    * Offensive without the ball: Intercept the defensive target.
+
+    The defensive target is the opponent who has the ball, or the nearest
+    opponent if the team has the ball.
+    """
+    # Map data
+    map_data = None
+
+    # Environment options
+    options = None
+
+    # Team index of each agent
+    agent_team = None
+
+    # Whether the agents are opponents of each other with the shape
+    # (agent_size, agent_size)
+    opponent_mask = None
+
+    # Candidate actions except NOOP
+    candidate_actions = None
+
+    # Grid-bucket index to find the nearest opponents, None to scan all the
+    # opponents
+    spatial_index = None
+
+    def __init__(self, map_data, options):
+        self.map_data = map_data
+        self.options = options
+        self.agent_team = np.arange(options.agent_size) // options.team_size
+        self.opponent_mask = (self.agent_team[:, None]
+                              != self.agent_team[None, :])
+        self.candidate_actions = np.arange(1, len(Actions))
+        if options.spatial_index:
+            self.spatial_index = GridBucketIndex(map_data.map_size,
+                                                 self.agent_team)
+
+    def get_actions(self, agent_pos, agent_ball, agent_mode, random_state,
+                    mask=None):
+        """Get the AI actions.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (game_size, agent_size, 2).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (game_size, agent_size).
+            agent_mode (numpy.ndarray): The agent modes with the shape
+                (game_size, agent_size).
+            random_state (BlockRandom): The random state to break
+                the ties.
+            mask (numpy.ndarray): The agents to compute the actions for with
+                the shape (game_size, agent_size). All the agents are computed
+                if it's not given.
+
+        Returns:
+            numpy.ndarray: The actions with the shape (game_size, agent_size).
+                The agents not in the mask get NOOP.
+        """
+        if mask is None:
+            mask = np.ones(agent_ball.shape, dtype=np.bool_)
+        actions = np.zeros(agent_ball.shape, dtype=np.int64)
+        (game_index, agent_index) = np.nonzero(mask)
+        if len(game_index) <= 0:
+            return actions
+        # Get the target cells and the strategic modes
+        agent_cell = self.map_data.get_cell_ids(agent_pos)
+        (target_cell, strategic_mode) = self.get_targets(
+            agent_cell, agent_ball, agent_mode, game_index, agent_index)
+        # Draw the fallback actions and the priorities to break the ties
+        fallback_index = random_state.randint(
+            len(self.candidate_actions), size=len(game_index))
+        priority = random_state.random_sample(
+            (len(game_index), len(self.candidate_actions)))
+        # Get the strategic actions
+        actions[game_index, agent_index] = self.get_strategic_actions(
+            agent_cell[game_index, agent_index], target_cell, strategic_mode,
+            fallback_index, priority)
+        return actions
+
+    def get_targets(self, agent_cell, agent_ball, agent_mode, game_index,
+                    agent_index):
+        """Get the target cells and the strategic modes.
+
+        Args:
+            agent_cell (numpy.ndarray): The agent cell IDs with the shape
+                (game_size, agent_size).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (game_size, agent_size).
+            agent_mode (numpy.ndarray): The agent modes with the shape
+                (game_size, agent_size).
+            game_index (numpy.ndarray): The game indexes of the agents to
+                compute.
+            agent_index (numpy.ndarray): The agent indexes of the agents to
+                compute.
+
+        Returns:
+            tuple: The target cell IDs with the shape (size,) and the strategic
+                modes with the shape (size,).
+        """
+        team = self.agent_team[agent_index]
+        # Get the nearest opponent of each agent
+        nearest_opponent_index = self.get_nearest_opponents(
+            agent_cell, game_index, agent_index)
+        nearest_opponent_cell = agent_cell[game_index, nearest_opponent_index]
+        # Get the defensive target
+        has_ball_agent_index = np.argmax(agent_ball[game_index], axis=1)
+        has_ball_opponent = self.agent_team[has_ball_agent_index] != team
+        defensive_target_cell = np.where(
+            has_ball_opponent, agent_cell[game_index, has_ball_agent_index],
+            nearest_opponent_cell)
+        # Look up the opponent goal cells nearest to the defensive targets and
+        # the own goal cells furthest from the nearest opponents
+        nearest_goal_cell = self.map_data.nearest_goal_cell[
+            1 - team, defensive_target_cell]
+        furthest_goal_cell = self.map_data.furthest_goal_cell[
+            team, nearest_opponent_cell]
+        # Calculate the target cells and the strategic modes
+        has_ball = agent_ball[game_index, agent_index]
+        defensive = agent_mode[game_index, agent_index] == AgentModes.DEFENSIVE
+        target_cell = np.where(
+            defensive,
+            np.where(has_ball, nearest_opponent_cell, nearest_goal_cell),
+            np.where(has_ball, furthest_goal_cell, defensive_target_cell))
+        strategic_mode = np.where(
+            defensive,
+            np.where(has_ball, AiModes.AVOID, AiModes.APPROACH),
+            np.where(has_ball, AiModes.APPROACH, AiModes.INTERCEPT))
+        return (target_cell, strategic_mode)
+
+    def get_nearest_opponents(self, agent_cell, game_index, agent_index):
+        """Get the nearest opponents of the agents.
+
+        The spatial index is rebuilt and queried for all the agents at once if
+        it's enabled, otherwise the row of the pairwise distances is scanned
+        for each agent. The lowest agent index wins the ties in both ways.
+
+        Args:
+            agent_cell (numpy.ndarray): The agent cell IDs with the shape
+                (game_size, agent_size).
+            game_index (numpy.ndarray): The game indexes of the agents to
+                compute.
+            agent_index (numpy.ndarray): The agent indexes of the agents to
+                compute.
+
+        Returns:
+            numpy.ndarray: The agent indexes of the nearest opponents.
+        """
+        source_cell = agent_cell[game_index, agent_index]
+        if self.spatial_index is not None:
+            cell_pos = self.map_data.cell_pos
+            self.spatial_index.build(cell_pos[agent_cell])
+            return self.spatial_index.get_nearest_agents(
+                game_index, cell_pos[source_cell],
+                1 - self.agent_team[agent_index])
+        dist = self.map_data.get_cell_distances(source_cell[:, None],
+                                                agent_cell[game_index])
+        dist = np.where(self.opponent_mask[agent_index], dist, np.inf)
+        return np.argmin(dist, axis=1)
+
+    def get_strategic_actions(self, source_cell, target_cell, strategic_mode,
+                              fallback_index, priority):
+        """Get the strategic actions.
+
+        See get_best_candidates() for the candidate moves to choose from. The
+        ties are broken by the priorities, and the fallback action is chosen
+        if no candidates are found.
+
+        Args:
+            source_cell (numpy.ndarray): The agent cell IDs with the shape
+                (size,).
+            target_cell (numpy.ndarray): The target cell IDs with the shape
+                (size,).
+            strategic_mode (numpy.ndarray): The strategic modes with the shape
+                (size,).
+            fallback_index (numpy.ndarray): The candidate indexes of the
+                fallback actions with the shape (size,).
+            priority (numpy.ndarray): The priorities of the candidate actions
+                with the shape (size, candidate size). The best candidate with
+                the smallest priority wins.
+
+        Returns:
+            numpy.ndarray: The actions with the shape (size,).
+        """
+        best = self.get_best_candidates(source_cell, target_cell,
+                                        strategic_mode)
+        found = np.any(best, axis=1)
+        best_priority = np.where(best, priority, np.inf)
+        candidate_index = np.where(found, np.argmin(best_priority, axis=1),
+                                   fallback_index)
+        return self.candidate_actions[candidate_index]
+
+    def get_best_candidates(self, source_cell, target_cell, strategic_mode):
+        """Get the best candidate moves.
+
+        Among the walkable moves, the ones which get the shortest (APPROACH,
+        INTERCEPT) or the longest (AVOID) Euclidean distance to the target are
+        the best. INTERCEPT only accepts the distances greater than or equal to
+        1. A move is accepted only if it gets strictly closer or further than
+        the original distance.
+
+        Args:
+            source_cell (numpy.ndarray): The agent cell IDs with the shape
+                (size,).
+            target_cell (numpy.ndarray): The target cell IDs with the shape
+                (size,).
+            strategic_mode (numpy.ndarray): The strategic modes with the shape
+                (size,).
+
+        Returns:
+            numpy.ndarray: Whether the candidates are the best with the shape
+                (size, candidate size). A row is all False if no moves are
+                accepted.
+        """
+        moved_cell = self.map_data.moved_cell[source_cell[:, None],
+                                              self.candidate_actions]
+        walkable = moved_cell >= 0
+        moved_cell = np.where(walkable, moved_cell, source_cell[:, None])
+        orig_dist = self.map_data.get_cell_distances(source_cell,
+                                                     target_cell)[:, None]
+        moved_dist = self.map_data.get_cell_distances(moved_cell,
+                                                      target_cell[:, None])
+        # Accept the walkable moves improving the distance
+        avoid = (strategic_mode == AiModes.AVOID)[:, None]
+        intercept = (strategic_mode == AiModes.INTERCEPT)[:, None]
+        closer = moved_dist < orig_dist
+        further = moved_dist > orig_dist
+        accepted = np.where(
+            avoid, further, closer & (~intercept | (moved_dist >= 1.0)))
+        accepted &= walkable
+        # Use the negative distances to find the furthest moves
+        score = np.where(avoid, -moved_dist, moved_dist)
+        score = np.where(accepted, score, np.inf)
+        best_score = np.min(score, axis=1)
+        return accepted & (score == best_score[:, None])
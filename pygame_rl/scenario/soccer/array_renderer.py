@@ -0,0 +1,131 @@
+# Third-party modules
+import numpy as np
+
+# User-defined modules
+from pygame_rl.renderer.array_renderer import TiledArrayRenderer
+
+
+class ArrayRenderer(TiledArrayRenderer):
+    """Soccer renderer compositing the frames by NumPy.
+
+    The frames are pixel-identical to the ones of Renderer, but no display,
+    surface or event is involved. render_states() renders many games at once.
+    """
+    # Environment
+    env = None
+
+    # Frame of the environment state with the shape (1, height, width, 3)
+    frame = None
+
+    # Agent positions drawn in the frame with the shape (1, agent_size, 2),
+    # None if the frame isn't drawn yet
+    frame_agent_pos = None
+
+    # Grid positions of the tiles redrawn since the last incremental
+    # screenshot, None if the whole frame has to be copied
+    dirty_pos = None
+
+    # Buffer of the last incremental screenshot
+    incremental_out = None
+
+    # Sprite indexes of each agent without and with the ball with the shape
+    # (agent_size, 2)
+    agent_sprites = None
+
+    def __init__(self, map_path, env, tile_size=None):
+        super().__init__(map_path, tile_size)
+        # Save the environment
+        self.env = env
+
+    def load(self):
+        super().load()
+        self.frame = self.allocate_frames(1)
+        agent_size = self.env.options.agent_size
+        self.agent_sprites = np.array(
+            [[self.overlays['AGENT{}'.format(agent_index + 1)],
+              self.overlays['AGENT{}_BALL'.format(agent_index + 1)]]
+             for agent_index in range(agent_size)], dtype=np.int64)
+
+    def render(self):
+        state = self.env.state
+        # Only redraw the tiles of the agents drawn before
+        self.render_states(state.agent_pos[None], state.agent_ball[None],
+                           self.frame, self.frame_agent_pos)
+        if self.frame_agent_pos is None:
+            self.dirty_pos = None
+        elif self.dirty_pos is not None:
+            # Both the restored and the redrawn tiles have changed
+            self.dirty_pos.update(map(tuple, self.frame_agent_pos[0].tolist()))
+            self.dirty_pos.update(map(tuple, state.agent_pos.tolist()))
+        self.frame_agent_pos = np.array(state.agent_pos[None])
+        # Indicate the rendering should continue
+        return True
+
+    def render_states(self, agent_pos, agent_ball, out=None, dirty_pos=None):
+        """Render the frames of many games.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (game_size, agent_size, 2).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (game_size, agent_size).
+            out (numpy.ndarray): The buffer to write into, see compose().
+            dirty_pos (numpy.ndarray): The agent positions previously drawn in
+                "out", see compose().
+
+        Returns:
+            numpy.ndarray: The frames with the shape (game_size, height, width,
+                3).
+        """
+        agent_ball = np.asarray(agent_ball, dtype=np.int64)
+        agent_indexes = np.arange(agent_ball.shape[1])
+        sprite_indexes = self.agent_sprites[agent_indexes, agent_ball]
+        return self.compose(sprite_indexes, agent_pos, out, dirty_pos)
+
+    def allocate_screenshot(self):
+        return np.empty(self.get_screenshot_dim(), dtype=np.uint8)
+
+    def get_screenshot(self, out=None, incremental=False):
+        """Get the full screenshot.
+
+        Args:
+            out (numpy.ndarray): The buffer to write into. A new array is
+                allocated if it's None.
+            incremental (bool): Whether to only copy the tiles redrawn since
+                the last incremental screenshot if it was written into the same
+                buffer, which must not be modified in between.
+
+        Returns:
+            numpy.ndarray: The full screenshot in the HWC layout, "out" if it's
+                given.
+        """
+        if out is None:
+            # A new array has nothing to update incrementally
+            incremental = False
+            out = self.allocate_screenshot()
+        frame = self.frame[0]
+        if (incremental and out is self.incremental_out
+                and self.dirty_pos is not None):
+            (tile_width, tile_height) = self.get_tile_size().tolist()
+            for (px, py) in self.dirty_pos:
+                area = (slice(py * tile_height, (py + 1) * tile_height),
+                        slice(px * tile_width, (px + 1) * tile_width))
+                out[area] = frame[area]
+        else:
+            np.copyto(out, frame)
+        if incremental:
+            # Start recording the dirty tiles for the buffer
+            self.incremental_out = out
+            self.dirty_pos = set()
+        return out
+
+    def get_screenshot_view(self):
+        """Get the full screenshot as a read-only view.
+
+        Returns:
+            numpy.ndarray: The read-only full screenshot in the HWC layout,
+                which is overwritten by the next rendering.
+        """
+        view = self.frame[0].view()
+        view.flags.writeable = False
+        return view
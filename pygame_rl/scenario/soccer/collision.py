@@ -0,0 +1,77 @@
+# Third-party modules
+import numpy as np
+
+
+def resolve_collisions(old_cells, new_cells, agent_ball, cell_size,
+                       random_state):
+    """Resolve the collisions of the agent moves in all the games at once.
+
+    The agents moving to the same cell go back to their old cells, which may
+    cause the other agents moving there to go back as well, so the passes are
+    repeated until no agents overlap. Each pass is a bincount over the flat
+    cell-id occupancy array of all the games, and the old cells never overlap,
+    so each pass fixes at least one more agent and the number of passes is
+    bounded by the agent size.
+
+    On the first pass where the agent who has the ball overlaps with the other
+    agents, the ball is switched to one of them uniformly at random, in the
+    ascending order of the agent indexes. The ball is switched at most once in
+    each game.
+
+    Args:
+        old_cells (numpy.ndarray): The non-overlapping cell IDs before the
+            moves with the shape (game_size, agent_size).
+        new_cells (numpy.ndarray): The intended cell IDs with the shape
+            (game_size, agent_size).
+        agent_ball (numpy.ndarray): The ball possessions with the shape
+            (game_size, agent_size). Exactly one agent has the ball in each
+            game.
+        cell_size (int): The number of the cells in a map.
+        random_state (BlockRandom): The random state to switch
+            the ball.
+
+    Returns:
+        tuple: The resolved cell IDs with the shape (game_size, agent_size),
+            and the agent indexes receiving the ball with the shape
+            (game_size,), -1 if the ball isn't switched.
+    """
+    (game_size, agent_size) = new_cells.shape
+    game_indexes = np.arange(game_size)
+    # Offset the cell IDs by the game index so that the agents in different
+    # games never overlap
+    game_offsets = cell_size * game_indexes[:, None]
+    old_cells = old_cells + game_offsets
+    new_cells = new_cells + game_offsets
+    has_ball_agent_index = np.argmax(agent_ball, axis=1)
+    switch_agent_index = np.full(game_size, -1, dtype=np.int64)
+    for _ in range(agent_size):
+        counts = np.bincount(new_cells.ravel(),
+                             minlength=game_size * cell_size)
+        overlapping = counts[new_cells] > 1
+        if not np.any(overlapping):
+            break
+        # Switch the ball only once in each game
+        switching = (overlapping[game_indexes, has_ball_agent_index]
+                     & (switch_agent_index < 0))
+        if np.any(switching):
+            switching_games = np.flatnonzero(switching)
+            switch_agent_index[switching_games] = _choose_receivers(
+                new_cells[switching_games],
+                has_ball_agent_index[switching_games], random_state)
+        # Use the old positions
+        new_cells = np.where(overlapping, old_cells, new_cells)
+    return (new_cells - game_offsets, switch_agent_index)
+
+
+def _choose_receivers(cells, has_ball_agent_index, random_state):
+    size = len(has_ball_agent_index)
+    # Find the agents without the ball sharing the cell with the agent who has
+    # the ball
+    has_ball_cells = cells[np.arange(size), has_ball_agent_index]
+    candidates = cells == has_ball_cells[:, None]
+    candidates[np.arange(size), has_ball_agent_index] = False
+    # Choose one of them at random
+    candidate_num = np.count_nonzero(candidates, axis=1)
+    rand_idx = random_state.randint(candidate_num)
+    rank = np.cumsum(candidates, axis=1) - 1
+    return np.argmax(candidates & (rank == rand_idx[:, None]), axis=1)
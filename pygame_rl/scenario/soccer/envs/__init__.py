@@ -1 +1,2 @@
 from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.envs.soccer_vec_v0 import SoccerVecV0
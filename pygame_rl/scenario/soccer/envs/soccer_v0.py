@@ -4,13 +4,16 @@ import numpy as np
 
 # Project modules
 from pygame_rl.scenario.soccer.actions import Actions
-from pygame_rl.scenario.soccer.agent_modes import AgentModes
-from pygame_rl.scenario.soccer.ai_modes import AiModes
+from pygame_rl.scenario.soccer.ai_evaluator import AiEvaluator
+from pygame_rl.scenario.soccer.array_renderer import ArrayRenderer
+from pygame_rl.scenario.soccer.collision import resolve_collisions
 from pygame_rl.scenario.soccer.map_data import MapData
 from pygame_rl.scenario.soccer.options import Options
 from pygame_rl.scenario.soccer.renderer import Renderer
 from pygame_rl.scenario.soccer.state import State
 from pygame_rl.scenario.soccer.teams import Teams
+from pygame_rl.util.block_random import BlockRandom
+from pygame_rl.util.step_profiler import StepProfiler
 
 
 class SoccerV0(gym.Env):
@@ -35,34 +38,70 @@ class SoccerV0(gym.Env):
     map_data = None
     # Renderer
     renderer = None
+    # Rule-based AI
+    ai_evaluator = None
+    # Caller-provided observation buffer allocated by
+    # ObservationBuilder.allocate() or allocate_flat(). If it's set, the
+    # observations are written into it and the same buffer is returned by
+    # every step without copying, otherwise each observation has its own
+    # arrays
+    obs_buffer = None
+    # Caller-provided frame buffer allocated by the allocate_screenshot() of
+    # the renderer, the rendered frames are written into it instead of new
+    # arrays if it's set. Only the areas drawn since the last frame are
+    # copied into it, so it must not be modified by the caller
+    frame_buffer = None
 
     ### State ###
 
     # State
     state = None
-    # Numpy random state
+    # Random state drawing the numbers in blocks
     random_state = None
     # Cached action
     cached_action = None
     # Lazy loading of renderer
     renderer_loaded = False
 
+    ### Profiling ###
+
+    # Step profiler, None if profiling is disabled
+    profiler = None
+    # Phases of the step profiled as the methods of the environment
+    profiled_env_phases = [
+        '_update_agent_actions',
+        '_get_intended_cells',
+        '_update_agent_pos',
+        '_update_taken_actions',
+        '_update_frame_skip_index',
+        '_update_time_step',
+        '_get_reward',
+        '_gym_state',
+    ]
+    # Phases of the step profiled as the methods of the state
+    profiled_state_phases = [
+        'is_terminal',
+    ]
+
     ### Gym Methods ###
 
     def seed(self, seed=None):
-        self.random_state = np.random.RandomState(seed)
+        self.random_state = BlockRandom(seed)
         self.state.update_random_state(self.random_state)
         return self.random_state
 
     def step(self, action):
-        # Cache the actions
-        self.cached_action = action
+        # Cache a copy of the actions, the AI actions are written into it and
+        # the caller may still hold the given actions
+        self.cached_action = np.array(action)
         # Update agent actions
         self._update_agent_actions()
-        # Get the intended positions
-        intended_pos = self._get_intended_pos(self.cached_action)
+        # Get the intended cells
+        agent_cells = self.map_data.get_cell_ids(self.state.agent_pos)
+        intended_cells = self._get_intended_cells(agent_cells,
+                                                  self.cached_action)
         # Update the agent positions
-        self._update_agent_pos(intended_pos)
+        self._update_agent_pos(agent_cells, intended_cells)
         # Update taken actions
         self._update_taken_actions()
         # Update frame skipping index
@@ -91,13 +130,97 @@ class SoccerV0(gym.Env):
         # Render
         self.renderer.render()
         # Return renderer screenshot
-        return self.renderer.get_screenshot()
+        return self.renderer.get_screenshot(self.frame_buffer,
+                                            incremental=True)
+
+    ### Snapshot Methods ###
+
+    def get_snapshot(self):
+        """Get a snapshot of the mutable game state for branching.
+
+        Only the agent statuses, the time step and the position of the random
+        state are captured, the map data, the renderer and the spaces are
+        shared.
+
+        Returns:
+            StateSnapshot: The immutable snapshot.
+        """
+        return self.state.get_snapshot()
+
+    def restore_snapshot(self, snapshot):
+        """Restore the game state from a snapshot.
+
+        The same snapshot can be restored any number of times, the following
+        steps are the same as those after the snapshot was taken.
+
+        Args:
+            snapshot (StateSnapshot): The snapshot from get_snapshot().
+        """
+        self.state.restore_snapshot(snapshot)
+
+    ### Profiling Methods ###
+
+    def enable_profiling(self, step_info=False):
+        """Start accumulating the timings of the step phases.
+
+        The phase methods are wrapped on this instance only, disabling
+        profiling removes the wrappers so that no cost is left. The whole step
+        is recorded as the phase "step".
+
+        Args:
+            step_info (bool): Whether to put the nanoseconds of each phase of
+                the step in the info dict as "step_timings".
+
+        Returns:
+            StepProfiler: The profiler.
+        """
+        self.disable_profiling()
+        self.profiler = StepProfiler()
+        for phase in self.profiled_env_phases:
+            setattr(self, phase, self.profiler.wrap(
+                phase, getattr(self, phase)))
+        for phase in self.profiled_state_phases:
+            setattr(self.state, phase, self.profiler.wrap(
+                phase, getattr(self.state, phase)))
+        profiled_step = self.profiler.wrap('step', self.step)
+        if step_info:
+            profiler = self.profiler
+
+            def step(action):
+                (gym_state, reward, done, info) = profiled_step(action)
+                info['step_timings'] = dict(profiler.last_ns)
+                return gym_state, reward, done, info
+            self.step = step
+        else:
+            self.step = profiled_step
+        return self.profiler
+
+    def disable_profiling(self):
+        """Stop profiling and remove the wrappers of the step phases."""
+        if self.profiler is None:
+            return
+        for phase in self.profiled_env_phases + ['step']:
+            self.__dict__.pop(phase, None)
+        for phase in self.profiled_state_phases:
+            self.state.__dict__.pop(phase, None)
+        self.profiler = None
+
+    def get_step_timings(self):
+        """Get the accumulated timings of the step phases.
+
+        Returns:
+            dict: See StepProfiler.get_timings(), empty if profiling is
+                disabled.
+        """
+        if self.profiler is None:
+            return {}
+        return self.profiler.get_timings()
 
     ### Initialization Methods ###
 
     def __init__(self):
         # Use default random state
-        self.random_state = np.random.RandomState(0)
+        self.random_state = BlockRandom(0)
 
     def load(self):
         # Save or create environment options
@@ -108,41 +231,22 @@ class SoccerV0(gym.Env):
         self.state = State(self, self.options,
                            self.map_data, self.random_state)
         # Initialize renderer
-        self.renderer = Renderer(
-            self.options.map_path, self, self.renderer_options)
+        if self.renderer_options and self.renderer_options.numpy_backend:
+            self.renderer = ArrayRenderer(self.options.map_path, self,
+                                          self.renderer_options.tile_size)
+        else:
+            self.renderer = Renderer(
+                self.options.map_path, self, self.renderer_options)
+        # Initialize the rule-based AI
+        self.ai_evaluator = AiEvaluator(self.map_data, self.options)
         # Initialize observation space
         self._init_obs_space()
         # Initialize action space
         self._init_action_space()
 
     def _init_obs_space(self):
-        map_size = self.map_data.map_size
-        map_len = np.prod(map_size)
-        agent_size = len(Teams) * self.options.team_size
-        player_goal_size = len(self.map_data.goals['PLAYER'])
-        computer_goal_size = len(self.map_data.goals['COMPUTER'])
-        low_map_bound = [-map_size[0] + 1, -map_size[0] + 1]
-        high_map_bound = [map_size[0] - 1, map_size[1] - 1]
-        # Map, agent positions, relative player goals, relative computer goals,
-        # other agent positions, ball possessions, modes, actions
-        low = map_len * [0] + \
-            agent_size * [0, 0] + \
-            agent_size * player_goal_size * low_map_bound + \
-            agent_size * computer_goal_size * low_map_bound + \
-            agent_size * (agent_size - 1) * low_map_bound + \
-            agent_size * [0] + \
-            agent_size * [0] + \
-            agent_size * [0]
-        high = map_len * [3] + \
-            agent_size * high_map_bound + \
-            agent_size * player_goal_size * high_map_bound + \
-            agent_size * computer_goal_size * high_map_bound + \
-            agent_size * (agent_size - 1) * high_map_bound + \
-            agent_size * [1] + \
-            agent_size * [len(AgentModes) - 1] + \
-            agent_size * [len(Actions) - 1]
-        self.observation_space = gym.spaces.Box(
-            low=np.array(low), high=np.array(high), dtype=np.uint8)
+        self.observation_space = self.state.obs_builder.get_observation_space(
+            self.options.flat_obs)
 
     def _init_action_space(self):
         agent_size = len(Teams) * self.options.team_size
@@ -150,11 +254,21 @@ class SoccerV0(gym.Env):
         self.action_space = gym.spaces.MultiDiscrete(nvec)
 
     def _gym_state(self):
-        map_size = self.map_data.map_size
-        state = self.state.get_gym_state(map_size)
+        obs_builder = self.state.obs_builder
+        out = self.obs_buffer
+        if self.options.flat_obs:
+            if out is None:
+                out = obs_builder.allocate_flat()
+            state = self.state.get_flat_gym_state(out)
+        else:
+            if out is None:
+                out = obs_builder.allocate()
+            state = self.state.get_gym_state(out)
         return state
 
     def _update_agent_actions(self):
+        # The agents controlled by the rule-based AI
+        ai_mask = np.zeros((1, self.options.agent_size), dtype=np.bool_)
         for team_name in Teams:
             for team_agent_index in range(self.options.team_size):
                 agent_index = self.get_agent_index(team_name, team_agent_index)
@@ -166,10 +280,17 @@ class SoccerV0(gym.Env):
                 # Select the previous action if it's frame skipping
                 if self.state.get_agent_frame_skip_index(agent_index) > 0:
                     action = self.state.get_agent_action(agent_index)
+                    self.cached_action[agent_index] = action
                 else:
-                    action = self._get_ai_action(team_name, team_agent_index)
-                # Update the cached action
-                self.cached_action[agent_index] = action
+                    ai_mask[0, agent_index] = True
+        # Update the cached actions by the AI actions of all the agents at once
+        if np.any(ai_mask):
+            ai_actions = self.ai_evaluator.get_actions(
+                self.state.agent_pos[None], self.state.agent_ball[None],
+                self.state.agent_mode[None], self.random_state, ai_mask)
+            for agent_index in np.flatnonzero(ai_mask[0]):
+                self.cached_action[agent_index] = Actions(
+                    ai_actions[0, agent_index])
 
     def get_agent_index(self, team_name, team_agent_index):
         # Map the team name to the group index
@@ -193,270 +314,44 @@ class SoccerV0(gym.Env):
     def get_team_agent_index(self, agent_index):
         return agent_index % self.options.team_size
 
-    def _init_cached_action(self):
-        self.cached_action = {}
-        for team_name in Teams:
-            for team_agent_index in range(self.options.team_size):
-                agent_index = self.get_agent_index(team_name, team_agent_index)
-                self.cached_action[agent_index] = None
-
-    def _get_agent_actions(self, player_action):
-        # Build a dict of the agent index to the actions
-        actions = {}
-        for team_name in Teams:
-            for team_agent_index in range(self.options.team_size):
-                agent_index = self.get_agent_index(team_name, team_agent_index)
-                # Choose the action by the team and agent index
-                if team_name == Teams.PLAYER:
-                    if team_agent_index <= 0:
-                        # The action only takes effect on the first agent in the
-                        # team
-                        agent_action = player_action
-                    else:
-                        # The collaborators have the same AI as the opponents
-                        agent_action = self._get_ai_action(
-                            team_name, team_agent_index)
-                elif team_name == Teams.COMPUTER:
-                    agent_action = self._get_ai_action(
-                        team_name, team_agent_index)
-                else:
-                    raise KeyError('Unknown team name {}'.format(team_name))
-                actions[agent_index] = agent_action
-        return actions
-
-    def _get_walkable_moved_pos(self, pos, action):
-        # Get the moved position
-        moved_pos = self.get_moved_pos(pos, action)
-        # Use the moved position if it's in the walkable area
-        if moved_pos in self.map_data.walkable:
-            return moved_pos
-        else:
-            return pos
-
-    def _update_agent_pos(self, intended_pos):
-        # Detect the overlapping positions and switch the ball
-        detecting_overlap = True
-        has_switched = False
-        while detecting_overlap:
-            # Get the overlapping position to agent index mapping
-            overlapping_pos_to_agent = self._get_overlapping_pos_to_agent(
-                intended_pos)
-            # Update the positions
-            detecting_overlap = False
-            for (_, agent_index_list) in overlapping_pos_to_agent.items():
-                if len(agent_index_list) > 1:
-                    # Update the ball possession only once
-                    if not has_switched:
-                        switch = self._update_ball_possession(agent_index_list)
-                        has_switched = has_switched or switch
-                    # Use the old positions
-                    for agent_index in agent_index_list:
-                        intended_pos[agent_index] = self.state.get_agent_pos(
-                            agent_index)
-                    # Indicate the process should continue
-                    detecting_overlap = True
-        # Update the non-overlapping positions
-        for (agent_index, pos) in intended_pos.items():
-            self.state.set_agent_pos(agent_index, pos)
+    def _update_agent_pos(self, agent_cells, intended_cells):
+        # Resolve the collisions and switch the ball
+        (cells, switch_agent_index) = resolve_collisions(
+            agent_cells[None], intended_cells[None],
+            self.state.agent_ball[None], self.map_data.cell_pos.shape[0],
+            self.random_state)
+        if switch_agent_index[0] >= 0:
+            ball_possession = self.state.get_ball_possession()
+            self.state.switch_ball(ball_possession['agent_index'],
+                                   switch_agent_index[0])
+        # Update the positions of the moved agents
+        for agent_index in np.flatnonzero(cells[0] != agent_cells):
+            self.state.set_agent_pos(
+                agent_index, self.map_data.cell_pos[cells[0, agent_index]])
 
     def _update_taken_actions(self):
-        for team_name in Teams:
-            for team_agent_index in range(self.options.team_size):
-                agent_index = self.get_agent_index(team_name, team_agent_index)
-                action = self.cached_action[agent_index]
-                self.state.set_agent_action(agent_index, action)
+        self.state.set_agent_actions(self.cached_action)
 
     def _update_frame_skip_index(self):
-        for team_name in Teams:
-            for team_agent_index in range(self.options.team_size):
-                agent_index = self.get_agent_index(team_name, team_agent_index)
-                self.state.increase_frame_skip_index(
-                    agent_index, self.options.ai_frame_skip)
+        self.state.increase_frame_skip_indexes(self.options.ai_frame_skip)
 
     def _update_time_step(self):
         self.state.increase_time_step()
 
-    def _update_ball_possession(self, agent_index_list):
-        # Get the ball possessions of the agents
-        has_ball_agent_index = None
-        no_ball_agent_list = []
-        for agent_index in agent_index_list:
-            has_ball = self.state.get_agent_ball(agent_index)
-            if has_ball:
-                has_ball_agent_index = agent_index
-            else:
-                no_ball_agent_list.append(agent_index)
-        # Only switch the ball possession when one agent has the ball in the
-        # list
-        if not has_ball_agent_index is None:
-            # Randomly switch the ball
-            rand_idx = self.random_state.randint(len(no_ball_agent_list))
-            switch_agent_index = no_ball_agent_list[rand_idx]
-            self.state.switch_ball(has_ball_agent_index, switch_agent_index)
-            # Indicate the switching has occurred
-            return True
-        # Indicate no switch
-        return False
-
-    def _get_intended_pos(self, actions):
-        # Build a dict of the agent index to the intended moved position
-        intended_pos = {}
-        for team_name in Teams:
-            for team_agent_index in range(self.options.team_size):
-                agent_index = self.get_agent_index(team_name, team_agent_index)
-                # Get the action
-                action = actions[agent_index]
-                # Get the original position
-                pos = self.state.get_agent_pos(agent_index)
-                # Save the walkable position
-                intended_pos[agent_index] = self._get_walkable_moved_pos(
-                    pos, action)
-        return intended_pos
-
-    def _get_ai_action(self, team_name, team_agent_index):
-        # Get the opponent team name
-        opponent_team_name = self.get_opponent_team_name(team_name)
-        # Get the agent info
-        agent_index = self.get_agent_index(team_name, team_agent_index)
-        agent_pos = self.state.get_agent_pos(agent_index)
-        agent_ball = self.state.get_agent_ball(agent_index)
-        agent_mode = self.state.get_agent_mode(agent_index)
-        agent_frame_skip_index = self.state.get_agent_frame_skip_index(
-            agent_index)
-        # Select the previous action if it's frame skipping
-        if agent_frame_skip_index > 0:
-            return self.state.get_agent_action(agent_index)
-        # Get the position of the nearest opponent
-        nearest_opponent_index = self._get_nearest_opponent_index(
-            team_name, team_agent_index)
-        nearest_opponent_pos = self.state.get_agent_pos(nearest_opponent_index)
-        # Get the position of the defensive target
-        defensive_target_agent_index = self._get_defensive_agent_index(
-            team_name, team_agent_index)
-        defensive_target_agent_pos = self.state.get_agent_pos(
-            defensive_target_agent_index)
-        # Calculate the target position and the strategic mode
-        if agent_mode == AgentModes.DEFENSIVE:
-            if agent_ball:
-                target_pos = nearest_opponent_pos
-                strategic_mode = AiModes.AVOID
-            else:
-                # Calculate the distance from the agent
-                goals = self.map_data.goals[opponent_team_name.name]
-                distances = [self.get_pos_distance(goal_pos,
-                                                   defensive_target_agent_pos)
-                             for goal_pos in goals]
-                # Select the minimum distance
-                min_distance_index = np.argmin(distances)
-                target_pos = goals[min_distance_index]
-                strategic_mode = AiModes.APPROACH
-        elif agent_mode == AgentModes.OFFENSIVE:
-            if agent_ball:
-                # Calculate the distance from the opponent
-                goals = self.map_data.goals[team_name.name]
-                distances = [self.get_pos_distance(goal_pos,
-                                                   nearest_opponent_pos)
-                             for goal_pos in goals]
-                # Select the maximum distance
-                max_distance_index = np.argmax(distances)
-                target_pos = goals[max_distance_index]
-                strategic_mode = AiModes.APPROACH
-            else:
-                target_pos = defensive_target_agent_pos
-                strategic_mode = AiModes.INTERCEPT
-        else:
-            raise KeyError('Unknown agent mode {}'.format(agent_mode))
-        # Get the strategic action
-        action = self._get_strategic_action(
-            agent_pos, target_pos, strategic_mode)
-        return action
-
-    def _get_nearest_opponent_index(self, team_name, team_agent_index):
-        # Get the opponent team name
-        opponent_team_name = self.get_opponent_team_name(team_name)
-        # Get the agent position
-        agent_index = self.get_agent_index(team_name, team_agent_index)
-        agent_pos = self.state.get_agent_pos(agent_index)
-        # Find the nearest opponent position
-        nearest_opponent_index = None
-        nearest_dist = np.inf
-        for opponent_team_agent_index in range(self.options.team_size):
-            opponent_index = self.get_agent_index(
-                opponent_team_name, opponent_team_agent_index)
-            opponent_pos = self.state.get_agent_pos(opponent_index)
-            # Calculate the distance
-            dist = self.get_pos_distance(agent_pos, opponent_pos)
-            if dist < nearest_dist:
-                nearest_opponent_index = opponent_index
-                nearest_dist = dist
-        return nearest_opponent_index
-
-    def _get_defensive_agent_index(self, team_name, team_agent_index):
-        # Get the ball possession status
-        ball_possession = self.state.get_ball_possession()
-        has_ball_agent_index = ball_possession['agent_index']
-        has_ball_team_name = ball_possession['team_name']
-        if has_ball_team_name != team_name:
-            # Defend the opponent who possesses the ball
-            return has_ball_agent_index
-        else:
-            # Defend the nearest opponent
-            return self._get_nearest_opponent_index(team_name, team_agent_index)
-
-    def _get_strategic_action(self, source_pos, target_pos, mode):
-        # Calculate the original Euclidean distance
-        orig_dist = self.get_pos_distance(source_pos, target_pos)
-        # Find the best action
-        rand_idx = self.random_state.randint(len(Actions) - 1)
-        best_action = Actions(rand_idx + 1)
-        best_dist = orig_dist
-        # Shuffle the actions except NOOP
-        rand_idxs = self.random_state.choice(
-            len(Actions) - 1, len(Actions) - 1, replace=False)
-        shuffled_actions = [Actions(i + 1) for i in rand_idxs]
-        # Find the best action
-        for action in shuffled_actions:
-            # Get the moved position after doing the action
-            moved_pos = self.get_moved_pos(source_pos, action)
-            # Check whether the moved position is walkable
-            if not moved_pos in self.map_data.walkable:
-                continue
-            # Calculate the new Euclidean distance
-            moved_dist = self.get_pos_distance(moved_pos, target_pos)
-            if mode == AiModes.APPROACH:
-                if moved_dist < best_dist:
-                    best_action = action
-                    best_dist = moved_dist
-            elif mode == AiModes.AVOID:
-                if moved_dist > best_dist:
-                    best_action = action
-                    best_dist = moved_dist
-            elif mode == AiModes.INTERCEPT:
-                if moved_dist < best_dist and moved_dist >= 1.0:
-                    best_action = action
-                    best_dist = moved_dist
-            else:
-                raise KeyError('Unknown mode {}'.format(mode))
-        return best_action
-
-    def _get_overlapping_pos_to_agent(self, intended_pos):
-        overlapping_pos_to_agent = {}
-        for (agent_index, pos) in intended_pos.items():
-            # Use the old position if the new position is not walkable
-            if not pos in self.map_data.walkable:
-                pos = self.state.get_agent_pos(agent_index)
-            # Use the tuple as the key
-            pos_tuple = tuple(pos)
-            if pos_tuple in overlapping_pos_to_agent:
-                overlapping_pos_to_agent[pos_tuple].append(agent_index)
-            else:
-                overlapping_pos_to_agent[pos_tuple] = [agent_index]
-        return overlapping_pos_to_agent
+    def _get_intended_cells(self, agent_cells, actions):
+        # Use the moved cells only if they are in the walkable area
+        actions = np.array([actions[agent_index]
+                            for agent_index in range(self.options.agent_size)],
+                           dtype=np.int64)
+        moved_cells = self.map_data.moved_cell[agent_cells, actions]
+        return np.where(moved_cells >= 0, moved_cells, agent_cells)
 
     def _get_reward(self):
-        if self.state.is_team_win(Teams.PLAYER):
+        # The winning team is cached for the terminal check of the same step
+        win_team = self.state.get_win_team()
+        if win_team == Teams.PLAYER:
             return 1.0
-        elif self.state.is_team_win(Teams.COMPUTER):
+        elif win_team == Teams.COMPUTER:
             return -1.0
         else:
             return 0.0
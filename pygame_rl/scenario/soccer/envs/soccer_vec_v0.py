@@ -0,0 +1,316 @@
+# Third-party modules
+import gym
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.ai_evaluator import AiEvaluator
+from pygame_rl.scenario.soccer.array_renderer import ArrayRenderer
+from pygame_rl.scenario.soccer.collision import resolve_collisions
+from pygame_rl.scenario.soccer.initial_state_sampler import \
+    InitialStateSampler
+from pygame_rl.scenario.soccer.map_data import MapData
+from pygame_rl.scenario.soccer.observation import ObservationBuilder
+from pygame_rl.scenario.soccer.observation import copy_observation
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.state_encoder import StateEncoder
+from pygame_rl.scenario.soccer.teams import Teams
+from pygame_rl.util.block_random import BlockRandom
+
+
+class SoccerVecV0(gym.Env):
+    """Vectorized soccer environment stepping many games in lockstep.
+
+    The states of all the games are stacked in arrays whose first axis is the
+    game index, and the games follow the same rules as SoccerV0. step() takes
+    the actions with the shape (num_envs, agent_size) and returns the stacked
+    observations, rewards and terminal flags. The games which have ended are
+    reset automatically when "auto_reset" is enabled, and the last observation
+    before the reset is given as "terminal_observation" in the info dict.
+    """
+    ### Gym Attributes ###
+
+    # Metadata
+    metadata = {'render.modes': ['rgb_array']}
+    # Observation space
+    observation_space = None
+    # Action space
+    action_space = None
+
+    ### Environment Attributes ###
+
+    # Environment options
+    options = None
+    # Map data
+    map_data = None
+    # Rule-based AI
+    ai_evaluator = None
+    # Observation builder
+    obs_builder = None
+    # Integer state encoder
+    state_encoder = None
+    # Caller-provided observation buffer allocated by
+    # ObservationBuilder.allocate() or allocate_flat(). If it's set, the
+    # observations are written into it and the same buffer is returned by
+    # every step without copying, otherwise each observation has its own
+    # arrays
+    obs_buffer = None
+    # Renderer options, only the tile size is used as the frames are always
+    # composited by NumPy
+    renderer_options = None
+    # Renderer compositing the frames of all the games by NumPy, loaded by the
+    # first rendering
+    renderer = None
+    # Caller-provided frame buffer allocated by the allocate_frames() of the
+    # renderer, the rendered frames are written into it instead of new arrays
+    # if it's set
+    frame_buffer = None
+    # Number of games
+    num_envs = 1
+    # Whether to reset the ended games automatically
+    auto_reset = True
+
+    ### State ###
+
+    # Agent statuses with the shape (num_envs, agent_size[, 2])
+    agent_pos = None
+    agent_ball = None
+    agent_mode = None
+    agent_action = None
+    agent_frame_skip_index = None
+    # Time steps with the shape (num_envs,)
+    time_step = None
+    # Random state drawing the numbers in blocks
+    random_state = None
+
+    ### Cached Objects ###
+
+    # Team index of each agent
+    agent_team = None
+    # Sampler of the initial agent statuses
+    initial_state_sampler = None
+
+    ### Gym Methods ###
+
+    def seed(self, seed=None):
+        self.random_state = BlockRandom(seed)
+        return self.random_state
+
+    def step(self, action):
+        actions = np.array(action, dtype=np.int64).reshape(
+            self.num_envs, self.options.agent_size)
+        # Update agent actions
+        self._update_agent_actions(actions)
+        # Get the intended cells
+        agent_cells = self.map_data.get_cell_ids(self.agent_pos)
+        intended_cells = self._get_intended_cells(agent_cells, actions)
+        # Update the agent positions
+        self._update_agent_pos(agent_cells, intended_cells)
+        # Update taken actions
+        self.agent_action[:] = actions
+        # Update frame skipping index
+        self.agent_frame_skip_index += 1
+        self.agent_frame_skip_index %= self.options.ai_frame_skip
+        # Update time step
+        self.time_step += 1
+        # Get the reward and the terminal flags
+        reward, done = self._get_reward_done()
+        # Get the observation and reset the ended games
+        gym_state = self._gym_state()
+        info = {}
+        if self.auto_reset and np.any(done):
+            info['terminal_observation'] = copy_observation(gym_state)
+            self._reset_games(np.flatnonzero(done))
+            gym_state = self._gym_state()
+        return gym_state, reward, done, info
+
+    def reset(self, indexes=None):
+        """Reset the games.
+
+        Args:
+            indexes (list): The game indexes to reset, all the games if it's
+                not given.
+
+        Returns:
+            The observations of all the games.
+        """
+        if indexes is None:
+            indexes = np.arange(self.num_envs)
+        self._reset_games(np.asarray(indexes, dtype=np.int64))
+        # Return the state
+        gym_state = self._gym_state()
+        return gym_state
+
+    def render(self, mode='rgb_array'):
+        """Render the frames of all the games at once.
+
+        Returns:
+            numpy.ndarray: The frames with the shape (num_envs, height, width,
+                3), which are pixel-identical to the ones of SoccerV0.
+        """
+        # Lazy load the renderer
+        if self.renderer is None:
+            tile_size = (self.renderer_options.tile_size
+                         if self.renderer_options else None)
+            self.renderer = ArrayRenderer(self.options.map_path, self,
+                                          tile_size)
+            self.renderer.load()
+        return self.renderer.render_states(self.agent_pos, self.agent_ball,
+                                           self.frame_buffer)
+
+    ### Initialization Methods ###
+
+    def __init__(self):
+        # Use default random state
+        self.random_state = BlockRandom(0)
+
+    def load(self):
+        # Save or create environment options
+        self.options = self.options or Options()
+        # Load map data
+        self.map_data = MapData(self.options.map_path)
+        # Initialize the rule-based AI
+        self.ai_evaluator = AiEvaluator(self.map_data, self.options)
+        # Initialize the observation builder
+        self.obs_builder = ObservationBuilder(self.map_data, self.options,
+                                              self.num_envs)
+        # Initialize the integer state encoder
+        self.state_encoder = StateEncoder(self.map_data, self.options)
+        # Initialize the cached objects
+        self._init_cached_objects()
+        # Initialize the state arrays
+        self._init_state()
+        # Initialize observation space
+        self._init_obs_space()
+        # Initialize action space
+        self._init_action_space()
+
+    def _init_cached_objects(self):
+        self.agent_team = np.arange(self.options.agent_size) // \
+            self.options.team_size
+        self.initial_state_sampler = InitialStateSampler(self.map_data,
+                                                         self.options)
+
+    def _init_state(self):
+        shape = (self.num_envs, self.options.agent_size)
+        self.agent_pos = np.zeros(shape + (2,), dtype=np.int64)
+        self.agent_ball = np.zeros(shape, dtype=np.bool_)
+        self.agent_mode = np.zeros(shape, dtype=np.int64)
+        self.agent_action = np.zeros(shape, dtype=np.int64)
+        self.agent_frame_skip_index = np.zeros(shape, dtype=np.int64)
+        self.time_step = np.zeros(self.num_envs, dtype=np.int64)
+
+    def _init_obs_space(self):
+        self.observation_space = self.obs_builder.get_observation_space(
+            self.options.flat_obs)
+
+    def _init_action_space(self):
+        nvec = np.full((self.num_envs, self.options.agent_size), len(Actions))
+        self.action_space = gym.spaces.MultiDiscrete(nvec)
+
+    def get_agent_index(self, team_name, team_agent_index):
+        return self.options.team_size * team_name + team_agent_index
+
+    ### State Methods ###
+
+    def _reset_games(self, indexes):
+        """Reset the games with random statuses.
+
+        Args:
+            indexes (numpy.ndarray): The game indexes to reset.
+        """
+        (self.agent_pos[indexes], self.agent_ball[indexes],
+         self.agent_mode[indexes]) = self.initial_state_sampler.take(
+             self.random_state, len(indexes))
+        # Reset the actions, frame skipping indexes and time steps
+        self.agent_action[indexes] = Actions.STAND
+        self.agent_frame_skip_index[indexes] = 0
+        self.time_step[indexes] = 0
+
+    def encode_states(self):
+        """Encode the states of all the games as integers.
+
+        See StateEncoder for the digits.
+
+        Returns:
+            numpy.ndarray: The codes with the shape (num_envs,).
+        """
+        return self.state_encoder.encode_batch(
+            self.agent_pos, self.agent_ball, self.agent_mode,
+            self.agent_action, self.time_step)
+
+    def decode_states(self, codes):
+        """Set the states of all the games from integer codes.
+
+        Args:
+            codes (numpy.ndarray): The codes from encode_states() with the
+                shape (num_envs,).
+
+        Returns:
+            The observations of the decoded states.
+        """
+        (self.agent_pos[...], self.agent_ball[...], self.agent_mode[...],
+         self.agent_action[...], self.agent_frame_skip_index[...],
+         self.time_step[...]) = self.state_encoder.decode_batch(codes)
+        return self._gym_state()
+
+    def _gym_state(self):
+        out = self.obs_buffer
+        if self.options.flat_obs:
+            build = self.obs_builder.build_flat
+            if out is None:
+                out = self.obs_builder.allocate_flat()
+        else:
+            build = self.obs_builder.build
+            if out is None:
+                out = self.obs_builder.allocate()
+        return build(self.agent_pos, self.agent_ball, self.agent_mode,
+                     self.agent_action, out)
+
+    ### Step Methods ###
+
+    def _update_agent_actions(self, actions):
+        # Select the previous actions if it's frame skipping, otherwise the AI
+        # actions for the agents without the specified actions
+        noop = actions == Actions.NOOP
+        frame_skipping = noop & (self.agent_frame_skip_index > 0)
+        actions[frame_skipping] = self.agent_action[frame_skipping]
+        ai_controlled = noop & ~frame_skipping
+        if np.any(ai_controlled):
+            ai_actions = self.ai_evaluator.get_actions(
+                self.agent_pos, self.agent_ball, self.agent_mode,
+                self.random_state, ai_controlled)
+            actions[ai_controlled] = ai_actions[ai_controlled]
+
+    def _get_intended_cells(self, agent_cells, actions):
+        # Use the moved cells only if they are in the walkable area
+        moved_cells = self.map_data.moved_cell[agent_cells, actions]
+        return np.where(moved_cells >= 0, moved_cells, agent_cells)
+
+    def _update_agent_pos(self, agent_cells, intended_cells):
+        # Resolve the collisions and switch the ball
+        (cells, switch_agent_index) = resolve_collisions(
+            agent_cells, intended_cells, self.agent_ball,
+            self.map_data.cell_pos.shape[0], self.random_state)
+        switching_games = np.flatnonzero(switch_agent_index >= 0)
+        self.agent_ball[switching_games] = False
+        self.agent_ball[switching_games,
+                        switch_agent_index[switching_games]] = True
+        # Update the non-overlapping positions
+        self.agent_pos[...] = self.map_data.cell_pos[cells]
+
+    def _get_reward_done(self):
+        # Only the agent who has the ball can win by reaching the goal area of
+        # its team
+        has_ball_agent_index = np.argmax(self.agent_ball, axis=1)
+        has_ball_pos = self.agent_pos[np.arange(self.num_envs),
+                                      has_ball_agent_index]
+        goal_team = self.map_data.goal_grid[has_ball_pos[:, 0],
+                                            has_ball_pos[:, 1]]
+        has_ball_team = self.agent_team[has_ball_agent_index]
+        win = goal_team == has_ball_team
+        reward = np.zeros(self.num_envs)
+        reward[win & (has_ball_team == Teams.PLAYER)] = 1.0
+        reward[win & (has_ball_team == Teams.COMPUTER)] = -1.0
+        done = win | (self.time_step >= 100)
+        return reward, done
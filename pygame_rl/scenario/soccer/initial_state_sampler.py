@@ -0,0 +1,147 @@
+# Third-party modules
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.teams import Teams
+
+
+class InitialStateSampler(object):
+    """Sampler of the random agent statuses after the resets.
+
+    The spawn positions of each team are drawn as a random permutation of the
+    team's spawn array, so the agents get distinct positions without retrying.
+    Then a random agent in a random team gets the ball and each agent gets a
+    random mode. All the draws are done for many games at once.
+
+    If "reset_pool_size" of the options is positive, the initial states are
+    generated that many at once into a pool and handed out one by one, so that
+    most resets only copy the pregenerated statuses. Each initial state is
+    used once and the pool is refilled when it runs out, so the distribution
+    is the same as without the pool, but the random numbers are drawn in a
+    different order. The pool is discarded when a different random state is
+    given or by discard_pool(), e.g. after seeding. The pool is a part of the
+    random sequence, so restoring the random state alone doesn't rewind it,
+    restore the pool state from get_pool_state() as well.
+    """
+    # Environment options
+    options = None
+
+    # Spawn positions as arrays indexed by the team index
+    spawn_pos = None
+
+    # Pool of the pregenerated initial states as the tuple of the agent
+    # positions, the ball possessions and the agent modes, the cursor of the
+    # next state in the pool and the random state filling the pool
+    pool = None
+    pool_cursor = 0
+    pool_random_state = None
+
+    def __init__(self, map_data, options):
+        self.options = options
+        team_size = options.team_size
+        self.spawn_pos = [np.array(map_data.spawn[team_name.name],
+                                   dtype=np.int64).reshape(-1, 2)
+                          for team_name in Teams]
+        for team_name in Teams:
+            spawn_size = len(self.spawn_pos[team_name])
+            if spawn_size < team_size:
+                raise ValueError('Team {} has only {} spawn positions for {} '
+                                 'agents'.format(team_name.name, spawn_size,
+                                                 team_size))
+
+    def sample(self, random_state, size):
+        """Draw the initial agent statuses of many games.
+
+        Args:
+            random_state (BlockRandom): The random state.
+            size (int): The number of the games.
+
+        Returns:
+            tuple: The agent positions with the shape (size, agent_size, 2),
+                the ball possessions with the shape (size, agent_size) and the
+                agent modes with the shape (size, agent_size).
+        """
+        team_size = self.options.team_size
+        agent_size = self.options.agent_size
+        # Draw distinct spawn positions by a random permutation of each team
+        agent_pos = np.zeros((size, agent_size, 2), dtype=np.int64)
+        for team_name in Teams:
+            spawn_pos = self.spawn_pos[team_name]
+            rand_values = random_state.random_sample((size, len(spawn_pos)))
+            spawn_indexes = np.argsort(rand_values, axis=1)[:, :team_size]
+            begin = team_size * team_name
+            agent_pos[:, begin:begin + team_size] = spawn_pos[spawn_indexes]
+        # Choose a random agent in a random team to possess the ball
+        team_has_ball = random_state.randint(len(Teams), size=size)
+        team_agent_has_ball = random_state.randint(team_size, size=size)
+        has_ball_agent_index = team_size * team_has_ball + team_agent_has_ball
+        agent_ball = np.zeros((size, agent_size), dtype=np.bool_)
+        agent_ball[np.arange(size), has_ball_agent_index] = True
+        # Randomize the agent modes
+        agent_mode = random_state.randint(len(AgentModes),
+                                          size=(size, agent_size))
+        return (agent_pos, agent_ball, agent_mode)
+
+    def take(self, random_state, size):
+        """Get the initial agent statuses of many games.
+
+        The statuses are taken from the pool if it's enabled, otherwise they
+        are drawn by sample().
+
+        Args:
+            random_state (BlockRandom): The random state.
+            size (int): The number of the games.
+
+        Returns:
+            tuple: See sample().
+        """
+        pool_size = self.options.reset_pool_size
+        if pool_size <= 0:
+            return self.sample(random_state, size)
+        if random_state is not self.pool_random_state:
+            self.pool = None
+            self.pool_random_state = random_state
+        parts = []
+        taken_size = 0
+        while taken_size < size:
+            if self.pool is None or self.pool_cursor >= len(self.pool[0]):
+                self.pool = self.sample(random_state,
+                                        max(pool_size, size - taken_size))
+                # Make the pool read-only as it's shared by the pool states
+                for array in self.pool:
+                    array.flags.writeable = False
+                self.pool_cursor = 0
+            end = min(self.pool_cursor + size - taken_size, len(self.pool[0]))
+            parts.append([array[self.pool_cursor:end] for array in self.pool])
+            taken_size += end - self.pool_cursor
+            self.pool_cursor = end
+        if len(parts) == 1:
+            return tuple(parts[0])
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def get_pool_state(self):
+        """Get the state to restore the pool later.
+
+        Returns:
+            tuple: The pool and the cursor.
+        """
+        return (self.pool, self.pool_cursor)
+
+    def set_pool_state(self, pool_state, random_state):
+        """Restore the pool from get_pool_state().
+
+        Args:
+            pool_state (tuple): The pool state.
+            random_state (BlockRandom): The random state to refill the pool,
+                which should be restored to the same position as the pool.
+        """
+        (self.pool, self.pool_cursor) = pool_state
+        self.pool_random_state = random_state
+
+    def discard_pool(self):
+        """Discard the pool so the next states are drawn again.
+        """
+        self.pool = None
+        self.pool_cursor = 0
+        self.pool_random_state = None
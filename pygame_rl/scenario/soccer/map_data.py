@@ -1,5 +1,10 @@
+# Third-party modules
+import numpy as np
+
 # Project modules
 from pygame_rl.renderer.pygame_renderer import TiledData
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.teams import Teams
 
 
 class MapData(object):
@@ -11,6 +16,37 @@ class MapData(object):
     spawn = []
     goals = []
     walkable = []
+    # Tile grids with the same shape as the map, indexed by [x, y]
+    # * walkable_grid: Whether the tile is walkable
+    # * goal_grid: Team index of the goal area, -1 if it's not a goal
+    # * spawn_grid: Team index of the spawn area, -1 if it's not a spawn tile
+    walkable_grid = None
+    goal_grid = None
+    spawn_grid = None
+    # Cell tables indexed by the flat cell ID "x * map_height + y"
+    # * cell_pos: Position of each cell with the shape (cell_size, 2)
+    # * cell_distance: Euclidean distances between the cells with the shape
+    #   (cell_size, cell_size), None if the map has more cells than
+    #   "max_table_cell_size"
+    # * moved_cell: Cell after taking each action with the shape (cell_size,
+    #   action_size), -1 if the moved position isn't walkable
+    cell_pos = None
+    cell_distance = None
+    moved_cell = None
+    # Goal tables indexed by [team index, cell ID]
+    # * nearest_goal_cell, furthest_goal_cell: The goal cell of the team
+    #   nearest to or furthest from the cell, the first one in the goal list
+    #   wins the ties
+    # * nearest_goal_distance, furthest_goal_distance: The distance to the goal
+    #   cell
+    nearest_goal_cell = None
+    nearest_goal_distance = None
+    furthest_goal_cell = None
+    furthest_goal_distance = None
+    # Position offsets of each action indexed by the action
+    action_offsets = None
+    # Maximum number of cells to precompute the cell distance table
+    max_table_cell_size = 1024
 
     def __init__(self, map_path):
         # Create a tile data and load
@@ -24,3 +60,143 @@ class MapData(object):
         self.spawn = tile_pos['spawn_area']
         self.goals = tile_pos['goal']
         self.walkable = tile_pos['ground']['WALKABLE']
+        # Build the tile grids
+        self._init_grids()
+        # Build the cell tables
+        self._init_cell_tables()
+
+    def is_walkable(self, pos):
+        """Check whether the position is inside the map and walkable.
+
+        Args:
+            pos (list): The position.
+
+        Returns:
+            bool: True if the position is walkable.
+        """
+        x, y = pos
+        return (0 <= x < self.map_size[0] and 0 <= y < self.map_size[1]
+                and bool(self.walkable_grid[x, y]))
+
+    def get_walkable_mask(self, pos):
+        """Check whether the positions are inside the map and walkable.
+
+        Args:
+            pos (numpy.ndarray): The positions with the shape (..., 2).
+
+        Returns:
+            numpy.ndarray: The walkable mask with the shape (...).
+        """
+        in_map = np.all((pos >= 0) & (pos < self.map_size), axis=-1)
+        clipped_pos = np.where(in_map[..., None], pos, 0)
+        return in_map & self.walkable_grid[clipped_pos[..., 0],
+                                           clipped_pos[..., 1]]
+
+    def get_cell_ids(self, pos):
+        """Get the flat cell IDs of the positions inside the map.
+
+        Args:
+            pos (numpy.ndarray): The positions with the shape (..., 2).
+
+        Returns:
+            numpy.ndarray: The cell IDs with the shape (...).
+        """
+        pos = np.asarray(pos)
+        return pos[..., 0] * self.map_size[1] + pos[..., 1]
+
+    def get_cell_distances(self, cells1, cells2):
+        """Get the Euclidean distances between the cells.
+
+        The distances are looked up from the cell distance table, or computed
+        from the cell positions if the map is too large for the table.
+
+        Args:
+            cells1 (numpy.ndarray): The cell IDs.
+            cells2 (numpy.ndarray): The cell IDs broadcast against cells1.
+
+        Returns:
+            numpy.ndarray: The distances with the broadcast shape.
+        """
+        if self.cell_distance is not None:
+            return self.cell_distance[cells1, cells2]
+        diff = self.cell_pos[cells2] - self.cell_pos[cells1]
+        return np.hypot(diff[..., 0], diff[..., 1])
+
+    def get_pos_distance(self, pos1, pos2):
+        """Get the Euclidean distance between the positions inside the map.
+
+        Args:
+            pos1 (list): The first position.
+            pos2 (list): The second position.
+
+        Returns:
+            float: The distance between the cells of the positions.
+        """
+        map_height = self.map_size[1]
+        return self.get_cell_distances(pos1[0] * map_height + pos1[1],
+                                       pos2[0] * map_height + pos2[1])
+
+    def get_goal_team(self, pos):
+        """Get the team index whose goal area contains the position.
+
+        Args:
+            pos (list): The position inside the map.
+
+        Returns:
+            int: The team index or -1 if the position isn't a goal.
+        """
+        return int(self.goal_grid[pos[0], pos[1]])
+
+    def _init_grids(self):
+        self.walkable_grid = np.zeros(self.map_size, dtype=np.bool_)
+        self.goal_grid = np.full(self.map_size, -1, dtype=np.int64)
+        self.spawn_grid = np.full(self.map_size, -1, dtype=np.int64)
+        for pos in self.walkable:
+            self.walkable_grid[pos[0], pos[1]] = True
+        for team_name in Teams:
+            for pos in self.goals[team_name.name]:
+                self.goal_grid[pos[0], pos[1]] = team_name
+            for pos in self.spawn[team_name.name]:
+                self.spawn_grid[pos[0], pos[1]] = team_name
+
+    def _init_cell_tables(self):
+        (map_width, map_height) = self.map_size
+        cell_size = map_width * map_height
+        cell_ids = np.arange(cell_size)
+        self.cell_pos = np.stack(
+            [cell_ids // map_height, cell_ids % map_height], axis=1)
+        if cell_size <= self.max_table_cell_size:
+            diff = self.cell_pos[None, :, :] - self.cell_pos[:, None, :]
+            self.cell_distance = np.hypot(diff[..., 0], diff[..., 1])
+        # Build the moved cells
+        self.action_offsets = np.zeros((len(Actions), 2), dtype=np.int64)
+        self.action_offsets[Actions.MOVE_RIGHT] = [1, 0]
+        self.action_offsets[Actions.MOVE_UP] = [0, -1]
+        self.action_offsets[Actions.MOVE_LEFT] = [-1, 0]
+        self.action_offsets[Actions.MOVE_DOWN] = [0, 1]
+        moved_pos = self.cell_pos[:, None, :] + self.action_offsets[None, :, :]
+        self.moved_cell = np.where(self.get_walkable_mask(moved_pos),
+                                   self.get_cell_ids(moved_pos), -1)
+        # Build the goal tables
+        team_size = len(Teams)
+        self.nearest_goal_cell = np.full((team_size, cell_size), -1,
+                                         dtype=np.int64)
+        self.nearest_goal_distance = np.full((team_size, cell_size), np.inf)
+        self.furthest_goal_cell = np.full((team_size, cell_size), -1,
+                                          dtype=np.int64)
+        self.furthest_goal_distance = np.full((team_size, cell_size), np.inf)
+        for team_name in Teams:
+            goals = self.goals[team_name.name]
+            if len(goals) <= 0:
+                continue
+            goal_cells = self.get_cell_ids(goals)
+            goal_distance = self.get_cell_distances(cell_ids[:, None],
+                                                    goal_cells[None, :])
+            nearest_index = np.argmin(goal_distance, axis=1)
+            furthest_index = np.argmax(goal_distance, axis=1)
+            self.nearest_goal_cell[team_name] = goal_cells[nearest_index]
+            self.nearest_goal_distance[team_name] = goal_distance[
+                cell_ids, nearest_index]
+            self.furthest_goal_cell[team_name] = goal_cells[furthest_index]
+            self.furthest_goal_distance[team_name] = goal_distance[
+                cell_ids, furthest_index]
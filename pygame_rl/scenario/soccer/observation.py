@@ -0,0 +1,321 @@
+# Third-party modules
+import gym
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.teams import Teams
+
+
+class ObservationBuilder(object):
+    """Builder of the soccer observations in preallocated buffers.
+
+    The static map layer is computed once per map, and the per-step features
+    are written into the preallocated buffers with broadcasting. The returned
+    observation is overwritten by the next build(), copy it with
+    copy_observation() to keep it. To write into a caller-provided buffer
+    instead, pass a dict with the same layout as allocate() as "out".
+
+    The observation is a dict of float64 arrays:
+
+    * map: The map layer, walkable: 1, player goal: 2, computer goal: 3.
+    * agent_pos: The agent positions.
+    * relative: The player goal, computer goal and other agent positions
+      relative to each agent.
+    * ball, mode, action: The agent statuses.
+
+    The flat observation built by build_flat() is one contiguous int8 vector
+    (int16 for the maps larger than 128 tiles on a side) with the same values
+    concatenated in the order of "flat_layout", which matches the Box from
+    get_observation_space(flat=True).
+
+    All the arrays have an extra leading axis of the game index when
+    "num_envs" is given.
+    """
+    # Map data
+    map_data = None
+
+    # Environment options
+    options = None
+
+    # Leading shape of the arrays, () or (num_envs,)
+    batch_shape = None
+
+    # Static map layer, read-only
+    map_layer = None
+
+    # Goal positions as arrays indexed by the team index
+    goal_pos = None
+
+    # Agent indexes of the other agents for each agent with the shape
+    # (agent_size, agent_size - 1)
+    other_agent_indexes = None
+
+    # Preallocated observation
+    buffers = None
+
+    # Layout of the flat observation as a list of (name, shape) in order
+    flat_layout = None
+
+    # Data type and size of the flat observation
+    flat_dtype = None
+    flat_size = None
+
+    # Preallocated flat observation and its views
+    flat_buffer = None
+    flat_views = None
+
+    def __init__(self, map_data, options, num_envs=None):
+        self.map_data = map_data
+        self.options = options
+        self.batch_shape = () if num_envs is None else (num_envs,)
+        # Walkable: 1, player goal: 2, computer goal: 3
+        self.map_layer = map_data.walkable_grid.astype(np.float64)
+        self.map_layer[map_data.goal_grid == Teams.PLAYER] = 2
+        self.map_layer[map_data.goal_grid == Teams.COMPUTER] = 3
+        self.map_layer.setflags(write=False)
+        self.goal_pos = [np.array(map_data.goals[team_name.name],
+                                  dtype=np.float64).reshape(-1, 2)
+                         for team_name in Teams]
+        agent_size = options.agent_size
+        agent_index = np.arange(agent_size)
+        self.other_agent_indexes = np.array(
+            [np.delete(agent_index, idx) for idx in agent_index],
+            dtype=np.int64).reshape(agent_size, agent_size - 1)
+        self.buffers = self.allocate()
+        # Initialize the flat layout and its buffer
+        self._init_flat_layout()
+        self.flat_buffer = self.allocate_flat()
+        self.flat_views = self._get_flat_views(self.flat_buffer)
+
+    def allocate(self):
+        """Allocate a new observation buffer.
+
+        The map layer in the buffer is a read-only view of the static map
+        layer.
+
+        Returns:
+            dict: The observation buffer.
+        """
+        agent_size = self.options.agent_size
+        agent_shape = self.batch_shape + (agent_size,)
+        return {
+            'map': np.broadcast_to(self.map_layer,
+                                   self.batch_shape + self.map_layer.shape),
+            'agent_pos': np.zeros(agent_shape + (2,)),
+            'relative': {
+                'player_goals': np.zeros(
+                    agent_shape + self.goal_pos[Teams.PLAYER].shape),
+                'computer_goals': np.zeros(
+                    agent_shape + self.goal_pos[Teams.COMPUTER].shape),
+                'other_agent_pos': np.zeros(agent_shape + (agent_size - 1, 2)),
+            },
+            'ball': np.zeros(agent_shape),
+            'mode': np.zeros(agent_shape),
+            'action': np.zeros(agent_shape),
+        }
+
+    def build(self, agent_pos, agent_ball, agent_mode, agent_action,
+              out=None):
+        """Build the observation.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (batch_shape..., agent_size, 2).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (batch_shape..., agent_size).
+            agent_mode (numpy.ndarray): The agent modes with the shape
+                (batch_shape..., agent_size).
+            agent_action (numpy.ndarray): The taken actions with the shape
+                (batch_shape..., agent_size).
+            out (dict): The buffer to write into. The preallocated buffer is
+                used if it's not given.
+
+        Returns:
+            dict: The observation.
+        """
+        if out is None:
+            out = self.buffers
+        # Only copy the map layer into the buffers not viewing it
+        if not np.may_share_memory(out['map'], self.map_layer):
+            out['map'][...] = self.map_layer
+        pos = out['agent_pos']
+        pos[...] = agent_pos
+        relative = out['relative']
+        np.subtract(self.goal_pos[Teams.PLAYER], pos[..., None, :],
+                    out=relative['player_goals'])
+        np.subtract(self.goal_pos[Teams.COMPUTER], pos[..., None, :],
+                    out=relative['computer_goals'])
+        np.subtract(pos[..., self.other_agent_indexes, :], pos[..., None, :],
+                    out=relative['other_agent_pos'])
+        out['ball'][...] = agent_ball
+        out['mode'][...] = agent_mode
+        out['action'][...] = agent_action
+        return out
+
+    def get_observation_space(self, flat=False):
+        """Get the observation space.
+
+        Args:
+            flat (bool): Whether to get the space of the flat observation.
+
+        Returns:
+            gym.Space: The Box of the flat observation, or the Dict of float64
+                Boxes with the same layout as allocate().
+        """
+        bounds = self._get_bounds()
+        if flat:
+            low = np.concatenate([bounds[name][0].ravel()
+                                  for (name, _) in self.flat_layout])
+            high = np.concatenate([bounds[name][1].ravel()
+                                   for (name, _) in self.flat_layout])
+            low = np.broadcast_to(low, self.batch_shape + low.shape)
+            high = np.broadcast_to(high, self.batch_shape + high.shape)
+            return gym.spaces.Box(low=low.astype(self.flat_dtype),
+                                  high=high.astype(self.flat_dtype),
+                                  dtype=self.flat_dtype)
+
+        def box(name):
+            (low, high) = bounds[name]
+            return gym.spaces.Box(
+                low=np.broadcast_to(low, self.batch_shape + low.shape),
+                high=np.broadcast_to(high, self.batch_shape + high.shape),
+                dtype=np.float64)
+
+        return gym.spaces.Dict({
+            'map': box('map'),
+            'agent_pos': box('agent_pos'),
+            'relative': gym.spaces.Dict({
+                'player_goals': box('player_goals'),
+                'computer_goals': box('computer_goals'),
+                'other_agent_pos': box('other_agent_pos'),
+            }),
+            'ball': box('ball'),
+            'mode': box('mode'),
+            'action': box('action'),
+        })
+
+    def allocate_flat(self):
+        """Allocate a new flat observation buffer with the map layer filled.
+
+        Returns:
+            numpy.ndarray: The flat observation buffer.
+        """
+        flat = np.zeros(self.batch_shape + (self.flat_size,),
+                        dtype=self.flat_dtype)
+        flat[..., :self.map_layer.size] = self.map_layer.ravel()
+        return flat
+
+    def build_flat(self, agent_pos, agent_ball, agent_mode, agent_action,
+                   out=None):
+        """Build the flat observation directly without the dict.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (batch_shape..., agent_size, 2).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (batch_shape..., agent_size).
+            agent_mode (numpy.ndarray): The agent modes with the shape
+                (batch_shape..., agent_size).
+            agent_action (numpy.ndarray): The taken actions with the shape
+                (batch_shape..., agent_size).
+            out (numpy.ndarray): The buffer to write into, allocated by
+                allocate_flat(). The preallocated buffer is used if it's not
+                given.
+
+        Returns:
+            numpy.ndarray: The flat observation.
+        """
+        if out is None:
+            (out, views) = (self.flat_buffer, self.flat_views)
+        else:
+            views = self._get_flat_views(out)
+            views['map'][...] = self.map_layer
+        views['agent_pos'][...] = agent_pos
+        for (name, team_name) in [('player_goals', Teams.PLAYER),
+                                  ('computer_goals', Teams.COMPUTER)]:
+            np.subtract(self.goal_pos[team_name].astype(np.int64),
+                        agent_pos[..., None, :], out=views[name],
+                        casting='unsafe')
+        np.subtract(agent_pos[..., self.other_agent_indexes, :],
+                    agent_pos[..., None, :], out=views['other_agent_pos'],
+                    casting='unsafe')
+        views['ball'][...] = agent_ball
+        views['mode'][...] = agent_mode
+        views['action'][...] = agent_action
+        return out
+
+    def _init_flat_layout(self):
+        agent_size = self.options.agent_size
+        self.flat_layout = [
+            ('map', self.map_layer.shape),
+            ('agent_pos', (agent_size, 2)),
+            ('player_goals',
+             (agent_size,) + self.goal_pos[Teams.PLAYER].shape),
+            ('computer_goals',
+             (agent_size,) + self.goal_pos[Teams.COMPUTER].shape),
+            ('other_agent_pos', (agent_size, agent_size - 1, 2)),
+            ('ball', (agent_size,)),
+            ('mode', (agent_size,)),
+            ('action', (agent_size,)),
+        ]
+        self.flat_size = int(sum(np.prod(shape)
+                                 for (_, shape) in self.flat_layout))
+        # Use int8 if the relative offsets fit in it
+        max_offset = np.max(self.map_data.map_size) - 1
+        if max_offset <= np.iinfo(np.int8).max:
+            self.flat_dtype = np.dtype(np.int8)
+        else:
+            self.flat_dtype = np.dtype(np.int16)
+
+    def _get_flat_views(self, flat):
+        views = {}
+        begin = 0
+        for (name, shape) in self.flat_layout:
+            end = begin + int(np.prod(shape))
+            view = flat[..., begin:end].reshape(self.batch_shape + shape)
+            if not np.may_share_memory(view, flat):
+                raise ValueError('The flat observation buffer must be '
+                                 'allocated by allocate_flat()')
+            views[name] = view
+            begin = end
+        return views
+
+    def _get_bounds(self):
+        map_size = self.map_data.map_size
+        agent_size = self.options.agent_size
+        max_pos = map_size - 1
+        shapes = dict(self.flat_layout)
+
+        def bound(low, high, shape):
+            return (np.broadcast_to(low, shape).astype(np.float64),
+                    np.broadcast_to(high, shape).astype(np.float64))
+
+        return {
+            'map': bound(0, 3, shapes['map']),
+            'agent_pos': bound(0, max_pos, shapes['agent_pos']),
+            'player_goals': bound(-max_pos, max_pos, shapes['player_goals']),
+            'computer_goals': bound(-max_pos, max_pos,
+                                    shapes['computer_goals']),
+            'other_agent_pos': bound(-max_pos, max_pos,
+                                     shapes['other_agent_pos']),
+            'ball': bound(0, 1, (agent_size,)),
+            'mode': bound(0, len(AgentModes) - 1, (agent_size,)),
+            'action': bound(0, len(Actions) - 1, (agent_size,)),
+        }
+
+
+def copy_observation(observation):
+    """Copy the observation.
+
+    Args:
+        observation (dict or numpy.ndarray): The dict or the flat observation.
+
+    Returns:
+        dict or numpy.ndarray: The copied observation with its own arrays.
+    """
+    if isinstance(observation, dict):
+        return {key: copy_observation(value)
+                for (key, value) in observation.items()}
+    return np.array(observation)
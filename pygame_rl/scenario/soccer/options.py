@@ -17,7 +17,19 @@ class Options(object):
     # Frame skip for AI
     ai_frame_skip = 1
 
-    def __init__(self, map_path=None, team_size=1, ai_frame_skip=1):
+    # Whether to return the flat observation, see ObservationBuilder
+    flat_obs = False
+
+    # Whether the AI finds the nearest opponents with a grid-bucket index
+    # instead of scanning all the opponents, see GridBucketIndex
+    spatial_index = False
+
+    # Number of the initial states pregenerated at once for the resets, 0 to
+    # draw them on each reset, see InitialStateSampler
+    reset_pool_size = 0
+
+    def __init__(self, map_path=None, team_size=1, ai_frame_skip=1,
+                 flat_obs=False, spatial_index=False, reset_pool_size=0):
         # Save the map path or use the internal resource
         if map_path:
             self.map_path = map_path
@@ -27,6 +39,12 @@ class Options(object):
         self.team_size = team_size
         # Save the frame skip
         self.ai_frame_skip = ai_frame_skip
+        # Save the observation type
+        self.flat_obs = flat_obs
+        # Save the nearest opponent search
+        self.spatial_index = spatial_index
+        # Save the size of the initial state pool
+        self.reset_pool_size = reset_pool_size
 
     @property
     def agent_size(self):
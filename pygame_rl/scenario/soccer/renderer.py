@@ -35,11 +35,11 @@ class Renderer(TiledRenderer):
     prev_ball_state = None
 
     def __init__(self, map_path, env, renderer_options=None):
-        super().__init__(map_path)
-        # Save the environment
-        self.env = env
         # Use or create the renderer options
         self.renderer_options = renderer_options or RendererOptions()
+        super().__init__(map_path, self.renderer_options.tile_size)
+        # Save the environment
+        self.env = env
 
     def load(self):
         # Initialize Pygame
@@ -79,8 +79,9 @@ class Renderer(TiledRenderer):
         # Close the display if the renderer options is set to disable the
         # display
         if not self.display_quitted and not self.renderer_options.show_display:
-            # Replace the screen surface with in-memory surface
-            self.screen = self.screen.copy()
+            # Replace the screen surface with in-memory surface backed by the
+            # frame array
+            self.screen = self.create_frame_surface(self.screen)
             # Close the display
             pygame.display.quit()
             # Prevent from further closing
@@ -96,6 +97,7 @@ class Renderer(TiledRenderer):
 
         # Draw the overlays
         dirty = self.dirty_groups.draw(self.screen)
+        self.add_dirty_rects(dirty)
 
         # Update only the dirty surface
         if self.renderer_options.show_display:
@@ -4,8 +4,20 @@ class RendererOptions(object):
     show_display = False
     max_fps = 0
     enable_key_events = False
+    # Whether to composite the frames by NumPy without pygame surfaces, which
+    # doesn't support the display
+    numpy_backend = False
+    # Rendered tile width and height in pixels dividing the tile size of the
+    # map, the tiles are prescaled at loading, None to keep the map tile size
+    tile_size = None
 
-    def __init__(self, show_display=False, max_fps=0, enable_key_events=False):
+    def __init__(self, show_display=False, max_fps=0, enable_key_events=False,
+                 numpy_backend=False, tile_size=None):
+        if show_display and numpy_backend:
+            raise ValueError('The display isn\'t supported by the NumPy '
+                             'backend')
         self.show_display = show_display
         self.max_fps = max_fps
         self.enable_key_events = enable_key_events
+        self.numpy_backend = numpy_backend
+        self.tile_size = tile_size
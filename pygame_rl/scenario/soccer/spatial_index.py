@@ -0,0 +1,142 @@
+# Third-party modules
+import numpy as np
+
+
+class GridBucketIndex(object):
+    """Grid-bucket index of the agent positions for the nearest-agent queries.
+
+    The map is divided into square buckets. build() sorts the agents of all
+    the games by the game, the team and the bucket, and
+    get_nearest_agents() answers the queries of all the agents at once by
+    searching the rings of buckets around the query positions outward, one
+    vectorized pass per ring. A query stops once the next ring can't contain a
+    nearer agent, so the cost no longer grows with the number of agents in the
+    other buckets.
+
+    The results are the same as scanning all the agents of the team: the
+    nearest agent in Euclidean distance, and the lowest agent index among the
+    ties.
+    """
+    # Bucket size in tiles
+    bucket_size = None
+
+    # Number of buckets along each axis
+    bucket_shape = None
+
+    # Team index of each agent
+    agent_team = None
+
+    # Bucket offsets of each ring indexed by the ring index
+    ring_offsets = None
+
+    # Agent positions with the shape (game_size * agent_size, 2)
+    flat_agent_pos = None
+
+    # Flat agent indexes "game_index * agent_size + agent_index" sorted by the
+    # bucket keys
+    sorted_agents = None
+
+    # Start of each bucket key in the sorted agents, with an extra end
+    bucket_start = None
+
+    def __init__(self, map_size, agent_team, bucket_size=4):
+        self.bucket_size = bucket_size
+        self.bucket_shape = -(-np.asarray(map_size) // bucket_size)
+        self.agent_team = np.asarray(agent_team)
+        # Build the bucket offsets with the Chebyshev distance of each ring
+        ring_size = int(np.max(self.bucket_shape))
+        self.ring_offsets = []
+        for ring in range(ring_size):
+            offsets = [[dx, dy]
+                       for dx in range(-ring, ring + 1)
+                       for dy in range(-ring, ring + 1)
+                       if max(abs(dx), abs(dy)) == ring]
+            self.ring_offsets.append(np.array(offsets, dtype=np.int64))
+
+    def build(self, agent_pos):
+        """Build the index over the agent positions.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (game_size, agent_size, 2).
+        """
+        (game_size, agent_size) = agent_pos.shape[:2]
+        team_num = np.max(self.agent_team) + 1
+        self.flat_agent_pos = agent_pos.reshape(-1, 2)
+        team = np.broadcast_to(self.agent_team, (game_size, agent_size))
+        game_index = np.broadcast_to(np.arange(game_size)[:, None],
+                                     (game_size, agent_size))
+        keys = self._get_bucket_keys(game_index.ravel(), team.ravel(),
+                                     self.flat_agent_pos // self.bucket_size)
+        self.sorted_agents = np.argsort(keys, kind='stable')
+        key_size = game_size * team_num * np.prod(self.bucket_shape)
+        counts = np.bincount(keys, minlength=key_size)
+        self.bucket_start = np.concatenate([[0], np.cumsum(counts)])
+
+    def get_nearest_agents(self, game_index, source_pos, target_team):
+        """Get the nearest agents of the teams to the positions.
+
+        Args:
+            game_index (numpy.ndarray): The game indexes of the queries with the
+                shape (size,).
+            source_pos (numpy.ndarray): The query positions with the shape
+                (size, 2).
+            target_team (numpy.ndarray): The team indexes to search with the
+                shape (size,).
+
+        Returns:
+            numpy.ndarray: The agent indexes with the shape (size,), -1 if the
+                team has no agents.
+        """
+        size = len(game_index)
+        agent_size = len(self.agent_team)
+        best_dist = np.full(size, np.inf)
+        best_agent = np.full(size, -1, dtype=np.int64)
+        source_bucket = source_pos // self.bucket_size
+        active = np.arange(size)
+        for (ring, offsets) in enumerate(self.ring_offsets):
+            if len(active) <= 0:
+                break
+            # Get the buckets on the ring
+            buckets = source_bucket[active, None, :] + offsets[None, :, :]
+            valid = np.all((buckets >= 0) & (buckets < self.bucket_shape),
+                           axis=2)
+            keys = self._get_bucket_keys(game_index[active, None],
+                                         target_team[active, None],
+                                         np.where(valid[..., None], buckets, 0))
+            bucket_begin = self.bucket_start[keys]
+            bucket_end = self.bucket_start[keys + 1]
+            starts = bucket_begin.ravel()
+            counts = np.where(valid, bucket_end - bucket_begin, 0).ravel()
+            total = np.sum(counts)
+            if total > 0:
+                # Gather the agents in the buckets
+                bucket_rep = np.repeat(np.arange(len(counts)), counts)
+                within = np.arange(total) - np.repeat(
+                    np.cumsum(counts) - counts, counts)
+                flat_agent = self.sorted_agents[starts[bucket_rep] + within]
+                owner = active[bucket_rep // len(offsets)]
+                diff = self.flat_agent_pos[flat_agent] - source_pos[owner]
+                dist = np.hypot(diff[:, 0], diff[:, 1])
+                agent = flat_agent % agent_size
+                # Find the nearest agent with the lowest index of each query
+                order = np.lexsort((agent, dist, owner))
+                sorted_owner = owner[order]
+                first = order[np.concatenate(
+                    [[True], sorted_owner[1:] != sorted_owner[:-1]])]
+                (owner, dist, agent) = (owner[first], dist[first], agent[first])
+                better = ((dist < best_dist[owner])
+                          | ((dist == best_dist[owner])
+                             & (agent < best_agent[owner])))
+                best_dist[owner[better]] = dist[better]
+                best_agent[owner[better]] = agent[better]
+            # Continue only if the next ring may contain the nearer agents
+            next_lower_bound = ring * self.bucket_size + 1
+            active = active[best_dist[active] >= next_lower_bound]
+        return best_agent
+
+    def _get_bucket_keys(self, game_index, team, buckets):
+        team_num = np.max(self.agent_team) + 1
+        bucket_index = buckets[..., 0] * self.bucket_shape[1] + buckets[..., 1]
+        return ((game_index * team_num + team) * np.prod(self.bucket_shape)
+                + bucket_index)
@@ -1,30 +1,82 @@
+# Native modules
+from collections import namedtuple
+
 # Third-party modules
 import numpy as np
 
 # Project modules
 from pygame_rl.scenario.soccer.actions import Actions
 from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.initial_state_sampler import \
+    InitialStateSampler
+from pygame_rl.scenario.soccer.observation import ObservationBuilder
+from pygame_rl.scenario.soccer.state_encoder import StateEncoder
 from pygame_rl.scenario.soccer.teams import Teams
+from pygame_rl.scenario.soccer.zobrist import get_zobrist_keys
+
+
+# Immutable snapshot of the mutable game state, holding read-only copies of
+# the agent arrays, the time step and the positions of the random state and
+# the pool of the initial states
+StateSnapshot = namedtuple('StateSnapshot', [
+    'agent_pos',
+    'agent_ball',
+    'agent_mode',
+    'agent_action',
+    'agent_frame_skip_index',
+    'time_step',
+    'random_state',
+    'zobrist_hash',
+    'pool_state',
+])
 
 
 class State(object):
     """The internal soccer state.
+
+    The agent statuses are stored as a structure of arrays indexed by the agent
+    index, so that the engine can read and update all the agents at once. The
+    per-agent getters and setters are kept as a compatibility layer on top of
+    the arrays.
+
+    A 64-bit Zobrist hash of the statuses in the hash and the time step is
+    maintained incrementally by the setters, so hashing is O(1) and unequal
+    states are usually told apart by comparing the hashes first. The winning
+    team is computed once from the agent having the ball and cached until the
+    positions or the ball possession change, so the reward and the terminal
+    flag of a step share the same lookup. Write the statuses through the
+    setters to keep the hash and the winning team in sync.
     """
-    # Agent statuses as a list
-    # * pos: Positions
-    # * ball: Possession of the ball
-    # * mode: Mode for the agent
-    # * action: Last taken action for the agent
-    # * frame_skip_index: Current frame skipping index, starting from 0,
+    # Agent statuses as arrays
+    # * agent_pos: Positions with the shape (agent_size, 2), -1 if unset
+    # * agent_ball: Possession of the ball
+    # * agent_mode: Mode for the agent, -1 if unset
+    # * agent_action: Last taken action for the agent, -1 if unset
+    # * agent_frame_skip_index: Current frame skipping index, starting from 0,
     # resetting after it reaches the frame skip
-    agent_list = []
-
-    # Position to object index map
-    pos_map = None
+    # * agent_team: Team index for the agent
+    agent_pos = None
+    agent_ball = None
+    agent_mode = None
+    agent_action = None
+    agent_frame_skip_index = None
+    agent_team = None
+
+    # Occupancy grid with the same shape as the map, holding the agent index at
+    # each position or -1 if the position is empty
+    pos_grid = None
 
     # Time step
     time_step = 0
 
+    # Zobrist keys and the incrementally maintained hash
+    zobrist_keys = None
+    zobrist_hash = 0
+
+    # Cached team index of the winning team, -1 if no team has won, None if it
+    # has to be computed again
+    win_team = None
+
     # Soccer environment
     env = None
 
@@ -37,78 +89,82 @@ class State(object):
     # Random state
     random_state = None
 
+    # Observation builder
+    obs_builder = None
+
+    # Integer state encoder
+    state_encoder = None
+
+    # Sampler of the initial agent statuses
+    initial_state_sampler = None
+
     def __init__(self, env, env_options, map_data, random_state):
         self.env = env
         self.env_options = env_options
         self.map_data = map_data
         self.random_state = random_state
+        self.obs_builder = ObservationBuilder(map_data, env_options)
+        self.state_encoder = StateEncoder(map_data, env_options)
+        self.zobrist_keys = get_zobrist_keys(
+            env_options.agent_size, tuple(map(int, map_data.map_size)))
+        self.initial_state_sampler = InitialStateSampler(map_data,
+                                                         env_options)
+        # Initialize the agent arrays
+        self._reset_agent_list()
+        # Initialize the position map
+        self._reset_pos_map()
         self.reset()
 
     def update_random_state(self, random_state):
         self.random_state = random_state
+        # Draw the pooled initial states from the new random state
+        self.initial_state_sampler.discard_pool()
 
     def reset(self):
-        # Initialize the agent list
-        self._reset_agent_list()
-        # Reset position map
-        self._reset_pos_map()
-        # Randomize the agent statuses
-        self.randomize()
         # Initialize the time step
         self.time_step = 0
+        # Randomize the agent statuses, which computes the hash
+        self.randomize()
 
     def randomize(self):
-        # Choose a random agent in a random team to possess the ball
-        rand_idx = self.random_state.randint(len(Teams))
-        team_has_ball = Teams(rand_idx)
-        team_agent_has_ball = self.random_state.randint(
-            self.env_options.team_size)
-        # Set the properties for each team and each agent
-        for team_name in Teams:
-            for team_agent_index in range(self.env_options.team_size):
-                # Get the agent index
-                agent_index = self.env.get_agent_index(
-                    team_name, team_agent_index)
-                # Randomize the agent positions
-                found_pos = False
-                while not found_pos:
-                    spawn_list = self.map_data.spawn[team_name.name]
-                    rand_idx = self.random_state.randint(len(spawn_list))
-                    agent_pos = spawn_list[rand_idx]
-                    if not self.get_pos_status(agent_pos):
-                        self.set_agent_pos(agent_index, agent_pos)
-                        found_pos = True
-                # Randomize the possession of the ball
-                set_ball = (team_name == team_has_ball
-                            and team_agent_index == team_agent_has_ball)
-                if set_ball:
-                    self.set_agent_ball(agent_index, True)
-                else:
-                    self.set_agent_ball(agent_index, False)
-                # Randomize the agent mode
-                rand_idx = self.random_state.randint(len(AgentModes))
-                agent_mode = AgentModes(rand_idx)
-                self.set_agent_mode(agent_index, agent_mode)
-                # Reset the action
-                self.set_agent_action(agent_index, Actions.STAND)
+        """Set the agent statuses drawn by the initial state sampler.
+
+        The actions are reset to STAND and the frame skipping indexes to 0.
+        """
+        (agent_pos, agent_ball, agent_mode) = \
+            self.initial_state_sampler.take(self.random_state, 1)
+        self.agent_pos[:] = agent_pos[0]
+        self.agent_ball[:] = agent_ball[0]
+        self.agent_mode[:] = agent_mode[0]
+        self.agent_action[:] = Actions.STAND
+        self.agent_frame_skip_index[:] = 0
+        self.win_team = None
+        self._rebuild_pos_grid()
+        # Compute the hash from scratch as the arrays are written directly
+        self.zobrist_hash = self.compute_zobrist_hash()
 
     def is_terminal(self):
-        # When the time step exceeds 100
-        if self.time_step >= 100:
-            return True
-        # When one of the agent reaches the goal
-        for agent_index in range(self.env_options.agent_size):
-            if self.is_agent_win(agent_index):
-                return True
-        # Otherwise, the state isn't terminal
-        return False
+        # When the time step exceeds 100 or one of the teams wins
+        return self.time_step >= 100 or self.get_win_team() >= 0
 
     def is_team_win(self, team_name):
-        for team_agent_index in range(self.env_options.team_size):
-            agent_index = self.env.get_agent_index(team_name, team_agent_index)
-            if self.is_agent_win(agent_index):
-                return True
-        return False
+        return self.get_win_team() == team_name
+
+    def get_win_team(self):
+        """Get the team whose agent has carried the ball to its goal area.
+
+        Returns:
+            int: The team index or -1 if no team has won.
+        """
+        if self.win_team is None:
+            self.win_team = -1
+            agent_index = int(self.agent_ball.argmax())
+            if self.agent_ball[agent_index]:
+                (x, y) = self.agent_pos[agent_index].tolist()
+                team = int(self.agent_team[agent_index])
+                if x >= 0 and self.map_data.goal_grid[x, y] == team:
+                    self.win_team = team
+        return self.win_team
 
     def is_agent_win(self, agent_index):
         # Get the agent statuses
@@ -117,133 +173,226 @@ class State(object):
         # Agent cannot win if he doesn't possess the ball
         if not has_ball:
             return False
-        # Get the team name
-        team_name = Teams(agent_index)
-        # Check whether the position is in the goal area
-        return agent_pos in self.map_data.goals[team_name.name]
-
-    def get_gym_state(self, map_size):
-        agent_size = len(self.agent_list)
-        player_goal_size = len(self.map_data.goals['PLAYER'])
-        computer_goal_size = len(self.map_data.goals['COMPUTER'])
-        map_2d = np.zeros(map_size)
-        agent_pos_list = np.zeros((agent_size, 2))
-        rel_player_goals = np.zeros((agent_size, player_goal_size, 2))
-        rel_computer_goals = np.zeros((agent_size, computer_goal_size, 2))
-        rel_other_agent_pos = np.zeros((agent_size, agent_size - 1, 2))
-        ball_list = np.zeros(agent_size)
-        mode_list = np.zeros(agent_size)
-        action_list = np.zeros(agent_size)
-        for pos in self.map_data.walkable:
-            # Walkable
-            map_2d[tuple(pos)] = 1
-        for pos in self.map_data.goals['PLAYER']:
-            # Player goal
-            map_2d[tuple(pos)] = 2
-        for pos in self.map_data.goals['COMPUTER']:
-            # Computer goal
-            map_2d[tuple(pos)] = 3
-        for idx, agent in enumerate(self.agent_list):
-            # Agent
-            ball_list[idx] = self.get_agent_ball(idx)
-            mode_list[idx] = self.get_agent_mode(idx)
-            action_list[idx] = self.get_agent_action(idx)
-            # Agent position
-            agent_pos = agent['pos']
-            agent_pos_list[idx, :] = agent_pos
-            # Other agent positions
-            for other_idx, other_agent in enumerate(self.agent_list):
-                if idx != other_idx:
-                    other_agent_pos = other_agent['pos']
-                    rel_other_agent_pos[idx, :] = self.get_rel_pos(
-                        agent_pos, other_agent_pos)
-            # Relative goal positions
-            for pos_idx, goal in enumerate(self.map_data.goals['PLAYER']):
-                rel_player_goals[idx, pos_idx, :] = self.get_rel_pos(
-                    agent_pos, goal)
-            for pos_idx, goal in enumerate(self.map_data.goals['COMPUTER']):
-                rel_computer_goals[idx, pos_idx, :] = self.get_rel_pos(
-                    agent_pos, goal)
-        return {
-            'map': map_2d,
-            'agent_pos': agent_pos_list,
-            'relative': {
-                'player_goals': rel_player_goals,
-                'computer_goals': rel_computer_goals,
-                'other_agent_pos': rel_other_agent_pos,
-            },
-            'ball': ball_list,
-            'mode': mode_list,
-            'action': action_list,
-        }
+        # Check whether the position is in the goal area of the team
+        return self.map_data.get_goal_team(agent_pos) == \
+            self.agent_team[agent_index]
+
+    def get_snapshot(self):
+        """Get a snapshot of the mutable game state.
+
+        Returns:
+            StateSnapshot: The snapshot.
+        """
+        arrays = []
+        for array in (self.agent_pos, self.agent_ball, self.agent_mode,
+                      self.agent_action, self.agent_frame_skip_index):
+            array = array.copy()
+            array.flags.writeable = False
+            arrays.append(array)
+        return StateSnapshot(*arrays, self.time_step,
+                             self.random_state.get_state(), self.zobrist_hash,
+                             self.initial_state_sampler.get_pool_state())
+
+    def restore_snapshot(self, snapshot):
+        """Restore the mutable game state from a snapshot.
+
+        Args:
+            snapshot (StateSnapshot): The snapshot from get_snapshot().
+        """
+        self.agent_pos[:] = snapshot.agent_pos
+        self.agent_ball[:] = snapshot.agent_ball
+        self.agent_mode[:] = snapshot.agent_mode
+        self.agent_action[:] = snapshot.agent_action
+        self.agent_frame_skip_index[:] = snapshot.agent_frame_skip_index
+        self.time_step = snapshot.time_step
+        self.random_state.set_state(snapshot.random_state)
+        self.initial_state_sampler.set_pool_state(snapshot.pool_state,
+                                                  self.random_state)
+        self.zobrist_hash = snapshot.zobrist_hash
+        self.win_team = None
+        self._rebuild_pos_grid()
+
+    def encode(self):
+        """Encode the state as an integer.
+
+        See StateEncoder for the digits. The code is unique for the agent
+        positions, the ball possession, the agent modes and the time step, and
+        the last taken actions if the AI frame skip is greater than 1.
+
+        Returns:
+            int: The code in [0, state_encoder.state_size).
+        """
+        return self.state_encoder.encode(self.agent_pos, self.agent_ball,
+                                         self.agent_mode, self.agent_action,
+                                         self.time_step)
+
+    def decode(self, code):
+        """Set the state from an integer code.
+
+        Args:
+            code (int): The code from encode().
+        """
+        (self.agent_pos[:], self.agent_ball[:], self.agent_mode[:],
+         self.agent_action[:], self.agent_frame_skip_index[:],
+         self.time_step) = self.state_encoder.decode(code)
+        self.zobrist_hash = self.compute_zobrist_hash()
+        self.win_team = None
+        self._rebuild_pos_grid()
+
+    def compute_zobrist_hash(self):
+        """Compute the Zobrist hash from scratch.
+
+        Returns:
+            int: The 64-bit hash, which equals the maintained hash.
+        """
+        return self.zobrist_keys.get_hash(
+            self.agent_pos, self.agent_ball, self.agent_mode,
+            self.agent_action, self.time_step)
+
+    def get_gym_state(self, out=None):
+        """Get the observation built from the agent arrays.
+
+        See ObservationBuilder for the layout. The returned arrays are reused
+        by the next call unless "out" is given.
+
+        Args:
+            out (dict): The caller-provided buffer to write into.
+
+        Returns:
+            dict: The observation.
+        """
+        return self.obs_builder.build(self.agent_pos, self.agent_ball,
+                                      self.agent_mode, self.agent_action, out)
+
+    def get_flat_gym_state(self, out=None):
+        """Get the flat observation built from the agent arrays.
+
+        See ObservationBuilder.build_flat(). The returned array is reused by
+        the next call unless "out" is given.
+
+        Args:
+            out (numpy.ndarray): The caller-provided buffer to write into.
+
+        Returns:
+            numpy.ndarray: The flat observation.
+        """
+        return self.obs_builder.build_flat(
+            self.agent_pos, self.agent_ball, self.agent_mode,
+            self.agent_action, out)
+
+    @property
+    def agent_list(self):
+        """Agent statuses as a list of dicts.
+
+        The list is built from the agent arrays on each access, modifying it
+        doesn't change the state.
+        """
+        return [{
+            'pos': self.get_agent_pos(agent_index),
+            'ball': self.get_agent_ball(agent_index),
+            'mode': self.get_agent_mode(agent_index),
+            'action': self.get_agent_action(agent_index),
+            'frame_skip_index': self.get_agent_frame_skip_index(agent_index),
+        } for agent_index in range(self.env_options.agent_size)]
 
     def get_agent_pos(self, agent_index):
-        return self.agent_list[agent_index]['pos']
+        pos = self.agent_pos[agent_index]
+        if pos[0] < 0:
+            return None
+        return pos.tolist()
 
     def set_agent_pos(self, agent_index, pos):
-        # Get old position
-        old_pos = self.agent_list[agent_index].get('pos', None)
-        # Remove old position from map
-        if old_pos:
-            old_pos_tuple = tuple(old_pos)
-            self.pos_map.pop(old_pos_tuple, None)
-        # Set position in map
-        if pos:
-            pos_tuple = tuple(pos)
-            self.pos_map[pos_tuple] = agent_index
-        # Set the new position
-        self.agent_list[agent_index]['pos'] = pos
+        x_keys = self.zobrist_keys.pos_x_key_list[agent_index]
+        y_keys = self.zobrist_keys.pos_y_key_list[agent_index]
+        # Remove old position from map and hash
+        old_pos = self.agent_pos[agent_index]
+        if old_pos[0] >= 0:
+            old_pos_tuple = (old_pos[0], old_pos[1])
+            if self.pos_grid[old_pos_tuple] == agent_index:
+                self.pos_grid[old_pos_tuple] = -1
+        self.zobrist_hash ^= x_keys[old_pos[0] + 1] ^ y_keys[old_pos[1] + 1]
+        # Set the new position and the position in map
+        if pos is None:
+            self.agent_pos[agent_index] = -1
+        else:
+            self.agent_pos[agent_index] = pos
+            self.pos_grid[pos[0], pos[1]] = agent_index
+        new_pos = self.agent_pos[agent_index]
+        self.zobrist_hash ^= x_keys[new_pos[0] + 1] ^ y_keys[new_pos[1] + 1]
+        self.win_team = None
 
     def get_agent_ball(self, agent_index):
-        return self.agent_list[agent_index]['ball']
+        return bool(self.agent_ball[agent_index])
 
     def set_agent_ball(self, agent_index, has_ball):
-        self.agent_list[agent_index]['ball'] = has_ball
+        keys = self.zobrist_keys.ball_key_list[agent_index]
+        self.zobrist_hash ^= keys[int(self.agent_ball[agent_index])]
+        self.agent_ball[agent_index] = has_ball
+        self.zobrist_hash ^= keys[int(self.agent_ball[agent_index])]
+        self.win_team = None
 
     def get_agent_mode(self, agent_index):
-        return self.agent_list[agent_index]['mode']
+        mode = self.agent_mode[agent_index]
+        if mode < 0:
+            return None
+        return AgentModes(mode)
 
     def set_agent_mode(self, agent_index, mode):
-        self.agent_list[agent_index]['mode'] = mode
+        keys = self.zobrist_keys.mode_key_list[agent_index]
+        self.zobrist_hash ^= keys[self.agent_mode[agent_index] + 1]
+        self.agent_mode[agent_index] = -1 if mode is None else mode
+        self.zobrist_hash ^= keys[self.agent_mode[agent_index] + 1]
 
     def get_agent_action(self, agent_index):
-        return self.agent_list[agent_index]['action']
+        action = self.agent_action[agent_index]
+        if action < 0:
+            return None
+        return Actions(action)
 
     def set_agent_action(self, agent_index, action):
-        self.agent_list[agent_index]['action'] = action
+        keys = self.zobrist_keys.action_key_list[agent_index]
+        self.zobrist_hash ^= keys[self.agent_action[agent_index] + 1]
+        self.agent_action[agent_index] = -1 if action is None else action
+        self.zobrist_hash ^= keys[self.agent_action[agent_index] + 1]
+
+    def set_agent_actions(self, actions):
+        """Set the last taken actions of all the agents.
+
+        Args:
+            actions (numpy.ndarray): The actions indexed by the agent index.
+        """
+        for agent_index in np.flatnonzero(self.agent_action != actions):
+            self.set_agent_action(agent_index, actions[agent_index])
 
     def get_agent_frame_skip_index(self, agent_index):
-        return self.agent_list[agent_index]['frame_skip_index']
+        return int(self.agent_frame_skip_index[agent_index])
 
     def set_agent_frame_skip_index(self, agent_index, frame_skip_index):
-        self.agent_list[agent_index]['frame_skip_index'] = frame_skip_index
+        self.agent_frame_skip_index[agent_index] = frame_skip_index
 
     def get_pos_status(self, pos):
-        pos_tuple = tuple(pos)
-        agent_index = self.pos_map.get(pos_tuple, None)
-        if agent_index:
-            team_name = Teams(agent_index)
+        agent_index = self.pos_grid[pos[0], pos[1]]
+        if agent_index >= 0:
+            team_name = Teams(self.agent_team[agent_index])
             team_agent_index = self.env.get_team_agent_index(agent_index)
             return {
                 'team_name': team_name,
                 'team_agent_index': team_agent_index,
-                'agent_index': agent_index,
+                'agent_index': int(agent_index),
             }
         else:
             return None
 
     def get_ball_possession(self):
-        for team_name in Teams:
-            for team_agent_index in range(self.env_options.team_size):
-                agent_index = self.env.get_agent_index(
-                    team_name, team_agent_index)
-                if self.get_agent_ball(agent_index):
-                    return {
-                        'team_name': team_name,
-                        'team_agent_index': team_agent_index,
-                        'agent_index': agent_index,
-                    }
-        return None
+        has_ball_agent_indexes = np.flatnonzero(self.agent_ball)
+        if len(has_ball_agent_indexes) <= 0:
+            return None
+        agent_index = int(has_ball_agent_indexes[0])
+        return {
+            'team_name': Teams(self.agent_team[agent_index]),
+            'team_agent_index': self.env.get_team_agent_index(agent_index),
+            'agent_index': agent_index,
+        }
 
     def switch_ball(self, agent_index, other_agent_index):
         agent_ball = self.get_agent_ball(agent_index)
@@ -251,29 +400,47 @@ class State(object):
         self.set_agent_ball(other_agent_index, agent_ball)
 
     def increase_frame_skip_index(self, agent_index, frame_skip):
-        old_frame_skip_index = self.agent_list[agent_index]['frame_skip_index']
+        old_frame_skip_index = self.agent_frame_skip_index[agent_index]
         new_frame_skip_index = (old_frame_skip_index + 1) % frame_skip
-        self.agent_list[agent_index]['frame_skip_index'] = new_frame_skip_index
+        self.agent_frame_skip_index[agent_index] = new_frame_skip_index
+
+    def increase_frame_skip_indexes(self, frame_skip):
+        """Increase the frame skipping indexes of all the agents.
+
+        Args:
+            frame_skip (int): The frame skip.
+        """
+        self.agent_frame_skip_index += 1
+        self.agent_frame_skip_index %= frame_skip
 
     def increase_time_step(self):
+        keys = self.zobrist_keys.time_key_list
+        time_key_size = self.zobrist_keys.time_key_size
+        self.zobrist_hash ^= keys[self.time_step % time_key_size]
         self.time_step += 1
+        self.zobrist_hash ^= keys[self.time_step % time_key_size]
 
     @staticmethod
     def get_rel_pos(ref, target):
         return [target[0] - ref[0], target[1] - ref[1]]
 
     def _reset_agent_list(self):
-        self.agent_list = [{}
-                           for _ in range(self.env_options.agent_size)]
-        for agent_index in range(self.env_options.agent_size):
-            self.set_agent_pos(agent_index, None)
-            self.set_agent_ball(agent_index, False)
-            self.set_agent_mode(agent_index, None)
-            self.set_agent_action(agent_index, None)
-            self.set_agent_frame_skip_index(agent_index, 0)
+        agent_size = self.env_options.agent_size
+        self.agent_pos = np.full((agent_size, 2), -1, dtype=np.int64)
+        self.agent_ball = np.zeros(agent_size, dtype=np.bool_)
+        self.agent_mode = np.full(agent_size, -1, dtype=np.int64)
+        self.agent_action = np.full(agent_size, -1, dtype=np.int64)
+        self.agent_frame_skip_index = np.zeros(agent_size, dtype=np.int64)
+        self.agent_team = np.arange(agent_size) // self.env_options.team_size
 
     def _reset_pos_map(self):
-        self.pos_map = {}
+        self.pos_grid = np.full(self.map_data.map_size, -1, dtype=np.int64)
+
+    def _rebuild_pos_grid(self):
+        self.pos_grid.fill(-1)
+        placed = np.flatnonzero(self.agent_pos[:, 0] >= 0)
+        self.pos_grid[self.agent_pos[placed, 0],
+                      self.agent_pos[placed, 1]] = placed
 
     def __repr__(self):
         message = ''
@@ -303,6 +470,10 @@ class State(object):
         team_agent_index = ball_possession['team_agent_index']
         message += '\nBall possession: In team {} with agent {}'.format(
             team.name, team_agent_index + 1)
+        # The winning team
+        win_team = self.get_win_team()
+        if win_team >= 0:
+            message += '\nWinning team: {}'.format(Teams(win_team).name)
         # The time step
         message += '\nTime step: {}'.format(self.time_step)
         return message
@@ -310,15 +481,17 @@ class State(object):
     def __eq__(self, other):
         if not isinstance(other, State):
             return False
-        return (self.agent_list == other.agent_list
+        # Compare the hashes first if they're drawn from the same keys
+        if (self.zobrist_keys is other.zobrist_keys
+                and self.zobrist_hash != other.zobrist_hash):
+            return False
+        return (np.array_equal(self.agent_pos, other.agent_pos)
+                and np.array_equal(self.agent_ball, other.agent_ball)
+                and np.array_equal(self.agent_mode, other.agent_mode)
+                and np.array_equal(self.agent_action, other.agent_action)
+                and np.array_equal(self.agent_frame_skip_index,
+                                   other.agent_frame_skip_index)
                 and self.time_step == other.time_step)
 
     def __hash__(self):
-        hash_list = []
-        for agent_index in range(self.env_options.agent_size):
-            hash_list.extend(self.get_agent_pos(agent_index))
-            hash_list.append(self.get_agent_ball(agent_index))
-            hash_list.append(self.get_agent_mode(agent_index))
-            hash_list.append(self.get_agent_action(agent_index))
-        hash_list.append(self.time_step)
-        return hash(tuple(hash_list))
+        return self.zobrist_hash
@@ -0,0 +1,214 @@
+# Third-party modules
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+
+
+class StateEncoder(object):
+    """Bijective mixed-radix integer encoding of the soccer states.
+
+    A state is encoded as the digits below, the most significant first:
+
+    * The time step in [0, max_time_step].
+    * The walkable cell index of each agent.
+    * The agent index having the ball.
+    * The mode of each agent.
+    * The last taken action of each agent, only if the AI frame skip is greater
+      than 1 since the actions don't affect the dynamics otherwise.
+
+    The frame skipping indexes are derived from the time step. Every integer in
+    [0, state_size) decodes to exactly one combination of the digits, including
+    the ones where the agents overlap which never happen in the games, so the
+    codes can index flat arrays such as the Q-tables directly. The codes of the
+    batches are 64-bit integers, which requires state_size to fit in them.
+    """
+    # Largest time step, the episodes end when it's reached
+    max_time_step = 100
+
+    # Map data
+    map_data = None
+
+    # Environment options
+    options = None
+
+    # Cell IDs of the walkable cells
+    walkable_cells = None
+
+    # Walkable cell index of each cell ID, -1 if the cell isn't walkable
+    walkable_index = None
+
+    # Radix of each digit, the most significant first
+    radices = None
+
+    # Number of the states as a Python integer
+    state_size = 0
+
+    def __init__(self, map_data, options):
+        self.map_data = map_data
+        self.options = options
+        self.walkable_cells = np.flatnonzero(map_data.walkable_grid.ravel())
+        self.walkable_index = np.full(map_data.walkable_grid.size, -1,
+                                      dtype=np.int64)
+        self.walkable_index[self.walkable_cells] = np.arange(
+            len(self.walkable_cells))
+        agent_size = options.agent_size
+        radices = [self.max_time_step + 1]
+        radices += [len(self.walkable_cells)] * agent_size
+        radices += [agent_size]
+        radices += [len(AgentModes)] * agent_size
+        if self.track_actions:
+            radices += [len(Actions)] * agent_size
+        self.radices = radices
+        self.state_size = 1
+        for radix in radices:
+            self.state_size *= radix
+
+    @property
+    def track_actions(self):
+        return self.options.ai_frame_skip > 1
+
+    def encode(self, agent_pos, agent_ball, agent_mode, agent_action,
+               time_step):
+        """Encode a state.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (agent_size, 2).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (agent_size,).
+            agent_mode (numpy.ndarray): The agent modes with the shape
+                (agent_size,).
+            agent_action (numpy.ndarray): The last taken actions with the shape
+                (agent_size,).
+            time_step (int): The time step.
+
+        Returns:
+            int: The code in [0, state_size).
+        """
+        digits = self._get_digits(
+            np.asarray(agent_pos)[None], np.asarray(agent_ball)[None],
+            np.asarray(agent_mode)[None], np.asarray(agent_action)[None],
+            np.asarray([time_step]))
+        code = 0
+        for (digit, radix) in zip(digits[0].tolist(), self.radices):
+            code = code * radix + digit
+        return code
+
+    def decode(self, code):
+        """Decode a state.
+
+        Args:
+            code (int): The code from encode().
+
+        Returns:
+            tuple: The agent positions, the ball possessions, the agent modes,
+                the last taken actions, the frame skipping indexes and the time
+                step. The actions are STAND if they aren't encoded.
+        """
+        code = int(code)
+        if not 0 <= code < self.state_size:
+            raise ValueError('The code {} is out of range'.format(code))
+        digits = []
+        for radix in reversed(self.radices):
+            (code, digit) = divmod(code, radix)
+            digits.append(digit)
+        digits = np.array(digits[::-1], dtype=np.int64)[None]
+        (agent_pos, agent_ball, agent_mode, agent_action,
+         agent_frame_skip_index, time_step) = self._split_digits(digits)
+        return (agent_pos[0], agent_ball[0], agent_mode[0], agent_action[0],
+                agent_frame_skip_index[0], int(time_step[0]))
+
+    def encode_batch(self, agent_pos, agent_ball, agent_mode, agent_action,
+                     time_step):
+        """Encode the states of many games.
+
+        Args:
+            agent_pos (numpy.ndarray): The agent positions with the shape
+                (game_size, agent_size, 2).
+            agent_ball (numpy.ndarray): The ball possessions with the shape
+                (game_size, agent_size).
+            agent_mode (numpy.ndarray): The agent modes with the shape
+                (game_size, agent_size).
+            agent_action (numpy.ndarray): The last taken actions with the shape
+                (game_size, agent_size).
+            time_step (numpy.ndarray): The time steps with the shape
+                (game_size,).
+
+        Returns:
+            numpy.ndarray: The codes with the shape (game_size,).
+        """
+        self._check_batch_size()
+        digits = self._get_digits(agent_pos, agent_ball, agent_mode,
+                                  agent_action, time_step)
+        codes = np.zeros(len(digits), dtype=np.int64)
+        for (digit_index, radix) in enumerate(self.radices):
+            codes *= radix
+            codes += digits[:, digit_index]
+        return codes
+
+    def decode_batch(self, codes):
+        """Decode the states of many games.
+
+        Args:
+            codes (numpy.ndarray): The codes with the shape (game_size,).
+
+        Returns:
+            tuple: See decode(), each with the game index as the first axis.
+        """
+        self._check_batch_size()
+        codes = np.array(codes, dtype=np.int64)
+        if np.any((codes < 0) | (codes >= self.state_size)):
+            raise ValueError('The codes are out of range')
+        digits = np.zeros((len(codes), len(self.radices)), dtype=np.int64)
+        for digit_index in reversed(range(len(self.radices))):
+            radix = self.radices[digit_index]
+            digits[:, digit_index] = codes % radix
+            codes //= radix
+        return self._split_digits(digits)
+
+    def _get_digits(self, agent_pos, agent_ball, agent_mode, agent_action,
+                    time_step):
+        agent_pos = np.asarray(agent_pos)
+        in_map = np.all((agent_pos >= 0) & (agent_pos < self.map_data.map_size),
+                        axis=-1)
+        cells = self.map_data.get_cell_ids(np.where(in_map[..., None],
+                                                    agent_pos, 0))
+        cell_digits = np.where(in_map, self.walkable_index[cells], -1)
+        ball_digits = np.argmax(agent_ball, axis=-1)
+        columns = [np.asarray(time_step)[:, None], cell_digits,
+                   ball_digits[:, None], agent_mode]
+        if self.track_actions:
+            columns.append(agent_action)
+        digits = np.concatenate(columns, axis=1).astype(np.int64)
+        if (np.any(digits < 0) or np.any(digits >= self.radices)
+                or not np.all(np.count_nonzero(agent_ball, axis=-1) == 1)):
+            raise ValueError('The states are out of the encoded range')
+        return digits
+
+    def _split_digits(self, digits):
+        agent_size = self.options.agent_size
+        game_size = len(digits)
+        time_step = digits[:, 0]
+        cell_digits = digits[:, 1:agent_size + 1]
+        ball_digits = digits[:, agent_size + 1]
+        agent_mode = digits[:, agent_size + 2:2 * agent_size + 2]
+        agent_pos = self.map_data.cell_pos[self.walkable_cells[cell_digits]]
+        agent_ball = np.zeros((game_size, agent_size), dtype=np.bool_)
+        agent_ball[np.arange(game_size), ball_digits] = True
+        if self.track_actions:
+            agent_action = digits[:, 2 * agent_size + 2:]
+        else:
+            agent_action = np.full((game_size, agent_size), Actions.STAND,
+                                   dtype=np.int64)
+        agent_frame_skip_index = np.repeat(
+            (time_step % self.options.ai_frame_skip)[:, None], agent_size,
+            axis=1)
+        return (agent_pos, agent_ball, agent_mode, agent_action,
+                agent_frame_skip_index, time_step)
+
+    def _check_batch_size(self):
+        if self.state_size > np.iinfo(np.int64).max:
+            raise OverflowError('The {} states don\'t fit in 64-bit '
+                                'codes'.format(self.state_size))
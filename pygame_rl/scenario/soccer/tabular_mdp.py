@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""Exact tabular MDP of soccer-v0 for small maps.
+
+Enumerate every state reachable from the reset distribution and compute the
+exact transition probabilities and rewards of the first player agent against
+the rule-based AI. Run this module to export the MDP as a compressed NPZ file.
+"""
+
+# Native modules
+import argparse
+import functools
+import itertools
+import math
+
+# Third-party modules
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.ai_evaluator import AiEvaluator
+from pygame_rl.scenario.soccer.collision import resolve_collisions
+from pygame_rl.scenario.soccer.map_data import MapData
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.teams import Teams
+
+
+class TabularMdp(object):
+    """Exact tabular MDP of soccer-v0.
+
+    The first player agent takes the actions of the MDP, which are all the
+    actions of soccer-v0 including NOOP (letting the rule-based AI control the
+    agent). The other agents are controlled by the rule-based AI.
+
+    A state holds the cell IDs of the agents, the agent having the ball, the
+    agent modes, and, if the AI frame skip is greater than 1, the last taken
+    actions and the frame skipping index. The time step isn't part of the
+    states since the dynamics don't depend on it: soccer-v0 ends after
+    "max_time_step" steps, which is a finite horizon for the dynamic
+    programming, see backward_induction().
+
+    The transition probabilities are stored as a CSR matrix with the rows
+    indexed by "state index * action size + action" and the columns indexed by
+    the next state index. The rows of the terminal states are empty.
+    """
+    # Environment options
+    options = None
+
+    # Map data
+    map_data = None
+
+    # Number of the actions
+    action_size = len(Actions)
+
+    # Number of the time steps before soccer-v0 ends
+    max_time_step = 100
+
+    # State arrays indexed by the state index
+    # * agent_cell: Cell IDs with the shape (state_size, agent_size)
+    # * ball_agent_index: Agent index having the ball
+    # * agent_mode: Agent modes with the shape (state_size, agent_size)
+    # * agent_action: Last taken actions with the shape (state_size,
+    #   agent_size), -1 if the AI frame skip is 1
+    # * frame_skip_index: Frame skipping index of all the agents
+    # * terminal: Whether the state ends the episode
+    # * state_reward: Reward of entering the state
+    # * initial_prob: Probability of the state after a reset
+    agent_cell = None
+    ball_agent_index = None
+    agent_mode = None
+    agent_action = None
+    frame_skip_index = None
+    terminal = None
+    state_reward = None
+    initial_prob = None
+
+    # Transition probabilities as a CSR matrix with the shape (state_size *
+    # action_size, state_size)
+    transition_indptr = None
+    transition_indices = None
+    transition_data = None
+
+    # Expected rewards with the shape (state_size, action_size)
+    reward = None
+
+    # Map of the state keys to the state indexes, built on demand
+    state_index_map = None
+
+    def __init__(self, options, map_data=None):
+        self.options = options
+        self.map_data = map_data or MapData(options.map_path)
+
+    @property
+    def state_size(self):
+        return len(self.ball_agent_index)
+
+    def get_state_index(self, state):
+        """Get the index of a soccer-v0 state.
+
+        Args:
+            state (State): The state of soccer-v0 with the same options.
+
+        Returns:
+            int: The state index.
+        """
+        if self.state_index_map is None:
+            keys = _get_state_keys(self.agent_cell, self.ball_agent_index,
+                                   self.agent_mode, self.agent_action,
+                                   self.frame_skip_index)
+            self.state_index_map = {tuple(key): state_index
+                                    for (state_index, key)
+                                    in enumerate(keys.tolist())}
+        agent_action = state.agent_action
+        if self.options.ai_frame_skip <= 1:
+            agent_action = np.full_like(agent_action, -1)
+        key = _get_state_keys(
+            self.map_data.get_cell_ids(state.agent_pos)[None],
+            np.argmax(state.agent_ball)[None], state.agent_mode[None],
+            agent_action[None], state.agent_frame_skip_index[:1])
+        return self.state_index_map[tuple(key[0].tolist())]
+
+    def get_transition_probs(self, state_index, action):
+        """Get the next states of a state and an action.
+
+        Args:
+            state_index (int): The state index.
+            action (int): The action.
+
+        Returns:
+            tuple: The next state indexes and their probabilities.
+        """
+        row = state_index * self.action_size + action
+        (start, end) = self.transition_indptr[row:row + 2]
+        return (self.transition_indices[start:end],
+                self.transition_data[start:end])
+
+    def backward_induction(self, horizon=None):
+        """Compute the optimal values by the finite-horizon dynamic programming.
+
+        Args:
+            horizon (int): The number of the remaining steps, "max_time_step"
+                if it's not given.
+
+        Returns:
+            numpy.ndarray: The optimal expected returns with the shape (horizon
+                + 1, state_size), indexed by the number of the remaining steps.
+        """
+        if horizon is None:
+            horizon = self.max_time_step
+        values = np.zeros((horizon + 1, self.state_size))
+        for step in range(1, horizon + 1):
+            next_values = _csr_dot(self.transition_indptr,
+                                   self.transition_indices,
+                                   self.transition_data, values[step - 1])
+            q_values = self.reward + next_values.reshape(self.reward.shape)
+            values[step] = np.max(q_values, axis=1)
+        return values
+
+    def save(self, path):
+        """Save the MDP as a compressed NPZ file.
+
+        Args:
+            path (str): The file path.
+        """
+        np.savez_compressed(
+            path,
+            map_size=np.asarray(self.map_data.map_size),
+            team_size=self.options.team_size,
+            ai_frame_skip=self.options.ai_frame_skip,
+            max_time_step=self.max_time_step,
+            agent_cell=self.agent_cell,
+            ball_agent_index=self.ball_agent_index,
+            agent_mode=self.agent_mode,
+            agent_action=self.agent_action,
+            frame_skip_index=self.frame_skip_index,
+            terminal=self.terminal,
+            state_reward=self.state_reward,
+            initial_prob=self.initial_prob,
+            transition_indptr=self.transition_indptr,
+            transition_indices=self.transition_indices,
+            transition_data=self.transition_data,
+            reward=self.reward)
+
+    @classmethod
+    def load(cls, path, options):
+        """Load the MDP saved by save().
+
+        Args:
+            path (str): The file path.
+            options (Options): The environment options the MDP was built
+                with.
+
+        Returns:
+            TabularMdp: The MDP.
+        """
+        mdp = cls(options)
+        with np.load(path) as data:
+            if (tuple(data['map_size']) != tuple(mdp.map_data.map_size)
+                    or data['team_size'] != options.team_size
+                    or data['ai_frame_skip'] != options.ai_frame_skip):
+                raise ValueError('The MDP was built with different options')
+            mdp.max_time_step = int(data['max_time_step'])
+            for name in ['agent_cell', 'ball_agent_index', 'agent_mode',
+                         'agent_action', 'frame_skip_index', 'terminal',
+                         'state_reward', 'initial_prob', 'transition_indptr',
+                         'transition_indices', 'transition_data', 'reward']:
+                setattr(mdp, name, data[name])
+        return mdp
+
+
+def build_tabular_mdp(options=None):
+    """Build the exact tabular MDP by enumerating the reachable states.
+
+    The states are expanded breadth-first from the reset distribution. The
+    random choices of soccer-v0 are enumerated exactly: the AI chooses one of
+    the best candidate moves uniformly at random, or one of all the moves if
+    no candidates are found, and the ball goes to one of the agents colliding
+    with the agent having the ball uniformly at random.
+
+    The state space grows exponentially with the agent size, the map size and
+    the AI frame skip, so it's only practical for small maps and teams.
+
+    Args:
+        options (Options): The environment options, the default options if it's
+            not given.
+
+    Returns:
+        TabularMdp: The MDP.
+    """
+    mdp = TabularMdp(options or Options())
+    builder = _MdpBuilder(mdp)
+    builder.build()
+    return mdp
+
+
+class _MdpBuilder(object):
+    """Breadth-first expansion of the reachable states."""
+
+    def __init__(self, mdp):
+        self.mdp = mdp
+        self.options = mdp.options
+        self.map_data = mdp.map_data
+        self.ai_evaluator = AiEvaluator(mdp.map_data, mdp.options)
+        self.agent_size = self.options.agent_size
+        self.cell_size = self.map_data.cell_pos.shape[0]
+        # Goal team of each cell
+        self.cell_goal_team = self.map_data.goal_grid.ravel()
+        # Number of the equally spaced draws enumerating the ball receivers,
+        # each number of the receivers divides it
+        self.receiver_draw_size = functools.reduce(
+            lambda a, b: a * b // math.gcd(a, b),
+            range(1, self.agent_size), 1)
+        # Discovered states
+        self.state_keys = []
+        self.state_index_map = {}
+        # Transition triplets
+        self.rows = []
+        self.cols = []
+        self.probs = []
+
+    def build(self):
+        (keys, initial_prob) = self._get_initial_states()
+        frontier = self._add_states(keys)
+        initial_index = frontier
+        while len(frontier) > 0:
+            keys = np.array([self.state_keys[state_index]
+                             for state_index in frontier], dtype=np.int64)
+            terminal = self._is_terminal(keys)
+            frontier = frontier[~terminal]
+            if len(frontier) > 0:
+                frontier = self._expand(frontier, keys[~terminal])
+        self._finish(initial_index, initial_prob)
+
+    def _get_initial_states(self):
+        # Enumerate the spawn positions drawn by InitialStateSampler, each
+        # agent gets one of the spawn positions left by the previous agents
+        team_size = self.options.team_size
+        placements = [((), 1.0)]
+        for agent_index in range(self.agent_size):
+            team_name = Teams(agent_index // team_size)
+            spawn_cells = self.map_data.get_cell_ids(
+                self.map_data.spawn[team_name.name]).tolist()
+            next_placements = []
+            for (cells, prob) in placements:
+                free_cells = [cell for cell in spawn_cells
+                              if cell not in cells]
+                if not free_cells:
+                    raise ValueError('Not enough spawn positions for team '
+                                     '{}'.format(team_name.name))
+                for cell in sorted(set(free_cells)):
+                    next_placements.append((
+                        cells + (cell,),
+                        prob * free_cells.count(cell) / len(free_cells)))
+            placements = next_placements
+        # The ball and the modes are uniformly random, the actions are STAND
+        mode_size = len(AgentModes)
+        track_actions = self.options.ai_frame_skip > 1
+        actions = ((Actions.STAND if track_actions else -1),) * self.agent_size
+        keys = []
+        probs = []
+        for (cells, cell_prob) in placements:
+            for ball_agent_index in range(self.agent_size):
+                for modes in itertools.product(range(mode_size),
+                                               repeat=self.agent_size):
+                    keys.append(cells + (ball_agent_index,) + modes + actions
+                                + (0,))
+                    probs.append(cell_prob / self.agent_size
+                                 / mode_size ** self.agent_size)
+        return (np.array(keys, dtype=np.int64), np.array(probs))
+
+    def _add_states(self, keys):
+        """Get the indexes of the states, adding the new ones."""
+        (unique_keys, inverse) = np.unique(keys, axis=0, return_inverse=True)
+        unique_index = np.empty(len(unique_keys), dtype=np.int64)
+        for (key_index, key) in enumerate(map(tuple, unique_keys.tolist())):
+            state_index = self.state_index_map.get(key)
+            if state_index is None:
+                state_index = len(self.state_keys)
+                self.state_index_map[key] = state_index
+                self.state_keys.append(key)
+            unique_index[key_index] = state_index
+        return unique_index[inverse.ravel()]
+
+    def _expand(self, state_index, keys):
+        """Add the transitions of the states and return the new states."""
+        first_new_index = len(self.state_keys)
+        (cells, ball_agent_index, modes, actions, frame_skip_index) = \
+            _split_state_keys(keys, self.agent_size)
+        state_size = len(keys)
+        agent_ball = (np.arange(self.agent_size)[None]
+                      == ball_agent_index[:, None])
+        # Get the action probabilities of the AI
+        ai_prob = self._get_ai_probs(cells, agent_ball, modes)
+        # Repeat the last actions while frame skipping
+        skipping = frame_skip_index > 0
+        repeat_prob = np.zeros_like(ai_prob)
+        if np.any(skipping):
+            (skip_index, skip_agent) = np.nonzero(
+                np.broadcast_to(skipping[:, None], actions.shape))
+            repeat_prob[skip_index, skip_agent,
+                        actions[skip_index, skip_agent]] = 1.0
+        agent_prob = np.where(skipping[:, None, None], repeat_prob, ai_prob)
+        for action in Actions:
+            action_prob = agent_prob.copy()
+            if action != Actions.NOOP:
+                # The first player agent takes the action
+                action_prob[:, 0] = 0.0
+                action_prob[:, 0, action] = 1.0
+            self._add_transitions(state_index, action, cells, agent_ball,
+                                  modes, frame_skip_index, action_prob,
+                                  state_size)
+        return np.arange(first_new_index, len(self.state_keys))
+
+    def _get_ai_probs(self, cells, agent_ball, modes):
+        """Get the action probabilities of the AI for all the agents."""
+        (state_size, agent_size) = cells.shape
+        (game_index, agent_index) = np.nonzero(
+            np.ones((state_size, agent_size), dtype=np.bool_))
+        (target_cell, strategic_mode) = self.ai_evaluator.get_targets(
+            cells, agent_ball, modes, game_index, agent_index)
+        best = self.ai_evaluator.get_best_candidates(
+            cells[game_index, agent_index], target_cell, strategic_mode)
+        best_size = np.count_nonzero(best, axis=1)
+        # Choose one of the best candidates or the fallback action uniformly
+        candidate_prob = np.where(
+            (best_size > 0)[:, None],
+            best / np.maximum(best_size, 1)[:, None],
+            1.0 / best.shape[1])
+        prob = np.zeros((state_size, agent_size, len(Actions)))
+        prob[game_index[:, None], agent_index[:, None],
+             self.ai_evaluator.candidate_actions[None, :]] = candidate_prob
+        return prob
+
+    def _add_transitions(self, state_index, action, cells, agent_ball, modes,
+                         frame_skip_index, agent_prob, state_size):
+        # Expand the joint actions with nonzero probabilities agent by agent
+        row_state = np.arange(state_size)
+        row_prob = np.ones(state_size)
+        row_actions = np.zeros((state_size, 0), dtype=np.int64)
+        for agent_index in range(self.agent_size):
+            (row, taken) = np.nonzero(agent_prob[row_state, agent_index])
+            row_prob = row_prob[row] * agent_prob[row_state[row], agent_index,
+                                                  taken]
+            row_actions = np.concatenate([row_actions[row], taken[:, None]],
+                                         axis=1)
+            row_state = row_state[row]
+        # Move the agents
+        old_cells = cells[row_state]
+        moved_cells = self.map_data.moved_cell[old_cells, row_actions]
+        intended_cells = np.where(moved_cells >= 0, moved_cells, old_cells)
+        row_ball = agent_ball[row_state]
+        ball_agent_index = np.argmax(row_ball, axis=1)
+        next_actions = (row_actions if self.options.ai_frame_skip > 1
+                        else np.full_like(row_actions, -1))
+        next_frame_skip_index = ((frame_skip_index[row_state] + 1)
+                                 % self.options.ai_frame_skip)
+        for draw_index in range(self.receiver_draw_size):
+            # Enumerate the ball receivers by the equally spaced draws
+            random_state = _FixedDraw(
+                (draw_index + 0.5) / self.receiver_draw_size)
+            (next_cells, switch_agent_index) = resolve_collisions(
+                old_cells, intended_cells, row_ball, self.cell_size,
+                random_state)
+            next_ball_agent_index = np.where(switch_agent_index >= 0,
+                                             switch_agent_index,
+                                             ball_agent_index)
+            next_keys = _get_state_keys(
+                next_cells, next_ball_agent_index, modes[row_state],
+                next_actions, next_frame_skip_index)
+            self.rows.append(state_index[row_state] * len(Actions) + action)
+            self.cols.append(self._add_states(next_keys))
+            self.probs.append(row_prob / self.receiver_draw_size)
+
+    def _get_win_team(self, keys):
+        (cells, ball_agent_index, _, _, _) = _split_state_keys(
+            keys, self.agent_size)
+        ball_cell = cells[np.arange(len(keys)), ball_agent_index]
+        goal_team = self.cell_goal_team[ball_cell]
+        ball_team = ball_agent_index // self.options.team_size
+        return np.where(goal_team == ball_team, ball_team, -1)
+
+    def _is_terminal(self, keys):
+        return self._get_win_team(keys) >= 0
+
+    def _finish(self, initial_index, initial_prob):
+        mdp = self.mdp
+        keys = np.array(self.state_keys, dtype=np.int64)
+        (mdp.agent_cell, mdp.ball_agent_index, mdp.agent_mode,
+         mdp.agent_action, mdp.frame_skip_index) = _split_state_keys(
+             keys, self.agent_size)
+        win_team = self._get_win_team(keys)
+        mdp.terminal = win_team >= 0
+        mdp.state_reward = np.select(
+            [win_team == Teams.PLAYER, win_team == Teams.COMPUTER],
+            [1.0, -1.0], 0.0)
+        mdp.initial_prob = np.zeros(len(keys))
+        np.add.at(mdp.initial_prob, initial_index, initial_prob)
+        # Sum the duplicate transitions into a CSR matrix
+        state_size = len(keys)
+        row_size = state_size * len(Actions)
+        if self.rows:
+            rows = np.concatenate(self.rows)
+            cols = np.concatenate(self.cols)
+            probs = np.concatenate(self.probs)
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+            probs = np.zeros(0)
+        (flat_index, inverse) = np.unique(rows * state_size + cols,
+                                          return_inverse=True)
+        data = np.zeros(len(flat_index))
+        np.add.at(data, inverse.ravel(), probs)
+        mdp.transition_indices = flat_index % state_size
+        mdp.transition_data = data
+        mdp.transition_indptr = np.searchsorted(
+            flat_index // state_size, np.arange(row_size + 1))
+        next_rewards = _csr_dot(mdp.transition_indptr,
+                                mdp.transition_indices, mdp.transition_data,
+                                mdp.state_reward)
+        mdp.reward = next_rewards.reshape(state_size, len(Actions))
+
+
+class _FixedDraw(object):
+    """Random state returning the integers mapped from a fixed uniform number
+    in the same way as BlockRandom.randint().
+    """
+
+    def __init__(self, uniform):
+        self.uniform = uniform
+
+    def randint(self, high):
+        return (self.uniform * np.asarray(high)).astype(np.int64)
+
+
+def _get_state_keys(cells, ball_agent_index, modes, actions, frame_skip_index):
+    return np.concatenate([
+        cells, ball_agent_index[:, None], modes, actions,
+        frame_skip_index[:, None]], axis=1).astype(np.int64)
+
+
+def _split_state_keys(keys, agent_size):
+    cells = keys[:, :agent_size]
+    ball_agent_index = keys[:, agent_size]
+    modes = keys[:, agent_size + 1:2 * agent_size + 1]
+    actions = keys[:, 2 * agent_size + 1:3 * agent_size + 1]
+    frame_skip_index = keys[:, 3 * agent_size + 1]
+    return (cells, ball_agent_index, modes, actions, frame_skip_index)
+
+
+def _csr_dot(indptr, indices, data, vector):
+    """Multiply a CSR matrix by a vector."""
+    result = np.zeros(len(indptr) - 1)
+    nonempty = indptr[:-1] < indptr[1:]
+    if np.any(nonempty):
+        products = data * vector[indices]
+        result[nonempty] = np.add.reduceat(products, indptr[:-1][nonempty])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='soccer_mdp.npz',
+                        help='the NPZ file to write')
+    parser.add_argument('--map-path', default=None,
+                        help='the map file, the bundled map if omitted')
+    parser.add_argument('--team-size', type=int, default=1,
+                        help='the team size')
+    parser.add_argument('--ai-frame-skip', type=int, default=1,
+                        help='the AI frame skip')
+    args = parser.parse_args()
+    mdp = build_tabular_mdp(Options(args.map_path, args.team_size,
+                                    args.ai_frame_skip))
+    mdp.save(args.output)
+    print('{} states, {} transitions written to {}'.format(
+        mdp.state_size, len(mdp.transition_data), args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Native modules
+from functools import lru_cache
+
+# Third-party modules
+import numpy as np
+
+# Project modules
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+
+
+class ZobristKeys(object):
+    """Random 64-bit keys for the Zobrist hash of the soccer states.
+
+    The hash is the XOR of one key for each agent status and one key for the
+    time step, so changing a status only XORs out the old key and XORs in the
+    new key. The positions use one key for each coordinate of each agent, so
+    the tables grow with the map width and height instead of the map area.
+    The unset values (-1) have their own keys at index 0 of the tables, the
+    other values are offset by 1.
+
+    The keys are drawn from a fixed seed, so the same agent size and map size
+    always give the same hashes, also across processes.
+    """
+    # Seed for drawing the keys
+    seed = 0x5eed
+
+    # Number of the time step keys, the time steps are wrapped around
+    time_key_size = 256
+
+    # Key tables as numpy arrays indexed by the agent index and the value + 1
+    pos_x_keys = None
+    pos_y_keys = None
+    ball_keys = None
+    mode_keys = None
+    action_keys = None
+
+    # Time step keys indexed by the time step modulo time_key_size
+    time_keys = None
+
+    # Key tables as lists of Python integers for the incremental updates
+    pos_x_key_list = None
+    pos_y_key_list = None
+    ball_key_list = None
+    mode_key_list = None
+    action_key_list = None
+    time_key_list = None
+
+    def __init__(self, agent_size, map_size):
+        random_state = np.random.RandomState(self.seed)
+        max_key = np.iinfo(np.uint64).max
+
+        def draw_keys(*shape):
+            return random_state.randint(max_key, size=shape, dtype=np.uint64)
+
+        self.pos_x_keys = draw_keys(agent_size, map_size[0] + 1)
+        self.pos_y_keys = draw_keys(agent_size, map_size[1] + 1)
+        self.ball_keys = draw_keys(agent_size, 2)
+        self.mode_keys = draw_keys(agent_size, len(AgentModes) + 1)
+        self.action_keys = draw_keys(agent_size, len(Actions) + 1)
+        self.time_keys = draw_keys(self.time_key_size)
+        self.pos_x_key_list = self.pos_x_keys.tolist()
+        self.pos_y_key_list = self.pos_y_keys.tolist()
+        self.ball_key_list = self.ball_keys.tolist()
+        self.mode_key_list = self.mode_keys.tolist()
+        self.action_key_list = self.action_keys.tolist()
+        self.time_key_list = self.time_keys.tolist()
+
+    def get_hash(self, agent_pos, agent_ball, agent_mode, agent_action,
+                 time_step):
+        """Compute the hash from scratch.
+
+        Args:
+            agent_pos (numpy.ndarray): The positions with the shape
+                (agent_size, 2), -1 if unset.
+            agent_ball (numpy.ndarray): The possessions of the ball.
+            agent_mode (numpy.ndarray): The modes, -1 if unset.
+            agent_action (numpy.ndarray): The last taken actions, -1 if unset.
+            time_step (int): The time step.
+
+        Returns:
+            int: The 64-bit hash.
+        """
+        agent_indexes = np.arange(len(agent_pos))
+        keys = np.concatenate([
+            self.pos_x_keys[agent_indexes, agent_pos[:, 0] + 1],
+            self.pos_y_keys[agent_indexes, agent_pos[:, 1] + 1],
+            self.ball_keys[agent_indexes, agent_ball.astype(np.int64)],
+            self.mode_keys[agent_indexes, agent_mode + 1],
+            self.action_keys[agent_indexes, agent_action + 1],
+            self.time_keys[[time_step % self.time_key_size]],
+        ])
+        return int(np.bitwise_xor.reduce(keys))
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_keys(agent_size, map_size):
+    """Get the shared keys of the agent size and the map size.
+
+    Args:
+        agent_size (int): The number of the agents.
+        map_size (tuple): The map width and height.
+
+    Returns:
+        ZobristKeys: The keys.
+    """
+    return ZobristKeys(agent_size, map_size)
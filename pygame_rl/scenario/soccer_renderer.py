@@ -79,8 +79,9 @@ class SoccerRenderer(pygame_renderer.TiledRenderer):
         # Close the display if the renderer options is set to disable the
         # display
         if not self.display_quitted and not self.renderer_options.show_display:
-            # Replace the screen surface with in-memory surface
-            self.screen = self.screen.copy()
+            # Replace the screen surface with in-memory surface backed by the
+            # frame array
+            self.screen = self.create_frame_surface(self.screen)
             # Close the display
             pygame.display.quit()
             # Prevent from further closing
@@ -95,6 +96,7 @@ class SoccerRenderer(pygame_renderer.TiledRenderer):
 
         # Draw the overlays
         dirty = self.dirty_groups.draw(self.screen)
+        self.add_dirty_rects(dirty)
 
         # Update only the dirty surface
         if self.renderer_options.show_display:
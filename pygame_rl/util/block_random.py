@@ -0,0 +1,134 @@
+# Third-party modules
+import numpy as np
+
+
+class BlockRandom(object):
+    """Random number source drawing uniform numbers in large blocks.
+
+    A block of uniform floats in [0, 1) is drawn from a numpy.random.Generator
+    at once and consumed by a cursor, so that the small draws on the hot path
+    don't pay the fixed overhead of a generator call each. The integers are
+    mapped from the same floats. The sequence only depends on the seed and the
+    sizes of the draws, so seeding gives bit-reproducible episodes.
+
+    The methods follow the subset of numpy.random.RandomState used by the
+    environments. The blocks are read-only and shared by the states from
+    get_state(), so the returned float arrays are read-only views as well, and
+    saving or restoring a state within a block costs almost nothing.
+    """
+    # Number of the uniform floats drawn in a block
+    block_size = 4096
+
+    # Generator drawing the blocks
+    generator = None
+
+    # Current block and the cursor in it
+    block = None
+    cursor = 0
+
+    # Generator state right after drawing the current block
+    block_generator_state = None
+
+    def __init__(self, seed=None, block_size=4096):
+        self.block_size = block_size
+        self.generator = np.random.default_rng(seed)
+        self.block = np.empty(0)
+        self.block.flags.writeable = False
+        self.cursor = 0
+        self.block_generator_state = self.generator.bit_generator.state
+
+    def random_sample(self, size=None):
+        """Return the uniform floats in [0, 1).
+
+        Args:
+            size (int or tuple): The output shape, a scalar is returned if it's
+                not given.
+
+        Returns:
+            float or numpy.ndarray: The uniform floats.
+        """
+        if size is None:
+            return float(self._take(1)[0])
+        if isinstance(size, (int, np.integer)):
+            return self._take(size)
+        count = 1
+        for dim in size:
+            count *= dim
+        return self._take(count).reshape(size)
+
+    def randint(self, low, high=None, size=None):
+        """Return the uniform integers in [low, high).
+
+        Args:
+            low (int or numpy.ndarray): The lowest integers, or the upper bounds
+                if "high" isn't given.
+            high (int or numpy.ndarray): The upper bounds, exclusive. Each of
+                them must be greater than the lowest integer.
+            size (int or tuple): The output shape. The broadcast shape of the
+                bounds is used if it's not given.
+
+        Returns:
+            int or numpy.ndarray: The uniform integers.
+        """
+        if high is None:
+            (low, high) = (0, low)
+        span = high - low
+        if size is None:
+            if not isinstance(span, np.ndarray):
+                if span <= 0:
+                    raise ValueError('low >= high')
+                return int(low + int(self._take(1)[0] * span))
+            size = span.shape
+        # The product of a float in [0, 1) and an integer below 2 ** 53 is
+        # always rounded below the integer
+        values = (self.random_sample(size) * span).astype(np.int64)
+        if not isinstance(low, int) or low != 0:
+            values += low
+        return values
+
+    def permutation(self, n):
+        """Return a random permutation of range(n).
+
+        Args:
+            n (int): The number of the elements.
+
+        Returns:
+            numpy.ndarray: The permutation.
+        """
+        return np.argsort(self.random_sample(n), kind='stable')
+
+    def get_state(self):
+        """Get the state to restore the sequence later.
+
+        Returns:
+            tuple: The generator state after drawing the current block, the
+                current block and the cursor.
+        """
+        return (self.block_generator_state, self.block, self.cursor)
+
+    def set_state(self, state):
+        """Restore the state from get_state().
+
+        Args:
+            state (tuple): The state.
+        """
+        (block_generator_state, block, self.cursor) = state
+        if block is not self.block:
+            self.generator.bit_generator.state = block_generator_state
+            self.block = block
+            self.block_generator_state = block_generator_state
+
+    def _take(self, count):
+        end = self.cursor + count
+        if end <= len(self.block):
+            values = self.block[self.cursor:end]
+            self.cursor = end
+            return values
+        # Use up the current block and continue with the new blocks
+        rest = self.block[self.cursor:]
+        block_count = -(-(count - len(rest)) // self.block_size)
+        self.block = self.generator.random(block_count * self.block_size)
+        self.block.flags.writeable = False
+        self.block_generator_state = self.generator.bit_generator.state
+        self.cursor = count - len(rest)
+        return np.concatenate([rest, self.block[:self.cursor]])
@@ -0,0 +1,55 @@
+# Third-party modules
+import numpy as np
+
+
+def get_scale_factors(tile_size, target_tile_size):
+    """Get the downscaling factors of the tiles.
+
+    Args:
+        tile_size (numpy.ndarray): The tile size [width, height] in pixels.
+        target_tile_size (int): The target tile width and height in pixels.
+
+    Returns:
+        numpy.ndarray: The integer factors [x, y] dividing the tile size.
+    """
+    tile_size = np.asarray(tile_size)
+    if (target_tile_size <= 0
+            or np.any(tile_size % target_tile_size != 0)):
+        raise ValueError('The tile size {} isn\'t divisible by the target '
+                         'tile size {}'.format(tile_size.tolist(),
+                                               target_tile_size))
+    return tile_size // target_tile_size
+
+
+def downscale_image(image, factors):
+    """Downscale an RGB or RGBA image by averaging the pixel blocks.
+
+    The colors of the RGBA images are averaged weighted by the alpha, so the
+    colors of the transparent pixels don't bleed into the edges. The results
+    are rounded to the nearest integers.
+
+    Args:
+        image (numpy.ndarray): The uint8 image with the shape (height, width,
+            channels).
+        factors (numpy.ndarray): The integer factors [x, y] dividing the image
+            size.
+
+    Returns:
+        numpy.ndarray: The downscaled uint8 image.
+    """
+    (factor_x, factor_y) = [int(factor) for factor in factors]
+    (height, width, channels) = image.shape
+    blocks = image.reshape(height // factor_y, factor_y, width // factor_x,
+                           factor_x, channels).astype(np.int64)
+    block_size = factor_x * factor_y
+    if channels < 4:
+        color_sum = blocks.sum(axis=(1, 3))
+        return ((2 * color_sum + block_size) // (2 * block_size)).astype(
+            np.uint8)
+    alpha = blocks[..., 3:]
+    alpha_sum = alpha.sum(axis=(1, 3))
+    color_sum = (blocks[..., :3] * alpha).sum(axis=(1, 3))
+    # Round the weighted means, the colors are black if all are transparent
+    color = (2 * color_sum + alpha_sum) // np.maximum(2 * alpha_sum, 1)
+    alpha = (2 * alpha_sum + block_size) // (2 * block_size)
+    return np.concatenate([color, alpha], axis=2).astype(np.uint8)
@@ -0,0 +1,78 @@
+# Native modules
+from functools import wraps
+from time import perf_counter_ns
+
+
+class StepProfiler(object):
+    """Accumulate the wall-clock time and the call count of each phase.
+
+    The phases are the functions wrapped by wrap(). Each call costs two
+    perf_counter_ns() calls, and nothing is paid by the functions which aren't
+    wrapped, so the environments only wrap their phases while profiling is
+    enabled.
+    """
+    # Accumulated nanoseconds indexed by the phase name
+    total_ns = None
+
+    # Call counts indexed by the phase name
+    count = None
+
+    # Nanoseconds of the last call indexed by the phase name
+    last_ns = None
+
+    def __init__(self):
+        self.total_ns = {}
+        self.count = {}
+        self.last_ns = {}
+
+    def wrap(self, phase, func):
+        """Wrap a function to record its calls as a phase.
+
+        Args:
+            phase (str): The phase name.
+            func (callable): The function.
+
+        Returns:
+            callable: The wrapped function.
+        """
+        self.total_ns.setdefault(phase, 0)
+        self.count.setdefault(phase, 0)
+
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            start = perf_counter_ns()
+            result = func(*args, **kwargs)
+            self.record(phase, perf_counter_ns() - start)
+            return result
+        return profiled
+
+    def record(self, phase, elapsed_ns):
+        """Record a call of a phase.
+
+        Args:
+            phase (str): The phase name.
+            elapsed_ns (int): The elapsed nanoseconds.
+        """
+        self.total_ns[phase] += elapsed_ns
+        self.count[phase] += 1
+        self.last_ns[phase] = elapsed_ns
+
+    def get_timings(self):
+        """Get the accumulated timings.
+
+        Returns:
+            dict: The dicts with the keys "total_ns", "count" and "mean_ns"
+                indexed by the phase name.
+        """
+        return {phase: {
+            'total_ns': total_ns,
+            'count': self.count[phase],
+            'mean_ns': total_ns / max(self.count[phase], 1),
+        } for (phase, total_ns) in self.total_ns.items()}
+
+    def reset(self):
+        """Clear the accumulated timings."""
+        for phase in self.total_ns:
+            self.total_ns[phase] = 0
+            self.count[phase] = 0
+        self.last_ns.clear()
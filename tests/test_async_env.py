@@ -0,0 +1,107 @@
+# Native modules
+import asyncio
+import functools
+
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+from pygame_rl.rl.async_env import AsyncEnv
+from pygame_rl.rl.async_env import gather_resets
+from pygame_rl.rl.async_env import gather_steps
+from pygame_rl.rl.subproc_vec_env import SubprocEnv
+from pygame_rl.scenario.gridworld.envs.gridworld_v1 import GridworldV1
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.options import Options
+
+
+def make_soccer_env(seed):
+    env = SoccerV0()
+    env.options = Options()
+    env.load()
+    env.seed(seed)
+    return env
+
+
+class AsyncEnvTest(object):
+    def test_same_steps_as_local_envs(self):
+        seeds = [1, 2, 3]
+        local_envs = [make_soccer_env(seed) for seed in seeds]
+        async_envs = [AsyncEnv(make_soccer_env(seed)) for seed in seeds]
+        action_rand = np.random.RandomState(0)
+
+        async def run():
+            obs_list = await gather_resets(async_envs)
+            for (obs, env) in zip(obs_list, local_envs):
+                assert np.array_equal(obs['agent_pos'],
+                                      env.reset()['agent_pos'])
+            for _ in range(100):
+                actions = [action_rand.randint(env.action_space.nvec)
+                           for env in local_envs]
+                results = await gather_steps(async_envs, actions)
+                for (env, async_env, action, result) in zip(
+                        local_envs, async_envs, actions, results):
+                    (obs, reward, done, _) = result
+                    (local_obs, local_reward, local_done, _) = env.step(action)
+                    assert np.array_equal(obs['agent_pos'],
+                                          local_obs['agent_pos'])
+                    assert reward == local_reward
+                    assert done == local_done
+                    if done:
+                        await async_env.reset()
+                        env.reset()
+
+        asyncio.run(run())
+
+    def test_step_async_and_render(self):
+        env = GridworldV1()
+        env.load()
+        env.seed(0)
+        async_env = AsyncEnv(env)
+
+        async def run():
+            obs = await async_env.reset()
+            async_env.step_async(0)
+            with pytest.raises(RuntimeError):
+                async_env.step_async(0)
+            (next_obs, _, _, _) = await async_env.step_wait()
+            # The observations should be copies
+            assert next_obs is not obs
+            frame = await async_env.render()
+            assert np.array_equal(frame, next_obs)
+            with pytest.raises(RuntimeError):
+                await async_env.step_wait()
+
+        asyncio.run(run())
+
+    def test_subproc_env(self):
+        local_env = make_soccer_env(4)
+        action_rand = np.random.RandomState(0)
+        with SubprocEnv(functools.partial(make_soccer_env, 4),
+                        render_frames=True) as subproc_env:
+            async_env = AsyncEnv(subproc_env)
+            # The worker has reset once to report the layouts
+            local_env.reset()
+
+            async def run():
+                obs = await async_env.reset()
+                assert np.array_equal(obs['agent_pos'],
+                                      local_env.reset()['agent_pos'])
+                for _ in range(50):
+                    action = action_rand.randint(local_env.action_space.nvec)
+                    (obs, reward, done, _) = await async_env.step(action)
+                    (local_obs, local_reward, local_done, _) = \
+                        local_env.step(action)
+                    # The single environment shouldn't be batched
+                    assert np.array_equal(obs['agent_pos'],
+                                          local_obs['agent_pos'])
+                    assert reward == local_reward
+                    assert done == local_done
+                    if done:
+                        await async_env.reset()
+                        local_env.reset()
+                frame = await async_env.render()
+                assert np.array_equal(frame, local_env.render())
+
+            asyncio.run(run())
@@ -0,0 +1,60 @@
+# Third-party modules
+import numpy as np
+
+# Testing targets
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.util.block_random import BlockRandom
+
+
+class BlockRandomTest(object):
+    def test_same_sequence_across_blocks(self):
+        # The sequence shouldn't depend on where the blocks are split
+        rand = BlockRandom(3, block_size=7)
+        values = np.concatenate([rand.random_sample(size)
+                                 for size in [1, 5, 3, 20, 2]])
+        expected = np.random.default_rng(3).random(31)
+        assert np.array_equal(values, expected)
+
+    def test_randint(self):
+        rand = BlockRandom(0)
+        assert 0 <= rand.randint(5) < 5
+        values = rand.randint(2, 6, size=(100, 3))
+        assert values.shape == (100, 3)
+        assert set(values.ravel().tolist()) == {2, 3, 4, 5}
+        # The upper bounds may differ for each element
+        high = np.array([1, 2, 3, 4])
+        values = rand.randint(high)
+        assert np.all((values >= 0) & (values < high))
+
+    def test_permutation(self):
+        rand = BlockRandom(0)
+        assert sorted(rand.permutation(5).tolist()) == list(range(5))
+
+    def test_state(self):
+        rand = BlockRandom(0, block_size=8)
+        rand.random_sample(5)
+        state = rand.get_state()
+        expected = rand.random_sample(20)
+        rand.set_state(state)
+        assert np.array_equal(rand.random_sample(20), expected)
+
+    def test_reproducible_episodes(self):
+        env = SoccerV0()
+        env.options = Options(team_size=2)
+        env.load()
+        trajectories = []
+        for _ in range(2):
+            env.seed(5)
+            env.reset()
+            action_rand = np.random.RandomState(0)
+            trajectory = []
+            for _ in range(50):
+                action = action_rand.randint(env.action_space.nvec)
+                (_, reward, done, _) = env.step(action)
+                trajectory.append((env.state.agent_pos.tolist(),
+                                   env.state.agent_ball.tolist(), reward))
+                if done:
+                    env.reset()
+            trajectories.append(trajectory)
+        assert trajectories[0] == trajectories[1]
@@ -0,0 +1,30 @@
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+import pygame_rl.util.image_util as image_util
+
+
+class ImageUtilTest(object):
+    def test_get_scale_factors(self):
+        factors = image_util.get_scale_factors([32, 16], 4)
+        assert factors.tolist() == [8, 4]
+        with pytest.raises(ValueError):
+            image_util.get_scale_factors([32, 32], 5)
+
+    def test_downscale_image(self):
+        # Average the colors of each block
+        image = np.zeros((4, 4, 3), dtype=np.uint8)
+        image[:2, :2] = [10, 20, 30]
+        image[0, 0] = [11, 21, 31]
+        scaled = image_util.downscale_image(image, [2, 2])
+        assert scaled.shape == (2, 2, 3)
+        assert scaled[0, 0].tolist() == [10, 20, 30]
+        assert np.all(scaled[1:] == 0) and np.all(scaled[:, 1:] == 0)
+        # The transparent colors shouldn't bleed into the visible colors
+        image = np.zeros((2, 2, 4), dtype=np.uint8)
+        image[0, 0] = [200, 100, 50, 255]
+        image[1, 1] = [255, 255, 255, 0]
+        scaled = image_util.downscale_image(image, [2, 2])
+        assert scaled[0, 0].tolist() == [200, 100, 50, 64]
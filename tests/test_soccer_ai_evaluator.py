@@ -0,0 +1,75 @@
+# Third-party modules
+import numpy as np
+
+# Testing targets
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.ai_evaluator import AiEvaluator
+from pygame_rl.scenario.soccer.ai_modes import AiModes
+from pygame_rl.scenario.soccer.map_data import MapData
+from pygame_rl.scenario.soccer.options import Options
+
+
+class AiEvaluatorTest(object):
+    map_data = None
+    ai_evaluator = None
+
+    @classmethod
+    def setup_class(cls):
+        options = Options()
+        cls.map_data = MapData(options.map_path)
+        cls.ai_evaluator = AiEvaluator(cls.map_data, options)
+
+    def get_best_actions(self, source_pos, target_pos, strategic_mode):
+        best = self.ai_evaluator.get_best_candidates(
+            self.map_data.get_cell_ids([source_pos]),
+            self.map_data.get_cell_ids([target_pos]),
+            np.array([strategic_mode]))
+        return self.ai_evaluator.candidate_actions[best[0]].tolist()
+
+    def test_get_best_candidates(self):
+        # Approach
+        assert self.get_best_actions(
+            [4, 3], [6, 3], AiModes.APPROACH) == [Actions.MOVE_RIGHT]
+        assert self.get_best_actions(
+            [4, 3], [6, 5], AiModes.APPROACH) == [Actions.MOVE_RIGHT,
+                                                  Actions.MOVE_DOWN]
+        # Avoid
+        assert self.get_best_actions(
+            [4, 3], [6, 3], AiModes.AVOID) == [Actions.MOVE_LEFT]
+        # Intercept never moves onto the target
+        assert self.get_best_actions(
+            [4, 3], [5, 3], AiModes.INTERCEPT) == []
+        # The unwalkable moves are ignored
+        assert self.get_best_actions(
+            [1, 0], [0, 0], AiModes.APPROACH) == []
+
+    def test_get_targets(self):
+        agent_pos = np.array([[[4, 3], [2, 3]]])
+        agent_ball = np.array([[True, False]])
+        agent_mode = np.array([[AgentModes.OFFENSIVE, AgentModes.DEFENSIVE]])
+        (target_cell, strategic_mode) = self.ai_evaluator.get_targets(
+            self.map_data.get_cell_ids(agent_pos), agent_ball, agent_mode,
+            np.array([0, 0]), np.array([0, 1]))
+        target_pos = self.map_data.cell_pos[target_cell]
+        # The player advances to its goal position furthest from the computer
+        assert target_pos[0].tolist() == [8, 2]
+        assert strategic_mode[0] == AiModes.APPROACH
+        # The computer defends the goal position nearest to the player
+        assert target_pos[1].tolist() == [8, 3]
+        assert strategic_mode[1] == AiModes.APPROACH
+
+    def test_get_actions(self):
+        random_state = np.random.RandomState(0)
+        agent_pos = np.array([[[4, 3], [2, 3]], [[1, 1], [6, 4]]])
+        agent_ball = np.array([[True, False], [False, True]])
+        agent_mode = np.array([[AgentModes.OFFENSIVE, AgentModes.DEFENSIVE],
+                               [AgentModes.DEFENSIVE, AgentModes.OFFENSIVE]])
+        mask = np.array([[False, True], [True, True]])
+        actions = self.ai_evaluator.get_actions(
+            agent_pos, agent_ball, agent_mode, random_state, mask)
+        # Only the masked agents get the actions
+        assert actions.shape == (2, 2)
+        assert actions[0, 0] == Actions.NOOP
+        assert np.all((actions[mask] >= Actions.MOVE_RIGHT)
+                      & (actions[mask] <= Actions.STAND))
@@ -0,0 +1,117 @@
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.array_renderer import ArrayRenderer
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.envs.soccer_vec_v0 import SoccerVecV0
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.renderer_options import RendererOptions
+
+
+class ArrayRendererTest(object):
+    env = None
+    array_env = None
+
+    @classmethod
+    def setup_class(cls):
+        options = Options(team_size=2)
+        cls.env = SoccerV0()
+        cls.env.options = options
+        cls.env.load()
+        cls.array_env = SoccerV0()
+        cls.array_env.options = options
+        cls.array_env.renderer_options = RendererOptions(numpy_backend=True)
+        cls.array_env.load()
+
+    def test_load(self):
+        assert isinstance(self.array_env.renderer, ArrayRenderer)
+        # The display isn't supported
+        with pytest.raises(ValueError):
+            RendererOptions(show_display=True, numpy_backend=True)
+
+    def test_pixel_identical(self):
+        self.env.seed(0)
+        self.array_env.seed(0)
+        self.env.reset()
+        self.array_env.reset()
+        action_rand = np.random.RandomState(0)
+        for _ in range(100):
+            actions = action_rand.randint(len(Actions), size=4)
+            (_, _, done, _) = self.env.step(actions)
+            self.array_env.step(actions)
+            assert np.array_equal(self.array_env.render(), self.env.render())
+            if done:
+                self.env.reset()
+                self.array_env.reset()
+
+    def test_compose(self):
+        frame = self.array_env.render()
+        renderer = self.array_env.renderer
+        # Hidden sprites should leave the background
+        sprite_pos = np.zeros((2, 1, 2), dtype=np.int64)
+        frames = renderer.compose([[-1], [0]], sprite_pos)
+        assert np.array_equal(frames[0], renderer.background)
+        assert not np.array_equal(frames[1], renderer.background)
+        # Restoring the dirty tiles should be the same as redrawing
+        sprite_pos[1, 0] = [1, 1]
+        renderer.compose([[-1], [0]], sprite_pos, frames,
+                         dirty_pos=np.zeros((2, 1, 2), dtype=np.int64))
+        expected_frames = renderer.compose([[-1], [0]], sprite_pos)
+        assert np.array_equal(frames, expected_frames)
+        # The screenshot should be untouched
+        assert np.array_equal(renderer.get_screenshot(), frame)
+
+    def test_vec_render(self):
+        vec_env = SoccerVecV0()
+        vec_env.options = self.env.options
+        vec_env.num_envs = 4
+        vec_env.load()
+        vec_env.reset()
+        frames = vec_env.render()
+        screenshot_dim = vec_env.renderer.get_screenshot_dim()
+        assert frames.shape == tuple([4] + screenshot_dim)
+        # Each frame should be the same as rendering the game alone
+        state = self.array_env.state
+        for env_index in range(vec_env.num_envs):
+            state.agent_pos[:] = vec_env.agent_pos[env_index]
+            state.agent_ball[:] = vec_env.agent_ball[env_index]
+            assert np.array_equal(self.array_env.render(), frames[env_index])
+        # The frames should be written into the caller-provided buffer
+        vec_env.frame_buffer = vec_env.renderer.allocate_frames(4)
+        assert vec_env.render() is vec_env.frame_buffer
+        assert np.array_equal(vec_env.frame_buffer, frames)
+
+
+class LowResolutionRendererTest(object):
+    def test_tile_size(self):
+        envs = []
+        for numpy_backend in [False, True]:
+            env = SoccerV0()
+            env.renderer_options = RendererOptions(
+                numpy_backend=numpy_backend, tile_size=4)
+            env.load()
+            env.seed(0)
+            env.reset()
+            envs.append(env)
+        map_size = envs[0].map_data.map_size
+        for _ in range(20):
+            actions = [Actions.MOVE_RIGHT, Actions.NOOP]
+            frames = []
+            for env in envs:
+                env.step(actions)
+                frames.append(env.render())
+            # The frames should be rendered in the tile size
+            assert frames[0].shape == (4 * map_size[1], 4 * map_size[0], 3)
+            # Both backends should downscale the same
+            assert np.array_equal(frames[0], frames[1])
+
+    def test_invalid_tile_size(self):
+        env = SoccerV0()
+        env.renderer_options = RendererOptions(tile_size=5)
+        env.load()
+        env.reset()
+        with pytest.raises(ValueError):
+            env.render()
@@ -0,0 +1,76 @@
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+from pygame_rl.scenario.soccer.collision import resolve_collisions
+
+
+def resolve_collisions_by_loop(old_cells, new_cells, agent_ball,
+                               random_state):
+    """The reference implementation looping over the overlapping groups."""
+    new_cells = list(new_cells)
+    agent_ball = list(agent_ball)
+    switch_agent_index = -1
+    detecting_overlap = True
+    while detecting_overlap:
+        cell_to_agent = {}
+        for (agent_index, cell) in enumerate(new_cells):
+            cell_to_agent.setdefault(cell, []).append(agent_index)
+        detecting_overlap = False
+        for agent_index_list in cell_to_agent.values():
+            if len(agent_index_list) <= 1:
+                continue
+            has_ball_list = [agent_index for agent_index in agent_index_list
+                             if agent_ball[agent_index]]
+            if switch_agent_index < 0 and has_ball_list:
+                no_ball_list = [agent_index
+                                for agent_index in agent_index_list
+                                if not agent_ball[agent_index]]
+                rand_idx = random_state.randint(len(no_ball_list))
+                switch_agent_index = no_ball_list[rand_idx]
+            for agent_index in agent_index_list:
+                new_cells[agent_index] = old_cells[agent_index]
+            detecting_overlap = True
+    return (new_cells, switch_agent_index)
+
+
+class CollisionTest(object):
+    def test_chained_rollback(self):
+        # Agent 0 is blocked by agent 1 standing still, then agent 2 is
+        # blocked by the rollback of agent 0
+        old_cells = np.array([[1, 2, 0]])
+        new_cells = np.array([[2, 2, 1]])
+        agent_ball = np.array([[False, True, False]])
+        (cells, switch_agent_index) = resolve_collisions(
+            old_cells, new_cells, agent_ball, 10, np.random.RandomState(0))
+        assert cells.tolist() == [[1, 2, 0]]
+        assert switch_agent_index.tolist() == [0]
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_same_outcomes_as_loop(self, seed):
+        rand = np.random.RandomState(seed)
+        cell_size = 12
+        game_size = 200
+        agent_size = 6
+        old_cells = np.array([rand.choice(cell_size, agent_size, replace=False)
+                              for _ in range(game_size)])
+        moves = rand.choice([-3, -1, 0, 1, 3], size=(game_size, agent_size))
+        new_cells = np.clip(old_cells + moves, 0, cell_size - 1)
+        agent_ball = np.zeros((game_size, agent_size), dtype=np.bool_)
+        agent_ball[np.arange(game_size),
+                   rand.randint(agent_size, size=game_size)] = True
+        # Resolve the games one by one with identical random states
+        random_state = np.random.RandomState(seed)
+        ref_random_state = np.random.RandomState(seed)
+        for game_index in range(game_size):
+            (cells, switch_agent_index) = resolve_collisions(
+                old_cells[game_index:game_index + 1],
+                new_cells[game_index:game_index + 1],
+                agent_ball[game_index:game_index + 1], cell_size,
+                random_state)
+            (ref_cells, ref_switch_agent_index) = resolve_collisions_by_loop(
+                old_cells[game_index], new_cells[game_index],
+                agent_ball[game_index], ref_random_state)
+            assert cells[0].tolist() == ref_cells
+            assert switch_agent_index[0] == ref_switch_agent_index
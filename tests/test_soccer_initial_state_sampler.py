@@ -0,0 +1,75 @@
+# Third-party modules
+import numpy as np
+
+# Testing targets
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.envs.soccer_vec_v0 import SoccerVecV0
+from pygame_rl.scenario.soccer.initial_state_sampler import \
+    InitialStateSampler
+from pygame_rl.scenario.soccer.map_data import MapData
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.teams import Teams
+from pygame_rl.util.block_random import BlockRandom
+
+
+class InitialStateSamplerTest(object):
+    map_data = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.map_data = MapData(Options().map_path)
+
+    def check_statuses(self, options, agent_pos, agent_ball, agent_mode):
+        team_size = options.team_size
+        for pos in agent_pos:
+            # The agents should stand on distinct spawn positions of the teams
+            assert len(set(map(tuple, pos.tolist()))) == len(pos)
+            spawn_team = self.map_data.spawn_grid[pos[:, 0], pos[:, 1]]
+            assert np.array_equal(spawn_team,
+                                  np.arange(options.agent_size) // team_size)
+        assert np.all(np.count_nonzero(agent_ball, axis=1) == 1)
+        assert np.all((agent_mode >= 0) & (agent_mode < 2))
+
+    def test_sample(self):
+        # Fill the spawn areas of the bundled map
+        spawn_size = len(self.map_data.spawn[Teams.PLAYER.name])
+        options = Options(team_size=spawn_size)
+        sampler = InitialStateSampler(self.map_data, options)
+        statuses = sampler.sample(BlockRandom(0), 1000)
+        self.check_statuses(options, *statuses)
+        # Every agent should get the ball sometimes
+        assert np.all(np.any(statuses[1], axis=0))
+
+    def test_pool(self):
+        options = Options(team_size=2, reset_pool_size=8)
+        sampler = InitialStateSampler(self.map_data, options)
+        random_state = BlockRandom(0)
+        # The pool should be refilled across the batches
+        statuses = [sampler.take(random_state, size) for size in [3, 7, 20]]
+        for (size, batch) in zip([3, 7, 20], statuses):
+            assert len(batch[0]) == size
+            self.check_statuses(options, *batch)
+        # The pooled statuses should be the ones drawn at once
+        expected = InitialStateSampler(self.map_data, options).sample(
+            BlockRandom(0), 8)
+        assert np.array_equal(statuses[0][0], expected[0][:3])
+        assert np.array_equal(statuses[1][0][:5], expected[0][3:])
+        # A new random state should discard the pool
+        batch = sampler.take(BlockRandom(0), 3)
+        assert np.array_equal(batch[0], expected[0][:3])
+
+    def test_same_resets_in_engines(self):
+        options = Options(team_size=2)
+        env = SoccerV0()
+        env.options = options
+        env.load()
+        env.seed(3)
+        vec_env = SoccerVecV0()
+        vec_env.options = options
+        vec_env.load()
+        vec_env.seed(3)
+        vec_env.reset()
+        env.reset()
+        assert np.array_equal(env.state.agent_pos, vec_env.agent_pos[0])
+        assert np.array_equal(env.state.agent_ball, vec_env.agent_ball[0])
+        assert np.array_equal(env.state.agent_mode, vec_env.agent_mode[0])
@@ -0,0 +1,144 @@
+# Third-party modules
+import numpy as np
+
+# Testing targets
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.observation import ObservationBuilder
+from pygame_rl.scenario.soccer.observation import copy_observation
+from pygame_rl.scenario.soccer.options import Options
+
+
+class ObservationBuilderTest(object):
+    env = None
+    obs_builder = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.env = SoccerV0()
+        cls.env.options = Options(team_size=2)
+        cls.env.load()
+        cls.obs_builder = cls.env.state.obs_builder
+
+    def test_map_layer(self):
+        map_data = self.env.map_data
+        obs = self.env.reset()
+        # Walkable: 1, player goal: 2, computer goal: 3
+        expected_map = np.zeros(map_data.map_size)
+        for pos in map_data.walkable:
+            expected_map[tuple(pos)] = 1
+        for pos in map_data.goals['PLAYER']:
+            expected_map[tuple(pos)] = 2
+        for pos in map_data.goals['COMPUTER']:
+            expected_map[tuple(pos)] = 3
+        assert np.array_equal(obs['map'], expected_map)
+        # The static map layer can't be modified
+        assert not obs['map'].flags.writeable
+
+    def test_relative_pos(self):
+        obs = self.env.reset()
+        state = self.env.state
+        agent_size = self.env.options.agent_size
+        for agent_index in range(agent_size):
+            agent_pos = state.get_agent_pos(agent_index)
+            # Each row holds the offsets of all the other agents
+            other_indexes = [other_index for other_index in range(agent_size)
+                             if other_index != agent_index]
+            for (row, other_index) in enumerate(other_indexes):
+                expected = state.get_rel_pos(
+                    agent_pos, state.get_agent_pos(other_index))
+                assert obs['relative']['other_agent_pos'][
+                    agent_index, row].tolist() == expected
+            for (row, goal) in enumerate(self.env.map_data.goals['PLAYER']):
+                expected = state.get_rel_pos(agent_pos, goal)
+                assert obs['relative']['player_goals'][
+                    agent_index, row].tolist() == expected
+
+    def test_own_arrays(self):
+        obs = self.env.reset()
+        kept_obs = copy_observation(obs)
+        next_obs = self.env.step([0] * self.env.options.agent_size)[0]
+        # Each observation has its own arrays unless a buffer is given
+        assert next_obs is not obs
+        assert next_obs['agent_pos'] is not obs['agent_pos']
+        assert np.array_equal(obs['agent_pos'], kept_obs['agent_pos'])
+        assert np.array_equal(obs['relative']['other_agent_pos'],
+                              kept_obs['relative']['other_agent_pos'])
+
+    def test_caller_buffer(self):
+        self.env.reset()
+        out = self.obs_builder.allocate()
+        self.env.obs_buffer = out
+        try:
+            obs = self.env.step([0] * self.env.options.agent_size)[0]
+        finally:
+            self.env.obs_buffer = None
+        # The observation should be written into the caller-provided buffer
+        assert obs is out
+        assert np.array_equal(out['agent_pos'], self.env.state.agent_pos)
+
+    def test_batch(self):
+        num_envs = 3
+        obs_builder = ObservationBuilder(self.env.map_data, self.env.options,
+                                         num_envs)
+        state = self.env.state
+        agent_pos = np.stack([state.agent_pos] * num_envs)
+        agent_ball = np.stack([state.agent_ball] * num_envs)
+        agent_mode = np.stack([state.agent_mode] * num_envs)
+        agent_action = np.stack([state.agent_action] * num_envs)
+        obs = obs_builder.build(agent_pos, agent_ball, agent_mode,
+                                agent_action)
+        # Each game should get the same observation as the single game
+        single_obs = state.get_gym_state()
+        assert obs['map'].shape == (num_envs,) + single_obs['map'].shape
+        for game_index in range(num_envs):
+            assert np.array_equal(
+                obs['relative']['other_agent_pos'][game_index],
+                single_obs['relative']['other_agent_pos'])
+
+
+class FlatObservationTest(object):
+    env = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.env = SoccerV0()
+        cls.env.options = Options(team_size=2, flat_obs=True)
+        cls.env.load()
+
+    def get_flattened_dict_obs(self):
+        obs = self.env.state.get_gym_state()
+        relative = obs['relative']
+        return np.concatenate([
+            obs['map'].ravel(), obs['agent_pos'].ravel(),
+            relative['player_goals'].ravel(),
+            relative['computer_goals'].ravel(),
+            relative['other_agent_pos'].ravel(), obs['ball'].ravel(),
+            obs['mode'].ravel(), obs['action'].ravel()])
+
+    def test_layout(self):
+        obs = self.env.reset()
+        for _ in range(10):
+            # The flat observation should be the flattened dict observation
+            assert obs.dtype == np.int8
+            assert np.array_equal(obs, self.get_flattened_dict_obs())
+            assert self.env.observation_space.contains(obs)
+            obs = self.env.step([0] * self.env.options.agent_size)[0]
+
+    def test_space_bounds(self):
+        map_size = self.env.map_data.map_size
+        space = self.env.observation_space
+        obs_builder = self.env.state.obs_builder
+        assert space.shape == (obs_builder.flat_size,)
+        # The relative offsets are bounded by the map size of each axis
+        begin = int(np.prod(map_size)) + 2 * self.env.options.agent_size
+        assert space.low[begin:begin + 2].tolist() == [-map_size[0] + 1,
+                                                      -map_size[1] + 1]
+        assert space.high[begin:begin + 2].tolist() == [map_size[0] - 1,
+                                                       map_size[1] - 1]
+
+    def test_caller_buffer(self):
+        self.env.reset()
+        out = self.env.state.obs_builder.allocate_flat()
+        obs = self.env.state.get_flat_gym_state(out)
+        assert obs is out
+        assert np.array_equal(out, self.get_flattened_dict_obs())
@@ -1,5 +1,7 @@
 # Third-party modules
+import numpy as np
 import pygame
+import pytest
 
 # Testing targets
 import pygame_rl.scenario.soccer_environment as soccer_environment
@@ -64,3 +66,49 @@ class SoccerRendererTest(object):
         radius = 10
         po_screenshot = self.renderer.get_po_screenshot(agent_index, radius)
         assert po_screenshot.shape == (21 * tile_size[1], 21 * tile_size[0], 3)
+
+    def test_get_po_screenshots(self):
+        self.renderer.render()
+        state = self.renderer.env.state
+        agent_size = len(state.agent_list)
+        pos_list = [state.get_agent_pos(agent_index)
+                    for agent_index in range(agent_size)]
+        # Include the corners to cover the padding
+        (map_width, map_height) = self.renderer.get_map_size()
+        pos_list += [[0, 0], [map_width - 1, map_height - 1]]
+        for radius in [0, 2]:
+            po_screenshots = self.renderer.get_po_screenshots(pos_list, radius)
+            assert len(po_screenshots) == len(pos_list)
+            # Each screenshot should be the same as getting it alone
+            for (pos, po_screenshot) in zip(pos_list, po_screenshots):
+                expected = self.renderer.get_po_screenshot(np.array(pos),
+                                                           radius)
+                assert np.array_equal(po_screenshot, expected)
+        # The screenshots should be written into the given buffer
+        out = np.empty_like(po_screenshots)
+        assert self.renderer.get_po_screenshots(pos_list, 2, out) is out
+        assert np.array_equal(out, po_screenshots)
+
+    def test_get_screenshot_buffer(self):
+        self.renderer.render()
+        screenshot = self.renderer.get_screenshot()
+        # The screenshot should be written into the given buffer
+        buffer = self.renderer.allocate_screenshot()
+        assert self.renderer.get_screenshot(buffer) is buffer
+        assert np.array_equal(buffer, screenshot)
+        # The screenshot should match the pixels of the screen
+        pixels = pygame.surfarray.array3d(self.renderer.screen)
+        assert np.array_equal(screenshot, np.swapaxes(pixels, 0, 1))
+        # The buffer shape should be checked
+        with pytest.raises(ValueError):
+            self.renderer.get_screenshot(buffer[1:])
+
+    def test_get_screenshot_view(self):
+        self.renderer.render()
+        view = self.renderer.get_screenshot_view()
+        assert not view.flags.writeable
+        assert np.array_equal(view, self.renderer.get_screenshot())
+        # The view should share the memory with the screen surface
+        self.renderer.screen.fill([1, 2, 3])
+        assert np.all(view == [1, 2, 3])
+        self.renderer.screen.blit(self.renderer.background, [0, 0])
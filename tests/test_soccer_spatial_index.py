@@ -0,0 +1,79 @@
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.envs.soccer_vec_v0 import SoccerVecV0
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.spatial_index import GridBucketIndex
+import pygame_rl.util.file_util as file_util
+
+
+class GridBucketIndexTest(object):
+    @pytest.mark.parametrize('bucket_size', [1, 3, 4, 7])
+    def test_same_as_scanning(self, bucket_size):
+        rand = np.random.RandomState(bucket_size)
+        map_size = [37, 23]
+        (game_size, agent_size) = (4, 40)
+        agent_team = np.arange(agent_size) // (agent_size // 2)
+        agent_pos = np.stack([rand.randint(size, size=(game_size, agent_size))
+                              for size in map_size], axis=2)
+        spatial_index = GridBucketIndex(map_size, agent_team, bucket_size)
+        spatial_index.build(agent_pos)
+        (game_index, agent_index) = np.nonzero(
+            np.ones((game_size, agent_size), dtype=np.bool_))
+        nearest_agents = spatial_index.get_nearest_agents(
+            game_index, agent_pos[game_index, agent_index],
+            1 - agent_team[agent_index])
+        # Scan all the opponents, the lowest index wins the ties
+        diff = (agent_pos[game_index] -
+                agent_pos[game_index, agent_index][:, None, :])
+        dist = np.hypot(diff[..., 0], diff[..., 1])
+        dist = np.where(agent_team[None, :] != agent_team[agent_index][:, None],
+                        dist, np.inf)
+        assert nearest_agents.tolist() == np.argmin(dist, axis=1).tolist()
+
+    def test_same_trajectories(self):
+        map_path = file_util.resolve_path(
+            __file__, '../sample/data/map/soccer/soccer_21x14_goal_4.tmx')
+        trajectories = []
+        for spatial_index in [False, True]:
+            env = SoccerVecV0()
+            env.num_envs = 8
+            env.options = Options(map_path=map_path, team_size=4,
+                                  spatial_index=spatial_index)
+            env.load()
+            env.seed(0)
+            env.reset()
+            trajectory = []
+            for _ in range(50):
+                env.step(np.zeros((8, 8), dtype=np.int64))
+                trajectory.append(env.agent_pos.copy())
+            trajectories.append(np.array(trajectory))
+        assert np.array_equal(trajectories[0], trajectories[1])
+
+    @pytest.mark.parametrize('team_size', [2, 5])
+    def test_same_single_game_trajectories(self, team_size):
+        map_path = file_util.resolve_path(
+            __file__, '../sample/data/map/soccer/soccer_21x14_goal_8.tmx')
+        trajectories = []
+        for spatial_index in [False, True]:
+            env = SoccerV0()
+            env.options = Options(map_path=map_path, team_size=team_size,
+                                  spatial_index=spatial_index)
+            env.load()
+            env.seed(0)
+            env.reset()
+            action_rand = np.random.RandomState(0)
+            trajectory = []
+            for _ in range(200):
+                actions = action_rand.randint(env.action_space.nvec)
+                (_, _, done, _) = env.step(actions)
+                trajectory.append((env.state.agent_pos.tolist(),
+                                   env.state.agent_ball.tolist()))
+                if done:
+                    env.reset()
+            trajectories.append(trajectory)
+        # The indexed lookup should choose the same opponents as the scan
+        assert trajectories[0] == trajectories[1]
@@ -0,0 +1,103 @@
+# Third-party modules
+import numpy as np
+
+# Testing targets
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.tabular_mdp import TabularMdp
+from pygame_rl.scenario.soccer.tabular_mdp import build_tabular_mdp
+
+
+class TabularMdpTest(object):
+    env = None
+    mdp = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.env = SoccerV0()
+        cls.env.options = Options()
+        cls.env.load()
+        cls.env.seed(0)
+        cls.mdp = build_tabular_mdp(cls.env.options)
+
+    def test_probabilities(self):
+        mdp = self.mdp
+        assert np.isclose(np.sum(mdp.initial_prob), 1.0)
+        row_sums = np.zeros(mdp.state_size * mdp.action_size)
+        rows = np.repeat(np.arange(len(row_sums)),
+                         np.diff(mdp.transition_indptr))
+        np.add.at(row_sums, rows, mdp.transition_data)
+        # Only the terminal states have no transitions
+        expected_sums = np.repeat(~mdp.terminal, mdp.action_size)
+        assert np.allclose(row_sums, expected_sums)
+
+    def test_simulated_transitions(self):
+        mdp = self.mdp
+        action_rand = np.random.RandomState(0)
+        for _ in range(10):
+            self.env.reset()
+            state_index = mdp.get_state_index(self.env.state)
+            assert mdp.initial_prob[state_index] > 0
+            done = False
+            while not done:
+                action = action_rand.randint(len(Actions))
+                (_, reward, done, _) = self.env.step([action, Actions.NOOP])
+                next_index = mdp.get_state_index(self.env.state)
+                (next_indexes, _) = mdp.get_transition_probs(state_index,
+                                                             action)
+                # The simulated transition should be possible in the MDP
+                assert next_index in next_indexes
+                assert reward == mdp.state_reward[next_index]
+                assert mdp.terminal[next_index] == (
+                    done and self.env.state.time_step < mdp.max_time_step)
+                state_index = next_index
+
+    def test_transition_frequencies(self):
+        mdp = self.mdp
+        # Find a state where the AI has several moves to choose from
+        self.env.reset()
+        state_index = mdp.get_state_index(self.env.state)
+        action = Actions.STAND
+        (next_indexes, probs) = mdp.get_transition_probs(state_index, action)
+        while len(next_indexes) < 3:
+            self.env.step([Actions.NOOP, Actions.NOOP])
+            if self.env.state.is_terminal():
+                self.env.reset()
+            state_index = mdp.get_state_index(self.env.state)
+            (next_indexes, probs) = mdp.get_transition_probs(state_index,
+                                                             action)
+        # Sample the transitions by branching from the same snapshot
+        snapshot = self.env.get_snapshot()
+        sample_size = 2000
+        counts = dict.fromkeys(next_indexes.tolist(), 0)
+        for seed in range(sample_size):
+            self.env.restore_snapshot(snapshot)
+            self.env.seed(seed)
+            self.env.step([action, Actions.NOOP])
+            counts[mdp.get_state_index(self.env.state)] += 1
+        freqs = np.array([counts[index] for index in next_indexes.tolist()])
+        assert np.allclose(freqs / sample_size, probs, atol=0.05)
+
+    def test_backward_induction(self):
+        mdp = self.mdp
+        values = mdp.backward_induction()
+        assert values.shape == (mdp.max_time_step + 1, mdp.state_size)
+        # The terminal states have no future rewards
+        assert np.all(values[:, mdp.terminal] == 0.0)
+        # The last step only gets the immediate reward
+        assert np.allclose(values[1], np.max(mdp.reward, axis=1))
+        assert np.all(np.abs(values) <= 1.0 + 1e-9)
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / 'soccer_mdp.npz')
+        self.mdp.save(path)
+        mdp = TabularMdp.load(path, self.env.options)
+        assert mdp.state_size == self.mdp.state_size
+        assert np.array_equal(mdp.transition_indptr,
+                              self.mdp.transition_indptr)
+        assert np.array_equal(mdp.transition_data, self.mdp.transition_data)
+        assert np.array_equal(mdp.reward, self.mdp.reward)
+        self.env.reset()
+        assert (mdp.get_state_index(self.env.state)
+                == self.mdp.get_state_index(self.env.state))
@@ -0,0 +1,372 @@
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.agent_modes import AgentModes
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.map_data import MapData
+from pygame_rl.scenario.soccer.options import Options
+from pygame_rl.scenario.soccer.renderer_options import RendererOptions
+from pygame_rl.scenario.soccer.teams import Teams
+
+
+class SoccerV0StateTest(object):
+    env = None
+    state = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.env = SoccerV0()
+        cls.env.options = Options(team_size=2)
+        cls.env.load()
+        cls.state = cls.env.state
+
+    def test_reset(self):
+        self.env.reset()
+        agent_size = self.env.options.agent_size
+        # The agent arrays should cover every agent
+        assert self.state.agent_pos.shape == (agent_size, 2)
+        assert self.state.agent_ball.shape == (agent_size,)
+        # Exactly one agent has the ball
+        assert np.count_nonzero(self.state.agent_ball) == 1
+        # The agents should stand on distinct positions in the occupancy grid
+        occupied = self.state.pos_grid[self.state.pos_grid >= 0]
+        assert sorted(occupied.tolist()) == list(range(agent_size))
+        # The accessors should return the enum types
+        for agent_index in range(agent_size):
+            assert self.state.get_agent_mode(agent_index) in AgentModes
+            assert self.state.get_agent_action(agent_index) == Actions.STAND
+            assert self.state.get_agent_frame_skip_index(agent_index) == 0
+
+    def test_set_agent_pos(self):
+        self.env.reset()
+        # Move the first agent to an empty walkable position
+        empty_pos = next(pos for pos in self.env.map_data.walkable
+                         if not self.state.get_pos_status(pos))
+        old_pos = self.state.get_agent_pos(0)
+        self.state.set_agent_pos(0, empty_pos)
+        # The occupancy grid should follow the position
+        assert self.state.get_agent_pos(0) == empty_pos
+        assert self.state.get_pos_status(old_pos) is None
+        pos_status = self.state.get_pos_status(empty_pos)
+        assert pos_status['agent_index'] == 0
+        assert pos_status['team_name'] == Teams.PLAYER
+
+    def test_agent_list(self):
+        self.env.reset()
+        agent_list = self.state.agent_list
+        # The compatibility list should mirror the arrays
+        assert len(agent_list) == self.env.options.agent_size
+        for agent_index, agent in enumerate(agent_list):
+            assert agent['pos'] == self.state.get_agent_pos(agent_index)
+            assert agent['ball'] == self.state.get_agent_ball(agent_index)
+
+    def test_step(self):
+        self.env.reset()
+        actions = np.zeros(self.env.options.agent_size, dtype=np.int64)
+        actions[0] = Actions.STAND
+        self.env.step(actions)
+        # The taken actions and the time step should be updated
+        assert self.state.get_agent_action(0) == Actions.STAND
+        assert self.state.time_step == 1
+        # The state should be equal to itself and hashable
+        assert self.state == self.state
+        assert isinstance(hash(self.state), int)
+
+    def test_win_team(self):
+        self.env.reset()
+        assert self.state.get_win_team() == -1
+        assert not self.state.is_terminal()
+        # Carry the ball to the goal area of the computer team
+        agent_index = self.env.get_agent_index(Teams.COMPUTER, 0)
+        ball_possession = self.state.get_ball_possession()
+        if ball_possession['agent_index'] != agent_index:
+            self.state.switch_ball(ball_possession['agent_index'],
+                                   agent_index)
+        goal_pos = next(pos for pos in self.env.map_data.goals['COMPUTER']
+                        if not self.state.get_pos_status(pos))
+        self.state.set_agent_pos(agent_index, goal_pos)
+        # The cached winning team should follow the setters
+        assert self.state.get_win_team() == Teams.COMPUTER
+        assert self.state.is_team_win(Teams.COMPUTER)
+        assert not self.state.is_team_win(Teams.PLAYER)
+        assert self.state.is_terminal()
+        assert self.env._get_reward() == -1.0
+        assert 'Winning team: COMPUTER' in repr(self.state)
+        self.state.switch_ball(agent_index, 0)
+        assert self.state.get_win_team() == -1
+        self.env.reset()
+        assert self.state.get_win_team() == -1
+
+    def test_snapshot(self):
+        self.env.reset()
+        actions = np.zeros(self.env.options.agent_size, dtype=np.int64)
+        snapshot = self.env.get_snapshot()
+        # The snapshot shouldn't change with the state
+        with pytest.raises(ValueError):
+            snapshot.agent_pos[0] = 0
+        trajectories = []
+        for _ in range(2):
+            self.env.restore_snapshot(snapshot)
+            trajectory = []
+            for _ in range(10):
+                self.env.step(actions)
+                trajectory.append((self.state.agent_pos.tolist(),
+                                   self.state.agent_ball.tolist(),
+                                   self.state.time_step))
+            trajectories.append(trajectory)
+        # The branches from the same snapshot should be the same
+        assert trajectories[0] == trajectories[1]
+        self.env.restore_snapshot(snapshot)
+        assert self.state.time_step == snapshot.time_step
+        occupied = self.state.pos_grid[self.state.pos_grid >= 0]
+        assert sorted(occupied.tolist()) == list(
+            range(self.env.options.agent_size))
+
+    def test_snapshot_with_reset_pool(self):
+        env = SoccerV0()
+        env.options = Options(team_size=2, reset_pool_size=8)
+        env.load()
+        env.seed(0)
+        env.reset()
+        action_rand = np.random.RandomState(0)
+        nvec = env.action_space.nvec
+        actions = action_rand.randint(nvec, size=(300, len(nvec)))
+        snapshot = env.get_snapshot()
+        trajectories = []
+        for _ in range(2):
+            env.restore_snapshot(snapshot)
+            trajectory = []
+            reset_count = 0
+            for action in actions:
+                (_, _, done, _) = env.step(action)
+                if done:
+                    env.reset()
+                    reset_count += 1
+                trajectory.append((env.state.agent_pos.tolist(),
+                                   env.state.agent_ball.tolist(),
+                                   env.state.agent_mode.tolist()))
+            # The replays should cross the resets
+            assert reset_count > 0
+            trajectories.append(trajectory)
+        # The replays across the pooled resets should be the same
+        assert trajectories[0] == trajectories[1]
+        # Seeding should discard the pool
+        env.seed(0)
+        assert env.state.initial_state_sampler.pool is None
+
+    def test_encode_and_decode(self):
+        self.env.seed(2)
+        self.env.reset()
+        encoder = self.state.state_encoder
+        actions = np.zeros(self.env.options.agent_size, dtype=np.int64)
+        codes = {}
+        for _ in range(100):
+            code = self.state.encode()
+            assert 0 <= code < encoder.state_size
+            # The equal codes should come from the equal states
+            key = (self.state.agent_pos.tolist(),
+                   self.state.agent_ball.tolist(),
+                   self.state.agent_mode.tolist(), self.state.time_step)
+            assert codes.setdefault(code, key) == key
+            (_, _, done, _) = self.env.step(actions)
+            if done:
+                self.env.reset()
+        # The decoded states should be encoded to the same codes
+        code_rand = np.random.RandomState(0)
+        for code in code_rand.randint(encoder.state_size, size=20).tolist():
+            self.state.decode(code)
+            assert self.state.encode() == code
+            assert self.state.zobrist_hash == self.state.compute_zobrist_hash()
+            occupied = self.state.pos_grid[self.state.pos_grid >= 0]
+            assert len(occupied) == len(set(occupied.tolist()))
+        self.env.reset()
+        with pytest.raises(ValueError):
+            self.state.decode(encoder.state_size)
+
+    def test_encode_actions(self):
+        env = SoccerV0()
+        env.options = Options(ai_frame_skip=2)
+        env.load()
+        env.reset()
+        env.step([Actions.MOVE_UP, Actions.NOOP])
+        code = env.state.encode()
+        # The last actions and the frame skipping indexes should be restored
+        (agent_action, frame_skip_index) = (env.state.agent_action.copy(),
+                                            env.state.agent_frame_skip_index
+                                            .copy())
+        env.reset()
+        env.state.decode(code)
+        assert np.array_equal(env.state.agent_action, agent_action)
+        assert np.array_equal(env.state.agent_frame_skip_index,
+                              frame_skip_index)
+
+    def test_zobrist_hash(self):
+        self.env.seed(1)
+        self.env.reset()
+        action_rand = np.random.RandomState(0)
+        snapshot = self.env.get_snapshot()
+        for _ in range(200):
+            actions = action_rand.randint(self.env.action_space.nvec)
+            (_, _, done, _) = self.env.step(actions)
+            # The maintained hash should equal the hash from scratch
+            assert self.state.zobrist_hash == self.state.compute_zobrist_hash()
+            if done:
+                self.env.reset()
+        # The hash should follow the restored state
+        self.env.restore_snapshot(snapshot)
+        assert self.state.zobrist_hash == self.state.compute_zobrist_hash()
+        # The equal states of the other environment should have the same hash
+        other_env = SoccerV0()
+        other_env.options = Options(team_size=2)
+        other_env.load()
+        other_env.restore_snapshot(snapshot)
+        assert other_env.state == self.state
+        assert hash(other_env.state) == hash(self.state)
+        other_env.state.set_agent_mode(0, 1 - self.state.agent_mode[0])
+        assert other_env.state != self.state
+        # Randomizing the statuses should keep the hash
+        self.state.randomize()
+        assert self.state.zobrist_hash == self.state.compute_zobrist_hash()
+
+
+class SoccerV0RenderTest(object):
+    def test_frame_buffer(self):
+        env = SoccerV0()
+        env.load()
+        env.reset()
+        frame = env.render()
+        assert frame.shape == tuple(env.renderer.get_screenshot_dim())
+        assert frame.dtype == np.uint8
+        # The frames should be written into the caller-provided buffer
+        env.frame_buffer = env.renderer.allocate_screenshot()
+        assert env.render() is env.frame_buffer
+        assert np.array_equal(env.frame_buffer, frame)
+
+    @pytest.mark.parametrize('numpy_backend', [False, True])
+    def test_incremental_frame_buffer(self, numpy_backend):
+        env = SoccerV0()
+        env.options = Options(team_size=2)
+        env.renderer_options = RendererOptions(numpy_backend=numpy_backend)
+        env.load()
+        env.seed(0)
+        env.reset()
+        env.render()
+        buffers = [env.renderer.allocate_screenshot() for _ in range(2)]
+        action_rand = np.random.RandomState(0)
+        for step in range(60):
+            actions = action_rand.randint(len(Actions), size=4)
+            (_, _, done, _) = env.step(actions)
+            # Switching the buffers should copy the whole frames
+            env.frame_buffer = buffers[step // 20 % 2]
+            frame = env.render()
+            # Only copying the dirty areas should give the full frames
+            assert frame is env.frame_buffer
+            assert np.array_equal(frame, env.renderer.get_screenshot())
+            if done:
+                env.reset()
+
+    def test_step_timings(self):
+        env = SoccerV0()
+        env.load()
+        env.reset()
+        actions = np.zeros(env.options.agent_size, dtype=np.int64)
+        assert env.get_step_timings() == {}
+        env.enable_profiling(step_info=True)
+        for _ in range(3):
+            (_, _, _, info) = env.step(actions)
+        # Each phase should be recorded once in each step
+        timings = env.get_step_timings()
+        phases = (env.profiled_env_phases + env.profiled_state_phases
+                  + ['step'])
+        assert sorted(timings) == sorted(phases)
+        for phase in phases:
+            assert timings[phase]['count'] == 3
+            assert info['step_timings'][phase] >= 0
+        # No wrappers should be left after disabling
+        env.disable_profiling()
+        assert 'step' not in env.__dict__
+        assert 'is_terminal' not in env.state.__dict__
+        assert env.step(actions)[3] == {}
+
+
+class SoccerV0MapDataTest(object):
+    map_data = None
+
+    @classmethod
+    def setup_class(cls):
+        options = Options()
+        cls.map_data = MapData(options.map_path)
+
+    def test_walkable_grid(self):
+        # The grid should agree with the walkable tile list
+        assert self.map_data.walkable_grid.shape == tuple(
+            self.map_data.map_size)
+        assert np.count_nonzero(self.map_data.walkable_grid) == len(
+            self.map_data.walkable)
+        for pos in self.map_data.walkable:
+            assert self.map_data.is_walkable(pos)
+        # The positions outside the map aren't walkable
+        assert not self.map_data.is_walkable([-1, 0])
+        assert not self.map_data.is_walkable([0, self.map_data.map_size[1]])
+
+    def test_goal_and_spawn_grids(self):
+        for team_name in Teams:
+            for pos in self.map_data.goals[team_name.name]:
+                assert self.map_data.get_goal_team(pos) == team_name
+            for pos in self.map_data.spawn[team_name.name]:
+                assert self.map_data.spawn_grid[pos[0], pos[1]] == team_name
+
+    def test_cell_tables(self):
+        map_size = self.map_data.map_size
+        cell_size = np.prod(map_size)
+        # The cell IDs should round-trip with the positions
+        cell_ids = self.map_data.get_cell_ids(self.map_data.cell_pos)
+        assert cell_ids.tolist() == list(range(cell_size))
+        # The distance table should agree with the Euclidean distance
+        distance = self.map_data.get_pos_distance([1, 2], [4, 5])
+        assert distance == SoccerV0.get_pos_distance([1, 2], [4, 5])
+        # The distances of the large maps without the table should be the same
+        cell_ids = np.arange(cell_size)
+        table_distances = self.map_data.get_cell_distances(
+            cell_ids[:, None], cell_ids[None, :])
+        cell_distance = self.map_data.cell_distance
+        self.map_data.cell_distance = None
+        try:
+            assert np.array_equal(self.map_data.get_cell_distances(
+                cell_ids[:, None], cell_ids[None, :]), table_distances)
+        finally:
+            self.map_data.cell_distance = cell_distance
+        # The moved cells should agree with the walkable moves
+        for cell_id in range(cell_size):
+            pos = self.map_data.cell_pos[cell_id].tolist()
+            for action in list(Actions)[1:]:
+                moved_pos = SoccerV0.get_moved_pos(pos, action)
+                moved_cell = self.map_data.moved_cell[cell_id, action]
+                if self.map_data.is_walkable(moved_pos):
+                    assert self.map_data.cell_pos[moved_cell].tolist() == \
+                        moved_pos
+                else:
+                    assert moved_cell == -1
+
+    def test_goal_tables(self):
+        for team_name in Teams:
+            goals = np.array(self.map_data.goals[team_name.name])
+            for pos in self.map_data.walkable:
+                cell_id = self.map_data.get_cell_ids(pos)
+                distances = np.hypot(goals[:, 0] - pos[0], goals[:, 1] - pos[1])
+                # The tables should pick the first nearest and furthest goals
+                nearest_cell = self.map_data.nearest_goal_cell[
+                    team_name, cell_id]
+                furthest_cell = self.map_data.furthest_goal_cell[
+                    team_name, cell_id]
+                assert self.map_data.cell_pos[nearest_cell].tolist() == \
+                    goals[np.argmin(distances)].tolist()
+                assert self.map_data.cell_pos[furthest_cell].tolist() == \
+                    goals[np.argmax(distances)].tolist()
+                assert self.map_data.nearest_goal_distance[
+                    team_name, cell_id] == np.min(distances)
+                assert self.map_data.furthest_goal_distance[
+                    team_name, cell_id] == np.max(distances)
@@ -0,0 +1,119 @@
+# Third-party modules
+import numpy as np
+import pytest
+
+# Testing targets
+from pygame_rl.scenario.soccer.actions import Actions
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.envs.soccer_vec_v0 import SoccerVecV0
+from pygame_rl.scenario.soccer.options import Options
+
+
+class SoccerVecV0Test(object):
+    env = None
+    num_envs = 8
+
+    @classmethod
+    def setup_class(cls):
+        cls.env = SoccerVecV0()
+        cls.env.options = Options(team_size=2)
+        cls.env.num_envs = cls.num_envs
+        cls.env.load()
+
+    def test_reset(self):
+        obs = self.env.reset()
+        agent_size = self.env.options.agent_size
+        # The observations should be stacked by the game index
+        assert obs['agent_pos'].shape == (self.num_envs, agent_size, 2)
+        assert obs['relative']['other_agent_pos'].shape == (
+            self.num_envs, agent_size, agent_size - 1, 2)
+        # Exactly one agent has the ball in each game
+        assert np.all(np.count_nonzero(self.env.agent_ball, axis=1) == 1)
+        # The agents should stand on distinct spawn positions
+        for pos in self.env.agent_pos:
+            assert len(set(map(tuple, pos.tolist()))) == agent_size
+        assert np.all(self.env.time_step == 0)
+
+    def test_step(self):
+        self.env.reset()
+        actions = np.zeros((self.num_envs, self.env.options.agent_size),
+                           dtype=np.int64)
+        for _ in range(200):
+            _, reward, done, info = self.env.step(actions)
+            assert reward.shape == (self.num_envs,)
+            assert done.shape == (self.num_envs,)
+            # The ended games should have been reset
+            assert np.all(self.env.time_step[done] == 0)
+            if np.any(done):
+                assert 'terminal_observation' in info
+            # The agents should never overlap
+            for pos in self.env.agent_pos:
+                assert len(set(map(tuple, pos.tolist()))) == len(pos)
+
+    def test_reset_indexes(self):
+        self.env.reset()
+        actions = np.zeros((self.num_envs, self.env.options.agent_size),
+                           dtype=np.int64)
+        self.env.step(actions)
+        agent_pos = self.env.agent_pos.copy()
+        self.env.reset([1, 3])
+        # Only the given games should be reset
+        assert np.array_equal(self.env.time_step != 0,
+                              ~np.isin(np.arange(self.num_envs), [1, 3]))
+        untouched = np.setdiff1d(np.arange(self.num_envs), [1, 3])
+        assert np.array_equal(self.env.agent_pos[untouched],
+                              agent_pos[untouched])
+
+    def test_encode_states(self):
+        self.env.seed(0)
+        self.env.reset()
+        actions = np.zeros((self.num_envs, self.env.options.agent_size),
+                           dtype=np.int64)
+        for _ in range(5):
+            self.env.step(actions)
+        encoder = self.env.state_encoder
+        codes = self.env.encode_states()
+        # The batch codes should equal the codes of the single games
+        for game_index in range(self.num_envs):
+            assert codes[game_index] == encoder.encode(
+                self.env.agent_pos[game_index],
+                self.env.agent_ball[game_index],
+                self.env.agent_mode[game_index],
+                self.env.agent_action[game_index],
+                self.env.time_step[game_index])
+        agent_pos = self.env.agent_pos.copy()
+        self.env.reset()
+        self.env.decode_states(codes)
+        assert np.array_equal(self.env.agent_pos, agent_pos)
+        assert np.array_equal(self.env.encode_states(), codes)
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_same_rules_as_soccer_v0(self, seed):
+        # Create a single game in both environments
+        env = SoccerV0()
+        env.options = Options(team_size=2)
+        env.load()
+        env.seed(seed)
+        vec_env = SoccerVecV0()
+        vec_env.options = env.options
+        vec_env.load()
+        # Copy the state and the random state
+        state = env.state
+        vec_env.agent_pos[0] = state.agent_pos
+        vec_env.agent_ball[0] = state.agent_ball
+        vec_env.agent_mode[0] = state.agent_mode
+        vec_env.agent_action[0] = state.agent_action
+        vec_env.random_state.set_state(env.random_state.get_state())
+        # The games should stay the same with the same random draws
+        rand = np.random.RandomState(seed)
+        for _ in range(50):
+            actions = rand.randint(len(Actions), size=env.options.agent_size)
+            _, reward, done, _ = env.step(actions.copy())
+            _, vec_reward, vec_done, _ = vec_env.step(actions[None, :].copy())
+            assert vec_reward[0] == reward
+            assert vec_done[0] == done
+            if done:
+                break
+            assert np.array_equal(vec_env.agent_pos[0], state.agent_pos)
+            assert np.array_equal(vec_env.agent_ball[0], state.agent_ball)
+            assert np.array_equal(vec_env.agent_action[0], state.agent_action)
@@ -0,0 +1,115 @@
+# Native modules
+import functools
+from multiprocessing import shared_memory
+import time
+
+# Third-party modules
+import numpy as np
+
+# Testing targets
+from pygame_rl.rl.subproc_vec_env import SubprocVecEnv
+from pygame_rl.scenario.gridworld.envs.gridworld_v1 import GridworldV1
+from pygame_rl.scenario.soccer.envs.soccer_v0 import SoccerV0
+from pygame_rl.scenario.soccer.options import Options
+
+
+def make_soccer_env(seed, flat_obs=False):
+    env = SoccerV0()
+    env.options = Options(flat_obs=flat_obs)
+    env.load()
+    env.seed(seed)
+    return env
+
+
+def make_gridworld_env(seed):
+    env = GridworldV1()
+    env.load()
+    env.seed(seed)
+    return env
+
+
+class SubprocVecEnvTest(object):
+    def test_same_steps_as_local_envs(self):
+        seeds = [1, 2]
+        env_fns = [functools.partial(make_soccer_env, seed) for seed in seeds]
+        local_envs = [env_fn() for env_fn in env_fns]
+        action_rand = np.random.RandomState(0)
+        with SubprocVecEnv(env_fns) as vec_env:
+            obs = vec_env.reset()
+            for (env_index, env) in enumerate(local_envs):
+                # The workers have reset once to report the layouts
+                env.reset()
+                local_obs = env.reset()
+                assert np.array_equal(obs['agent_pos'][env_index],
+                                      local_obs['agent_pos'])
+            for _ in range(300):
+                actions = [action_rand.randint(env.action_space.nvec)
+                           for env in local_envs]
+                (obs, rewards, dones, infos) = vec_env.step(actions)
+                for (env_index, env) in enumerate(local_envs):
+                    (local_obs, reward, done, _) = env.step(actions[env_index])
+                    assert rewards[env_index] == reward
+                    assert dones[env_index] == done
+                    if done:
+                        # The ended environment should be reset
+                        terminal_obs = infos[env_index]['terminal_observation']
+                        assert np.array_equal(
+                            terminal_obs['relative']['other_agent_pos'],
+                            local_obs['relative']['other_agent_pos'])
+                        local_obs = env.reset()
+                    assert np.array_equal(obs['agent_pos'][env_index],
+                                          local_obs['agent_pos'])
+
+    def test_flat_obs_and_frames(self):
+        env_fns = [functools.partial(make_soccer_env, seed, flat_obs=True)
+                   for seed in range(3)]
+        with SubprocVecEnv(env_fns, render_frames=True) as vec_env:
+            obs = vec_env.reset()
+            frame = make_soccer_env(0).render()
+            assert obs.shape[0] == 3
+            assert vec_env.frames.shape == (3,) + frame.shape
+            # The frames should be written by the workers in place
+            assert np.any(vec_env.frames[2] != 0)
+            (obs, _, _, _) = vec_env.step([[0, 0]] * 3)
+            assert obs.shape[0] == 3
+
+    def test_gridworld_frames(self):
+        seeds = [1, 2]
+        env_fns = [functools.partial(make_gridworld_env, seed)
+                   for seed in seeds]
+        local_envs = [env_fn() for env_fn in env_fns]
+        action_rand = np.random.RandomState(0)
+        with SubprocVecEnv(env_fns, render_frames=True) as vec_env:
+            obs = vec_env.reset()
+            # The observations are the frames
+            assert obs.shape == (2, 288, 288, 3)
+            assert obs.dtype == np.uint8
+            for env in local_envs:
+                # The workers have reset once to report the layouts
+                env.reset()
+                env.reset()
+            for _ in range(50):
+                actions = action_rand.randint(5, size=len(local_envs))
+                (obs, rewards, dones, _) = vec_env.step(actions)
+                for (env_index, env) in enumerate(local_envs):
+                    (local_obs, reward, done, _) = env.step(actions[env_index])
+                    assert rewards[env_index] == reward
+                    assert dones[env_index] == done
+                    if done:
+                        local_obs = env.reset()
+                    assert np.array_equal(obs[env_index], local_obs)
+                    assert np.array_equal(vec_env.frames[env_index],
+                                          env.render())
+
+    def test_worker_exit_keeps_blocks(self):
+        env_fns = [functools.partial(make_soccer_env, seed)
+                   for seed in range(2)]
+        with SubprocVecEnv(env_fns, start_method='fork') as vec_env:
+            # Stop a forked worker before the others
+            vec_env.pipes[0].send(('close', None))
+            vec_env.processes[0].join()
+            # Give a resource tracker of the worker time to clean up
+            time.sleep(0.5)
+            # The blocks should still be attachable by their names
+            for block in vec_env.shared_blocks:
+                shared_memory.SharedMemory(name=block.name).close()